@@ -0,0 +1,27 @@
+"""Asynchronous validation job API."""
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.models.job import ValidationJob, JOB_SUCCEEDED
+from app.models.report import ValidationReport
+from app.models.types import is_uuid
+from app.responses import json_response
+
+router = APIRouter(prefix="/api/v1/jobs", tags=["jobs"])
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: str, db: AsyncSession = Depends(get_db)):
+    """Get the status of a validation job, and its report once finished."""
+    # Always re-read: the job is updated by the background workers
+    job = await db.get(ValidationJob, job_id, populate_existing=True) if is_uuid(job_id) else None
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    data = job.to_dict()
+    if job.status == JOB_SUCCEEDED:
+        report = await db.get(ValidationReport, job.report_id)
+        data["result"] = report.to_dict() if report else None
+    return json_response(data)
@@ -3,30 +3,30 @@ import json
 import hmac
 import hashlib
 import httpx
-from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, Request, Header
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 
 from app.database import get_db
 from app.config import get_settings
 from app.models.payment import PaymentTransaction
-from app.services.token_service import add_tokens
-from app.metrics import payment_success, payment_revenue_cents
+from app.services.http_client import get_creem_client
+from app.services.payment_service import (
+    DUPLICATE,
+    PRODUCTS,
+    enqueue_webhook,
+    event_key,
+    process_webhook,
+    webhook_applier,
+)
 
 router = APIRouter(prefix="/api/v1/payment", tags=["payment"])
 settings = get_settings()
 
 
-# Product configuration
-PRODUCTS = {
-    "validator_3": {"tokens": 3, "amount_cents": 499},
-    "validator_10": {"tokens": 10, "amount_cents": 999},
-    "validator_30": {"tokens": 30, "amount_cents": 1999},
-}
-
-
 class CheckoutRequest(BaseModel):
     """Checkout request."""
     product_sku: str
@@ -40,7 +40,7 @@ class CheckoutResponse(BaseModel):
 
 
 @router.post("/checkout", response_model=CheckoutResponse)
-async def create_checkout(request: CheckoutRequest, db: Session = Depends(get_db)):
+async def create_checkout(request: CheckoutRequest, db: AsyncSession = Depends(get_db)):
     """Create a Creem checkout session."""
     if request.product_sku not in PRODUCTS:
         raise HTTPException(status_code=400, detail="Invalid product SKU")
@@ -69,34 +69,34 @@ async def create_checkout(request: CheckoutRequest, db: Session = Depends(get_db
         status="pending",
     )
     db.add(transaction)
-    db.commit()
+    await db.commit()
     
     # Create Creem checkout
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://api.creem.io/v1/checkouts",
-                headers={
-                    "Authorization": f"Bearer {settings.creem_api_key}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "product_id": creem_product_id,
-                    "success_url": f"{settings.frontend_url}/payment/success?checkout_id={checkout_id}",
-                    "request_id": checkout_id,
-                    "metadata": {
-                        "device_id": request.device_id,
-                        "product_sku": request.product_sku,
-                    },
+        client = get_creem_client()
+        response = await client.post(
+            "/v1/checkouts",
+            headers={
+                "Authorization": f"Bearer {settings.creem_api_key}",
+                "Content-Type": "application/json",
+            },
+            json={
+                "product_id": creem_product_id,
+                "success_url": f"{settings.frontend_url}/payment/success?checkout_id={checkout_id}",
+                "request_id": checkout_id,
+                "metadata": {
+                    "device_id": request.device_id,
+                    "product_sku": request.product_sku,
                 },
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            return CheckoutResponse(
-                checkout_url=data["checkout_url"],
-                checkout_id=checkout_id,
-            )
+            },
+        )
+        response.raise_for_status()
+        data = response.json()
+        
+        return CheckoutResponse(
+            checkout_url=data["checkout_url"],
+            checkout_id=checkout_id,
+        )
     except httpx.HTTPError as e:
         raise HTTPException(status_code=500, detail=f"Payment service error: {str(e)}")
 
@@ -104,10 +104,17 @@ async def create_checkout(request: CheckoutRequest, db: Session = Depends(get_db
 @router.post("/webhook")
 async def handle_webhook(
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     creem_signature: Optional[str] = Header(None, alias="Creem-Signature"),
 ):
-    """Handle Creem webhook for payment completion."""
+    """
+    Handle Creem webhook for payment completion.
+    
+    Each event is recorded under its Creem event / order id and applied in
+    the same transaction, so a replay changes nothing. With
+    ``PAYMENT_WEBHOOK_FAST_ACK`` the event is only stored here, answered
+    with 202 and applied by the background batch applier.
+    """
     body = await request.body()
     
     # Verify signature
@@ -125,63 +132,28 @@ async def handle_webhook(
         payload = json.loads(body)
     except json.JSONDecodeError:
         raise HTTPException(status_code=400, detail="Invalid JSON")
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=400, detail="Invalid JSON")
     
-    event_type = payload.get("type")
+    key = event_key(payload, body)
     
-    if event_type == "checkout.completed":
-        checkout_data = payload.get("data", {})
-        request_id = checkout_data.get("request_id")
-        
-        if not request_id:
-            return {"status": "ignored", "reason": "no request_id"}
-        
-        # Find transaction
-        transaction = db.query(PaymentTransaction).filter(
-            PaymentTransaction.checkout_id == request_id
-        ).first()
-        
-        if not transaction:
-            return {"status": "ignored", "reason": "transaction not found"}
-        
-        if transaction.status == "completed":
-            return {"status": "ignored", "reason": "already processed"}
-        
-        # Update transaction
-        transaction.status = "completed"
-        transaction.completed_at = datetime.utcnow()
-        transaction.creem_order_id = checkout_data.get("id")
-        transaction.webhook_data = payload
-        
-        # Add tokens
-        product = PRODUCTS.get(transaction.product_sku, {"tokens": 0})
-        add_tokens(
-            db,
-            transaction.device_id,
-            product["tokens"],
-            transaction.id,
-            transaction.product_sku,
-        )
-        
-        # Track metrics
-        payment_success.labels(
-            tool="idea-validator",
-            product_sku=transaction.product_sku
-        ).inc()
-        payment_revenue_cents.labels(tool="idea-validator").inc(transaction.amount_cents)
-        
-        db.commit()
-        
-        return {"status": "success", "tokens_added": product["tokens"]}
+    if settings.payment_webhook_fast_ack:
+        if not await enqueue_webhook(db, key, payload):
+            return DUPLICATE.to_dict()
+        webhook_applier.notify()
+        return JSONResponse(status_code=202, content={"status": "accepted"})
     
-    return {"status": "ignored", "reason": f"unhandled event: {event_type}"}
+    outcome = await process_webhook(db, key, payload)
+    return outcome.to_dict()
 
 
 @router.get("/verify/{checkout_id}")
-async def verify_payment(checkout_id: str, db: Session = Depends(get_db)):
+async def verify_payment(checkout_id: str, db: AsyncSession = Depends(get_db)):
     """Verify payment status."""
-    transaction = db.query(PaymentTransaction).filter(
-        PaymentTransaction.checkout_id == checkout_id
-    ).first()
+    result = await db.execute(
+        select(PaymentTransaction).where(PaymentTransaction.checkout_id == checkout_id)
+    )
+    transaction = result.scalars().first()
     
     if not transaction:
         raise HTTPException(status_code=404, detail="Transaction not found")
@@ -1,7 +1,7 @@
 """Token management API."""
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.services.token_service import get_token_status
@@ -19,10 +19,10 @@ class TokenStatusResponse(BaseModel):
 
 
 @router.get("/status", response_model=TokenStatusResponse)
-async def get_status(device_id: str = "", db: Session = Depends(get_db)):
+async def get_status(device_id: str = "", db: AsyncSession = Depends(get_db)):
     """Get token status for a device."""
     if not device_id:
         raise HTTPException(status_code=400, detail="Device ID is required")
     
-    status = get_token_status(db, device_id)
+    status = await get_token_status(db, device_id)
     return TokenStatusResponse(**status)
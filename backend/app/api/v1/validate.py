@@ -1,20 +1,45 @@
 """Validation API endpoint."""
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import json
+import math
+import time
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
-from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 
 from app.database import get_db
+from app.responses import dump_json, json_response
+from app.models.job import ValidationJob
 from app.models.report import ValidationReport
-from app.services.llm_service import validate_idea
-from app.services.token_service import check_can_generate, use_generation
-from app.metrics import (
-    core_function_calls,
-    tokens_consumed,
-    free_trial_used,
+from app.models.types import is_uuid
+from app.config import get_settings
+from app.services.llm_service import (
+    validate_idea,
+    stream_validate_idea,
+    active_prompt_version,
+    REPORT_SECTIONS,
 )
+from app.services.admission import AdmissionRejected, admission_controller
+from app.services.job_service import job_pool
+from app.services.report_cache import CachedReport, etag_matches, report_cache, serialize_report
+from app.services.resilience import CircuitOpenError
+from app.services.result_cache import cache_key, get_result_cache
+from app.services.report_service import ReportEntry, record_validation, record_validations
+from app.services.token_service import (
+    CreditReservation,
+    release_credit,
+    release_credits,
+    reserve_credit,
+    reserve_credits,
+)
+from app.metrics import validation_time_to_first_section
 
 router = APIRouter(prefix="/api/v1", tags=["validation"])
+settings = get_settings()
 
 
 class ValidateRequest(BaseModel):
@@ -37,89 +62,410 @@ class ValidateResponse(BaseModel):
     summary: str
 
 
+class BatchValidateRequest(BaseModel):
+    """Request schema for batch validation."""
+    items: List[ValidateRequest] = Field(..., min_length=1, max_length=settings.batch_max_items)
+
+
+def _idea_cache_key(request: ValidateRequest) -> str:
+    return cache_key(
+        request.idea_title,
+        request.idea_description,
+        request.language,
+        settings.llm_model,
+        active_prompt_version(),
+    )
+
+
+async def _record_validation(
+    db: AsyncSession,
+    request: ValidateRequest,
+    reservation: CreditReservation,
+    result: dict,
+) -> ValidationReport:
+    """Save the report, keeping the reserved credit, and track metrics."""
+    return await record_validation(
+        db,
+        reservation,
+        request.idea_title,
+        request.idea_description,
+        request.language,
+        result,
+    )
+
+
+UNAVAILABLE_DETAIL = "Validation service is temporarily unavailable. Please try again shortly."
+
+
+def _service_unavailable(retry_after: float) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail=UNAVAILABLE_DETAIL,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+def _report_body(report_id: str, result: dict) -> dict:
+    """Response body of a stored report; sections were validated when parsed."""
+    return {
+        "report_id": report_id,
+        "overall_score": result.get("overall_score", 0),
+        "market_analysis": result.get("market_analysis", {}),
+        "competition_analysis": result.get("competition_analysis", {}),
+        "technical_feasibility": result.get("technical_feasibility", {}),
+        "business_model": result.get("business_model", {}),
+        "risks": result.get("risks", {}),
+        "suggestions": result.get("suggestions", {}),
+        "summary": result.get("summary", ""),
+    }
+
+
+async def _reserve_credit(db: AsyncSession, device_id: str) -> CreditReservation:
+    """Take one credit up front. The caller commits."""
+    if not device_id:
+        raise HTTPException(status_code=400, detail="Device ID is required")
+    
+    reservation = await reserve_credit(db, device_id)
+    if reservation is None:
+        raise HTTPException(
+            status_code=402,
+            detail="No generation credits remaining. Please purchase more validations."
+        )
+    return reservation
+
+
+async def _release_credit(db: AsyncSession, reservation: CreditReservation):
+    """Return the credit of a validation that did not produce a report."""
+    await db.rollback()
+    await release_credit(db, reservation)
+    await db.commit()
+
+
 @router.post("/validate", response_model=ValidateResponse)
 async def validate_startup_idea(
     request: ValidateRequest,
     device_id: str = "",
-    db: Session = Depends(get_db),
+    no_cache: bool = False,
+    mode: str = Query(default="sync", pattern="^(sync|async)$"),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Validate a startup idea using AI analysis.
     
-    Requires either free trial or paid tokens.
+    Requires either free trial or paid tokens. Identical ideas are served
+    from the result cache unless ``no_cache`` is set. With ``mode=async``
+    the validation is queued and a job id is returned immediately; poll
+    ``GET /api/v1/jobs/{job_id}`` for the result.
+    
+    The credit is reserved before the LLM call and given back if no
+    report is produced.
+    """
+    reservation = await _reserve_credit(db, device_id)
+    
+    if mode == "async":
+        job = ValidationJob(
+            idea_title=request.idea_title,
+            idea_description=request.idea_description,
+            language=request.language,
+            device_id=device_id,
+            credit=reservation.kind,
+        )
+        db.add(job)
+        await db.commit()
+        job_pool.submit(job.id)
+        return json_response(
+            {"job_id": job.id, "status": job.status},
+            status_code=202,
+            headers={"Location": f"/api/v1/jobs/{job.id}"},
+        )
+    
+    # Commit the reservation before the long LLM call
+    await db.commit()
+    
+    try:
+        result_cache = get_result_cache()
+        key = _idea_cache_key(request)
+        result = None if no_cache else await result_cache.get(db, key)
+        
+        if result is None:
+            # Call LLM for validation
+            async with admission_controller.slot():
+                result = await validate_idea(
+                    title=request.idea_title,
+                    description=request.idea_description,
+                    language=request.language,
+                )
+            await result_cache.set(db, key, result)
+        
+        report = await _record_validation(db, request, reservation, result)
+        
+    except (AdmissionRejected, CircuitOpenError) as e:
+        await _release_credit(db, reservation)
+        raise _service_unavailable(e.retry_after)
+    except Exception as e:
+        await _release_credit(db, reservation)
+        raise HTTPException(status_code=500, detail=f"Validation failed: {str(e)}")
+    
+    return json_response(_report_body(report.id, result))
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/validate/stream")
+async def validate_startup_idea_stream(
+    request: ValidateRequest,
+    device_id: str = "",
+    no_cache: bool = False,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Validate a startup idea and stream report sections as server-sent events.
+    
+    Emits one ``section`` event per top-level report field as soon as the
+    model finishes it, then a ``complete`` event with the saved report id.
+    The reserved credit is given back unless the full report is stored.
+    """
+    reservation = await _reserve_credit(db, device_id)
+    await db.commit()
+    started = time.perf_counter()
+    result_cache = get_result_cache()
+    key = _idea_cache_key(request)
+    cached = None if no_cache else await result_cache.get(db, key)
+    
+    # Take the LLM slot before the response starts so overload is a real 503
+    ticket = None
+    if cached is None:
+        try:
+            ticket = await admission_controller.acquire()
+        except AdmissionRejected as e:
+            await _release_credit(db, reservation)
+            raise _service_unavailable(e.retry_after)
+    
+    stored = False
+    
+    async def events():
+        nonlocal stored
+        first_section = True
+        try:
+            result = {}
+            if cached is not None:
+                for name in REPORT_SECTIONS:
+                    if name in cached:
+                        result[name] = cached[name]
+                        yield _sse("section", {"name": name, "data": cached[name]})
+            else:
+                usage = {}
+                async for name, value in stream_validate_idea(
+                    title=request.idea_title,
+                    description=request.idea_description,
+                    language=request.language,
+                    usage=usage,
+                ):
+                    if first_section:
+                        validation_time_to_first_section.labels(
+                            tool="idea-validator"
+                        ).observe(time.perf_counter() - started)
+                        first_section = False
+                    result[name] = value
+                    yield _sse("section", {"name": name, "data": value})
+                ticket.release()
+                result["usage"] = usage
+                await result_cache.set(db, key, result)
+            
+            # The request-scoped session has been released by now; the
+            # AsyncSession reopens a connection on demand.
+            report = await _record_validation(db, request, reservation, result)
+            stored = True
+            yield _sse("complete", {
+                "report_id": report.id,
+                "overall_score": result.get("overall_score", 0),
+            })
+        except Exception as e:
+            yield _sse("error", {"detail": f"Validation failed: {str(e)}"})
+    
+    async def settle():
+        # Runs after the stream ends, including on client disconnect
+        if ticket is not None:
+            ticket.release()
+        if not stored:
+            await _release_credit(db, reservation)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(settle),
+    )
+
+
+def _batch_error(index: int, error: Exception) -> dict:
+    if isinstance(error, (AdmissionRejected, CircuitOpenError)):
+        detail = UNAVAILABLE_DETAIL
+    else:
+        detail = f"Validation failed: {str(error)}"
+    return {"index": index, "status": "error", "detail": detail}
+
+
+@router.post("/validate/batch")
+async def validate_startup_ideas_batch(
+    request: BatchValidateRequest,
+    device_id: str = "",
+    no_cache: bool = False,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Validate several startup ideas and stream the results as NDJSON.
+    
+    One credit per idea is reserved up front, all or none. Up to
+    ``BATCH_CONCURRENCY`` of the batch's LLM calls run at once, each also
+    holding an admission slot. Each idea gets one line once its report is
+    stored, in completion order: ``{"index", "status": "ok", ...report}``
+    or ``{"index", "status": "error", "detail"}``, followed by a final
+    ``{"status": "complete", "succeeded", "failed"}`` line.
+    
+    Reports that finish together are stored with one bulk INSERT. Credits
+    of ideas without a stored report are given back when the stream ends,
+    including on client disconnect.
     """
     if not device_id:
         raise HTTPException(status_code=400, detail="Device ID is required")
     
-    # Check if user can generate
-    can_generate, reason = check_can_generate(db, device_id)
-    if not can_generate:
+    items = request.items
+    reservations = await reserve_credits(db, device_id, len(items))
+    if reservations is None:
         raise HTTPException(
             status_code=402,
-            detail="No generation credits remaining. Please purchase more validations."
+            detail=f"Not enough generation credits for {len(items)} ideas. Please purchase more validations."
         )
+    await db.commit()
     
-    try:
-        # Call LLM for validation
-        result = await validate_idea(
-            title=request.idea_title,
-            description=request.idea_description,
-            language=request.language,
-        )
-        
-        # Consume token
-        use_generation(db, device_id)
-        
-        # Track metrics
-        core_function_calls.labels(tool="idea-validator").inc()
-        if reason == "free_trial":
-            free_trial_used.labels(tool="idea-validator").inc()
+    unsettled = dict(enumerate(reservations))
+    tasks = []
+    semaphore = asyncio.Semaphore(settings.batch_concurrency)
+    
+    async def run(index: int, item: ValidateRequest, done: asyncio.Queue):
+        try:
+            async with semaphore, admission_controller.slot():
+                result = await validate_idea(
+                    title=item.idea_title,
+                    description=item.idea_description,
+                    language=item.language,
+                )
+        except Exception as e:
+            done.put_nowait((index, None, e))
         else:
-            tokens_consumed.labels(tool="idea-validator").inc()
+            done.put_nowait((index, result, None))
+    
+    async def lines():
+        result_cache = get_result_cache()
+        keys = [_idea_cache_key(item) for item in items]
+        done = asyncio.Queue()
+        fresh = set()
         
-        # Save report to database
-        report = ValidationReport(
-            idea_title=request.idea_title,
-            idea_description=request.idea_description,
-            language=request.language,
-            overall_score=result.get("overall_score", 0),
-            market_analysis=result.get("market_analysis"),
-            competition_analysis=result.get("competition_analysis"),
-            technical_feasibility=result.get("technical_feasibility"),
-            business_model=result.get("business_model"),
-            risks=result.get("risks"),
-            suggestions=result.get("suggestions"),
-            summary=result.get("summary", ""),
-            device_id=device_id,
-        )
-        db.add(report)
-        db.commit()
-        db.refresh(report)
+        # Cache lookups share the request session, so they run here, in order
+        for index, item in enumerate(items):
+            cached = None if no_cache else await result_cache.get(db, keys[index])
+            if cached is not None:
+                done.put_nowait((index, cached, None))
+            else:
+                fresh.add(index)
+                tasks.append(asyncio.create_task(run(index, item, done)))
         
-        return ValidateResponse(
-            report_id=report.id,
-            overall_score=result.get("overall_score", 0),
-            market_analysis=result.get("market_analysis", {}),
-            competition_analysis=result.get("competition_analysis", {}),
-            technical_feasibility=result.get("technical_feasibility", {}),
-            business_model=result.get("business_model", {}),
-            risks=result.get("risks", {}),
-            suggestions=result.get("suggestions", {}),
-            summary=result.get("summary", ""),
-        )
+        failed = 0
+        remaining = len(items)
+        while remaining:
+            finished = [await done.get()]
+            while not done.empty():
+                finished.append(done.get_nowait())
+            remaining -= len(finished)
+            
+            out = [_batch_error(index, error) for index, _, error in finished if error is not None]
+            succeeded = [(index, result) for index, result, error in finished if error is None]
+            if succeeded:
+                try:
+                    for index, result in succeeded:
+                        if index in fresh:
+                            await result_cache.set(db, keys[index], result)
+                    reports = await record_validations(db, [
+                        ReportEntry(
+                            unsettled[index],
+                            items[index].idea_title,
+                            items[index].idea_description,
+                            items[index].language,
+                            result,
+                        )
+                        for index, result in succeeded
+                    ])
+                except Exception as e:
+                    await db.rollback()
+                    out += [_batch_error(index, e) for index, _ in succeeded]
+                else:
+                    for (index, result), report in zip(succeeded, reports):
+                        del unsettled[index]
+                        out.append({"index": index, "status": "ok", **_report_body(report.id, result)})
+            
+            failed += sum(line["status"] == "error" for line in out)
+            yield b"".join(dump_json(line) + b"\n" for line in out)
         
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Validation failed: {str(e)}")
+        yield dump_json({"status": "complete", "succeeded": len(items) - failed, "failed": failed}) + b"\n"
+    
+    async def settle():
+        # Runs after the stream ends, including on client disconnect
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if unsettled:
+            await db.rollback()
+            await release_credits(db, list(unsettled.values()))
+            await db.commit()
+    
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(settle),
+    )
+
+
+def _report_response(entry: CachedReport, if_none_match: Optional[str]) -> Response:
+    headers = {
+        "ETag": entry.etag,
+        "Cache-Control": f"public, max-age={settings.report_cache_max_age_seconds}, immutable",
+    }
+    if etag_matches(if_none_match, entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
 
 
 @router.get("/reports/{report_id}")
-async def get_report(report_id: str, db: Session = Depends(get_db)):
-    """Get a validation report by ID."""
-    report = db.query(ValidationReport).filter(
-        ValidationReport.id == report_id
-    ).first()
+async def get_report(
+    report_id: str,
+    if_none_match: Optional[str] = Header(default=None),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get a validation report by ID.
     
-    if not report:
-        raise HTTPException(status_code=404, detail="Report not found")
+    Reports are immutable, so the serialized body is cached in process
+    and sent with a strong ETag and a long ``Cache-Control``. A matching
+    ``If-None-Match`` gets ``304 Not Modified``.
+    """
+    entry = report_cache.get(report_id)
+    if entry is None:
+        if not is_uuid(report_id):
+            raise HTTPException(status_code=404, detail="Report not found")
+        
+        result = await db.execute(
+            select(ValidationReport).where(ValidationReport.id == report_id)
+        )
+        report = result.scalars().first()
+        
+        if not report:
+            raise HTTPException(status_code=404, detail="Report not found")
+        
+        entry = serialize_report(report)
+        report_cache.set(report_id, entry)
     
-    return report.to_dict()
+    return _report_response(entry, if_none_match)
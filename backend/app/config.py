@@ -16,14 +16,108 @@ class Settings(BaseSettings):
     llm_proxy_url: str = "https://llm-proxy.densematrix.ai"
     llm_proxy_key: str = ""
     llm_model: str = "anthropic/claude-sonnet-4-20250514"
+    llm_timeout_seconds: float = 120.0
+    llm_connect_timeout_seconds: float = 10.0
+    # Completion budget: sized from the report schema, language and
+    # description length, never above llm_max_tokens
+    llm_max_tokens: int = 4000
+    llm_adaptive_max_tokens: bool = True
+    
+    # Admission control for in-flight LLM validations
+    validation_max_concurrency: int = 32
+    validation_max_queue: int = 64
+    validation_queue_timeout_seconds: float = 10.0
+    
+    # Reset interrupted jobs in the app lifespan. The gunicorn config turns
+    # this off and runs it once in the master. Tables come from Alembic.
+    startup_tasks_enabled: bool = True
+    
+    # Background workers for ?mode=async validations
+    job_workers: int = 4
+    
+    # POST /api/v1/validate/batch: ideas per request, and how many of a
+    # batch's LLM calls run at once (each also takes an admission slot)
+    batch_max_items: int = 50
+    batch_concurrency: int = 4
+    
+    # LLM proxy resilience
+    llm_retry_attempts: int = 2
+    llm_retry_backoff_seconds: float = 0.5
+    llm_retry_backoff_max_seconds: float = 8.0
+    llm_hedge_enabled: bool = False
+    llm_hedge_min_samples: int = 20
+    llm_hedge_min_delay_seconds: float = 1.0
+    llm_circuit_failure_threshold: int = 5
+    llm_circuit_recovery_seconds: float = 30.0
+    # Identical concurrent validations share one upstream call
+    llm_coalesce_enabled: bool = True
+    
+    # Per-section fan-out mode (one concurrent LLM call per report section)
+    llm_fanout_enabled: bool = False
+    llm_fanout_concurrency: int = 4
+    llm_section_timeout_seconds: float = 60.0
+    llm_section_retries: int = 1
+    
+    # Upstream HTTP connection pools
+    llm_max_connections: int = 100
+    llm_max_keepalive_connections: int = 20
+    llm_keepalive_expiry_seconds: float = 30.0
+    llm_http2: bool = False
+    creem_api_url: str = "https://api.creem.io"
+    creem_timeout_seconds: float = 30.0
+    creem_max_connections: int = 10
+    creem_max_keepalive_connections: int = 5
+    
+    # Token balance cache for /api/v1/tokens/status (0 disables)
+    token_status_cache_ttl_seconds: float = 30.0
+    token_status_cache_max_entries: int = 10000
+    
+    # Serialize report-returning responses with orjson
+    orjson_responses: bool = False
+    
+    # Report storage: "columns" (one JSON column per section) or "packed"
+    # (the whole report as one zlib-compressed blob)
+    report_storage: str = "columns"
+    report_compression_level: int = 6
+    
+    # Shared report links: serialized report cache (0 disables) and the
+    # Cache-Control max-age for nginx and CDNs. Reports never change.
+    report_cache_max_entries: int = 1000
+    report_cache_max_age_seconds: int = 31536000
+    
+    # LLM result cache (memory, database or none)
+    result_cache_backend: str = "memory"
+    result_cache_ttl_seconds: int = 86400
+    result_cache_max_entries: int = 1000
     
     # Database
     database_url: str = "sqlite:///./app.db"
+    db_pool_size: int = 8
+    db_max_overflow: int = 4
+    db_pool_timeout_seconds: float = 30.0
+    # Server databases (PostgreSQL): check connections before use and
+    # replace them before server or proxy idle timeouts close them
+    db_pool_pre_ping: bool = True
+    db_pool_recycle_seconds: int = 1800
+    
+    # SQLite profile, applied to every new connection. WAL lets readers
+    # run alongside the single writer; an empty journal mode leaves the
+    # database default, 0 skips the size pragmas.
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_cache_size_kib: int = 65536
+    sqlite_mmap_size_bytes: int = 268435456
     
     # Creem Payment
     creem_api_key: str = ""
     creem_webhook_secret: str = ""
     creem_product_ids: str = "{}"
+    # Fast-ack webhooks: store the event, answer 202 and apply events in
+    # background batches instead of inside the request
+    payment_webhook_fast_ack: bool = False
+    payment_webhook_batch_size: int = 100
+    payment_webhook_poll_seconds: float = 5.0
     
     # Frontend URL (for CORS and redirects)
     frontend_url: str = "https://idea-validator.demo.densematrix.ai"
@@ -1,30 +1,112 @@
 """Database configuration and session management."""
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
 from app.config import get_settings
 
 settings = get_settings()
 
-engine = create_engine(
-    settings.database_url,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {}
-)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+}
+
+
+def to_async_url(url: str) -> str:
+    """Map a database URL to its async driver (aiosqlite / asyncpg)."""
+    if url.startswith("postgres://"):
+        url = "postgresql://" + url[len("postgres://"):]
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"Unsupported database dialect for async engine: {backend}")
+    return parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(
+        hide_password=False
+    )
+
+
+def sqlite_pragmas() -> list:
+    """PRAGMA statements of the configured SQLite profile."""
+    pragmas = []
+    if settings.sqlite_journal_mode:
+        pragmas.append(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+    if settings.sqlite_synchronous:
+        pragmas.append(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+    pragmas.append(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+    if settings.sqlite_cache_size_kib:
+        # Negative values are KiB rather than pages
+        pragmas.append(f"PRAGMA cache_size=-{int(settings.sqlite_cache_size_kib)}")
+    if settings.sqlite_mmap_size_bytes:
+        pragmas.append(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size_bytes)}")
+    return pragmas
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for pragma in sqlite_pragmas():
+        cursor.execute(pragma)
+    cursor.close()
+
+
+def configure_sqlite(db_engine: AsyncEngine):
+    """Apply the SQLite profile to every connection ``db_engine`` opens."""
+    event.listen(db_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+
+
+def build_engine(url: str) -> AsyncEngine:
+    """
+    Create the async engine for ``url``.
+    
+    Server databases (PostgreSQL) get a pool sized from Settings with
+    pre-ping and recycling. File-backed SQLite gets the pragma profile and a bounded connection
+    pool instead of aiosqlite's default NullPool, so connections (and
+    their page cache) are reused rather than reopened per session. WAL
+    allows concurrent readers, while writers queue on the busy timeout
+    instead of failing with "database is locked".
+    """
+    url = to_async_url(url)
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "sqlite":
+        return create_async_engine(
+            url,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout_seconds,
+            pool_pre_ping=settings.db_pool_pre_ping,
+            pool_recycle=settings.db_pool_recycle_seconds,
+        )
+    
+    if parsed.database in (None, "", ":memory:"):
+        db_engine = create_async_engine(url)
+    else:
+        db_engine = create_async_engine(
+            url,
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout_seconds,
+        )
+    configure_sqlite(db_engine)
+    return db_engine
+
+
+engine = build_engine(settings.database_url)
+
+SessionLocal = async_sessionmaker(
+    bind=engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
 
 Base = declarative_base()
 
 
-def get_db():
+async def get_db():
     """Get database session."""
-    db = SessionLocal()
-    try:
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
-
 
-def init_db():
-    """Initialize database tables."""
-    from app.models import report, token, payment  # noqa: F401
-    Base.metadata.create_all(bind=engine)
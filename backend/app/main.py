@@ -1,35 +1,49 @@
 """Main FastAPI application."""
-import time
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import get_settings
-from app.database import init_db
+from app.database import engine
+from app.services.http_client import init_http_clients, close_http_clients
+from app.services.job_service import job_pool
+from app.services.payment_service import webhook_applier
 from app.api.v1.validate import router as validate_router
 from app.api.v1.tokens import router as tokens_router
 from app.api.v1.payment import router as payment_router
-from app.metrics import (
-    metrics_router,
-    http_requests,
-    http_request_duration,
-    crawler_visits,
-)
+from app.api.v1.jobs import router as jobs_router
+from app.metrics import metrics_router
+from app.middleware import MetricsMiddleware
 
 settings = get_settings()
 
-# Bot detection patterns
-BOT_PATTERNS = ["Googlebot", "bingbot", "Baiduspider", "YandexBot", "DuckDuckBot", "Slurp", "facebookexternalhit"]
+
+async def run_startup_tasks():
+    """
+    One-off startup work; must run once per deployment, not per worker.
+    
+    The schema is managed by Alembic (``alembic upgrade head``), so no DDL
+    runs here.
+    """
+    await job_pool.reset_interrupted()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan handler."""
     # Startup
-    init_db()
+    if settings.startup_tasks_enabled:
+        await run_startup_tasks()
+    await init_http_clients()
+    await job_pool.start()
+    if settings.payment_webhook_fast_ack:
+        await webhook_applier.start()
     yield
     # Shutdown
-    pass
+    await webhook_applier.stop()
+    await job_pool.stop()
+    await close_http_clients()
+    await engine.dispose()
 
 
 app = FastAPI(
@@ -52,47 +66,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-
-@app.middleware("http")
-async def metrics_middleware(request: Request, call_next):
-    """Track request metrics."""
-    start_time = time.time()
-    
-    # Track crawler visits
-    ua = request.headers.get("user-agent", "")
-    for bot in BOT_PATTERNS:
-        if bot.lower() in ua.lower():
-            crawler_visits.labels(tool=settings.tool_name, bot=bot).inc()
-            break
-    
-    response = await call_next(request)
-    
-    # Track request metrics
-    duration = time.time() - start_time
-    endpoint = request.url.path
-    method = request.method
-    status = response.status_code
-    
-    http_requests.labels(
-        tool=settings.tool_name,
-        endpoint=endpoint,
-        method=method,
-        status=status
-    ).inc()
-    
-    http_request_duration.labels(
-        tool=settings.tool_name,
-        endpoint=endpoint,
-        method=method
-    ).observe(duration)
-    
-    return response
+# Request metrics
+app.add_middleware(MetricsMiddleware, tool=settings.tool_name)
 
 
 # Include routers
 app.include_router(validate_router)
 app.include_router(tokens_router)
 app.include_router(payment_router)
+app.include_router(jobs_router)
 app.include_router(metrics_router)
 
 
@@ -1,6 +1,14 @@
 """Prometheus metrics for monitoring."""
 import os
-from prometheus_client import Counter, Histogram, Gauge, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    Gauge,
+    generate_latest,
+    multiprocess,
+    CONTENT_TYPE_LATEST,
+)
 from fastapi import APIRouter
 from fastapi.responses import Response
 
@@ -32,6 +40,12 @@ payment_revenue_cents = Counter(
     ["tool"]
 )
 
+payment_webhook_events = Counter(
+    "payment_webhook_events_total",
+    "Creem webhook events by outcome",
+    ["tool", "result"]
+)
+
 # Token metrics
 tokens_consumed = Counter(
     "tokens_consumed_total",
@@ -52,6 +66,123 @@ core_function_calls = Counter(
     ["tool"]
 )
 
+validation_time_to_first_section = Histogram(
+    "validation_time_to_first_section_seconds",
+    "Time from request to the first streamed report section",
+    ["tool"],
+    buckets=(0.5, 1, 2, 3, 5, 8, 13, 20, 30, 60, 120)
+)
+
+llm_json_repairs = Counter(
+    "llm_json_repairs_total",
+    "Repairs applied while parsing LLM report JSON",
+    ["tool", "repair"]
+)
+
+# LLM proxy resilience metrics
+llm_circuit_state = Gauge(
+    "llm_circuit_state",
+    "LLM proxy circuit breaker state (0=closed, 1=half_open, 2=open)",
+    ["tool"],
+    multiprocess_mode="livemax"
+)
+
+llm_circuit_rejections = Counter(
+    "llm_circuit_rejections_total",
+    "LLM calls rejected by the open circuit breaker",
+    ["tool"]
+)
+
+llm_upstream_retries = Counter(
+    "llm_upstream_retries_total",
+    "Retried LLM proxy calls",
+    ["tool"]
+)
+
+llm_hedged_requests = Counter(
+    "llm_hedged_requests_total",
+    "Hedged (duplicate) LLM proxy requests sent",
+    ["tool"]
+)
+
+llm_tokens = Counter(
+    "llm_tokens_total",
+    "LLM tokens sent (input) and generated (output)",
+    ["tool", "direction", "prompt_version"]
+)
+
+llm_completion_duration = Histogram(
+    "llm_completion_duration_seconds",
+    "Upstream LLM time per generated report",
+    ["tool", "prompt_version"],
+    buckets=(1, 2, 5, 10, 15, 20, 30, 45, 60, 90, 120)
+)
+
+llm_coalesced_requests = Counter(
+    "llm_coalesced_requests_total",
+    "Validations that joined an identical LLM call already in flight",
+    ["tool"]
+)
+
+# Validation admission metrics
+validation_in_flight = Gauge(
+    "validation_in_flight",
+    "LLM validations currently running",
+    ["tool"],
+    multiprocess_mode="livesum"
+)
+
+validation_queue_depth = Gauge(
+    "validation_queue_depth",
+    "Validations waiting for an LLM slot",
+    ["tool"],
+    multiprocess_mode="livesum"
+)
+
+validation_queue_wait = Histogram(
+    "validation_queue_wait_seconds",
+    "Time spent waiting for an LLM slot",
+    ["tool"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30)
+)
+
+validation_admission_rejections = Counter(
+    "validation_admission_rejections_total",
+    "Validations rejected by the admission controller",
+    ["tool", "reason"]
+)
+
+validation_jobs = Counter(
+    "validation_jobs_total",
+    "Finished asynchronous validation jobs",
+    ["tool", "status"]
+)
+
+token_status_cache_requests = Counter(
+    "token_status_cache_requests_total",
+    "Token balance cache lookups",
+    ["tool", "result"]
+)
+
+report_cache_requests = Counter(
+    "report_cache_requests_total",
+    "Serialized report cache lookups",
+    ["tool", "result"]
+)
+
+# LLM result cache metrics
+llm_cache_requests = Counter(
+    "llm_cache_requests_total",
+    "LLM result cache lookups",
+    ["tool", "result"]
+)
+
+llm_cache_evictions = Counter(
+    "llm_cache_evictions_total",
+    "LLM result cache evictions",
+    ["tool", "reason"]
+)
+
 # SEO metrics
 page_views = Counter(
     "page_views_total",
@@ -68,7 +199,8 @@ crawler_visits = Counter(
 programmatic_pages = Gauge(
     "programmatic_pages_count",
     "Number of programmatic SEO pages",
-    ["tool"]
+    ["tool"],
+    multiprocess_mode="max"
 )
 
 # Create router
@@ -77,5 +209,14 @@ metrics_router = APIRouter()
 
 @metrics_router.get("/metrics")
 async def metrics():
-    """Prometheus metrics endpoint."""
+    """
+    Prometheus metrics endpoint.
+    
+    Under multiple workers (PROMETHEUS_MULTIPROC_DIR set) the samples of
+    every worker are merged, so any worker can answer the scrape.
+    """
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
     return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,74 @@
+"""ASGI middleware."""
+import re
+import time
+from app.metrics import http_requests, http_request_duration, crawler_visits
+
+# Bot detection patterns
+BOT_PATTERNS = ["Googlebot", "bingbot", "Baiduspider", "YandexBot", "DuckDuckBot", "Slurp", "facebookexternalhit"]
+
+BOT_REGEX = re.compile("|".join(re.escape(bot) for bot in BOT_PATTERNS), re.IGNORECASE)
+_BOT_NAMES = {bot.lower(): bot for bot in BOT_PATTERNS}
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def match_bot(user_agent: str):
+    """Return the canonical bot name for a User-Agent, or None."""
+    match = BOT_REGEX.search(user_agent)
+    return _BOT_NAMES[match.group(0).lower()] if match else None
+
+
+class MetricsMiddleware:
+    """
+    Track request counts, latency and crawler visits.
+
+    Pure ASGI so it adds no task or body buffering per request. Requests
+    are labelled with the matched route template (``/api/v1/reports/{report_id}``)
+    rather than the raw path, which keeps the number of series bounded.
+    """
+
+    def __init__(self, app, tool: str):
+        self.app = app
+        self.tool = tool
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+
+        # Track crawler visits
+        for name, value in scope["headers"]:
+            if name == b"user-agent":
+                bot = match_bot(value.decode("latin-1"))
+                if bot:
+                    crawler_visits.labels(tool=self.tool, bot=bot).inc()
+                break
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router stores the matched route in the shared scope
+            route = scope.get("route")
+            endpoint = getattr(route, "path", UNMATCHED_ROUTE)
+            method = scope["method"]
+            http_requests.labels(
+                tool=self.tool,
+                endpoint=endpoint,
+                method=method,
+                status=status
+            ).inc()
+            http_request_duration.labels(
+                tool=self.tool,
+                endpoint=endpoint,
+                method=method
+            ).observe(time.perf_counter() - start)
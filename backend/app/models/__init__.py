@@ -2,5 +2,8 @@
 from app.models.report import ValidationReport
 from app.models.token import GenerationToken
 from app.models.payment import PaymentTransaction
+from app.models.cache import ValidationCacheEntry
+from app.models.job import ValidationJob
+from app.models.webhook import WebhookEvent
 
-__all__ = ["ValidationReport", "GenerationToken", "PaymentTransaction"]
+__all__ = ["ValidationReport", "GenerationToken", "PaymentTransaction", "ValidationCacheEntry", "ValidationJob", "WebhookEvent"]
@@ -0,0 +1,18 @@
+"""Cached LLM validation result model."""
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime
+from app.database import Base
+from app.models.types import JSONDocument
+
+
+class ValidationCacheEntry(Base):
+    """LLM validation result keyed by a hash of the normalized request."""
+    
+    __tablename__ = "validation_cache"
+    
+    key = Column(String(64), primary_key=True)
+    result = Column(JSONDocument, nullable=False)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    last_accessed_at = Column(DateTime, default=datetime.utcnow, index=True)
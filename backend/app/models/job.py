@@ -0,0 +1,51 @@
+"""Asynchronous validation job model."""
+from datetime import datetime
+from sqlalchemy import Column, String, Text, Integer, DateTime, Index
+from app.database import Base
+from app.models.types import UUIDString, new_id
+
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+
+class ValidationJob(Base):
+    """A validation queued for the background worker pool."""
+    
+    __tablename__ = "validation_jobs"
+    __table_args__ = (
+        # Oldest pending jobs first; also serves the running-job reset
+        Index("ix_validation_jobs_status_created_at", "status", "created_at"),
+    )
+    
+    id = Column(UUIDString, primary_key=True, default=new_id)
+    status = Column(String(16), nullable=False, default=JOB_PENDING)
+    
+    # Request
+    idea_title = Column(String(255), nullable=False)
+    idea_description = Column(Text, nullable=False)
+    language = Column(String(10), default="en")
+    device_id = Column(String(64), nullable=False)
+    credit = Column(String(16), nullable=False)  # reserved credit: free_trial or paid
+    
+    # Outcome
+    report_id = Column(UUIDString, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, default=0)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    
+    def to_dict(self):
+        """Convert to dictionary."""
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "report_id": self.report_id,
+            "error": self.error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
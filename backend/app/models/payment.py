@@ -1,16 +1,20 @@
 """Payment transaction model."""
-import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Integer, DateTime, JSON
+from sqlalchemy import Column, String, Integer, DateTime, Index
 from app.database import Base
+from app.models.types import JSONDocument, UUIDString, new_id
 
 
 class PaymentTransaction(Base):
     """Payment transaction record."""
     
     __tablename__ = "payment_transactions"
+    __table_args__ = (
+        # Pending / failed payments by age
+        Index("ix_payment_transactions_status_created_at", "status", "created_at"),
+    )
     
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(UUIDString, primary_key=True, default=new_id)
     checkout_id = Column(String(64), unique=True, nullable=False, index=True)
     device_id = Column(String(64), nullable=False, index=True)
     product_sku = Column(String(64), nullable=False)
@@ -22,7 +26,7 @@ class PaymentTransaction(Base):
     
     # Creem data
     creem_order_id = Column(String(64), nullable=True)
-    webhook_data = Column(JSON, nullable=True)
+    webhook_data = Column(JSONDocument, nullable=True)
     
     created_at = Column(DateTime, default=datetime.utcnow)
     completed_at = Column(DateTime, nullable=True)
@@ -1,36 +1,104 @@
 """Validation report model."""
-import uuid
+import json
+import zlib
 from datetime import datetime
-from sqlalchemy import Column, String, Text, Integer, DateTime, JSON
+from sqlalchemy import Column, String, Text, Integer, DateTime, LargeBinary, Index
 from app.database import Base
+from app.models.types import JSONDocument, UUIDString, new_id
+
+# Report content held in ``payload`` in the packed storage format
+PACKED_FIELDS = (
+    "market_analysis",
+    "competition_analysis",
+    "technical_feasibility",
+    "business_model",
+    "risks",
+    "suggestions",
+    "summary",
+)
+
+
+def dump_json(data: dict) -> bytes:
+    """Canonical compact JSON, byte-identical to what JSONResponse sends."""
+    return json.dumps(
+        data,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
 
 
 class ValidationReport(Base):
     """Validation report database model."""
     
     __tablename__ = "validation_reports"
+    __table_args__ = (
+        # A device's reports, newest first
+        Index("ix_validation_reports_device_id_created_at", "device_id", "created_at"),
+    )
     
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(UUIDString, primary_key=True, default=new_id)
     idea_title = Column(String(255), nullable=False)
     idea_description = Column(Text, nullable=False)
     language = Column(String(10), default="en")
     
     # Report content
     overall_score = Column(Integer, nullable=True)  # 0-100
-    market_analysis = Column(JSON, nullable=True)
-    competition_analysis = Column(JSON, nullable=True)
-    technical_feasibility = Column(JSON, nullable=True)
-    business_model = Column(JSON, nullable=True)
-    risks = Column(JSON, nullable=True)
-    suggestions = Column(JSON, nullable=True)
+    market_analysis = Column(JSONDocument, nullable=True)
+    competition_analysis = Column(JSONDocument, nullable=True)
+    technical_feasibility = Column(JSONDocument, nullable=True)
+    business_model = Column(JSONDocument, nullable=True)
+    risks = Column(JSONDocument, nullable=True)
+    suggestions = Column(JSONDocument, nullable=True)
     summary = Column(Text, nullable=True)
     
+    # Packed storage: the whole serialized report, zlib-compressed. When
+    # set, the JSON columns and summary above are left empty.
+    payload = Column(LargeBinary, nullable=True)
+    
     # Metadata
     device_id = Column(String(64), nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    
+    # Generation cost: prompt version, and the tokens and upstream time of
+    # the LLM calls behind the report (empty for cached / coalesced results)
+    prompt_version = Column(String(32), nullable=True)
+    input_tokens = Column(Integer, nullable=True)
+    output_tokens = Column(Integer, nullable=True)
+    llm_duration_ms = Column(Integer, nullable=True)
     
     def to_dict(self):
         """Convert to dictionary."""
+        if self.payload is not None:
+            return json.loads(self.to_json())
+        return self._columns_dict()
+    
+    def to_json(self) -> bytes:
+        """Serialized ``to_dict``; packed reports skip decoding entirely."""
+        if self.payload is not None:
+            return zlib.decompress(self.payload)
+        return dump_json(self._columns_dict())
+    
+    def pack(self, level: int = 6):
+        """
+        Move the report content into ``payload``.
+        
+        ``id`` and ``created_at`` are part of the payload, so they must be
+        set before packing a new report.
+        """
+        self.payload = zlib.compress(dump_json(self._columns_dict()), level)
+        for field in PACKED_FIELDS:
+            setattr(self, field, None)
+    
+    def unpack(self):
+        """Move the report content back into the separate columns."""
+        data = self.to_dict()
+        for field in PACKED_FIELDS:
+            setattr(self, field, data[field])
+        self.payload = None
+    
+    def _columns_dict(self):
         return {
             "id": self.id,
             "idea_title": self.idea_title,
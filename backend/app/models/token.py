@@ -1,8 +1,8 @@
 """Generation token model for payment tracking."""
-import uuid
 from datetime import datetime
 from sqlalchemy import Column, String, Integer, DateTime, Boolean
 from app.database import Base
+from app.models.types import UUIDString, new_id
 
 
 class GenerationToken(Base):
@@ -10,8 +10,8 @@ class GenerationToken(Base):
     
     __tablename__ = "generation_tokens"
     
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    device_id = Column(String(64), nullable=False, index=True)
+    id = Column(UUIDString, primary_key=True, default=new_id)
+    device_id = Column(String(64), nullable=False, unique=True, index=True)
     tokens_total = Column(Integer, default=0)
     tokens_used = Column(Integer, default=0)
     free_trial_used = Column(Boolean, default=False)
@@ -20,7 +20,7 @@ class GenerationToken(Base):
     payment_id = Column(String(64), nullable=True)
     product_sku = Column(String(64), nullable=True)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     @property
@@ -0,0 +1,33 @@
+"""Column types that use native PostgreSQL types where available."""
+import uuid
+from sqlalchemy import JSON, String
+from sqlalchemy.dialects import postgresql
+
+# JSON documents: JSONB on PostgreSQL, JSON text elsewhere. None is
+# stored as SQL NULL rather than a JSON 'null'.
+JSONDocument = JSON(none_as_null=True).with_variant(
+    postgresql.JSONB(none_as_null=True), "postgresql"
+)
+
+# UUID keys, handled as strings in Python: native UUID on PostgreSQL,
+# the canonical 36-character form elsewhere.
+UUIDString = String(36).with_variant(postgresql.UUID(as_uuid=False), "postgresql")
+
+
+def new_id() -> str:
+    """Generate a primary key for a UUIDString column."""
+    return str(uuid.uuid4())
+
+
+def is_uuid(value: str) -> bool:
+    """
+    Whether ``value`` is a UUID.
+
+    PostgreSQL rejects malformed UUIDs in a query instead of matching no
+    rows, so ids from URLs are checked before they reach the database.
+    """
+    try:
+        uuid.UUID(value)
+    except (ValueError, TypeError, AttributeError):
+        return False
+    return True
@@ -0,0 +1,36 @@
+"""Received payment webhook events, for idempotency and deferred processing."""
+from datetime import datetime
+from sqlalchemy import Column, String, Text, DateTime, Index
+from app.database import Base
+from app.models.types import JSONDocument
+
+
+EVENT_RECEIVED = "received"
+EVENT_PROCESSED = "processed"
+EVENT_IGNORED = "ignored"
+EVENT_FAILED = "failed"
+
+
+class WebhookEvent(Base):
+    """
+    One Creem webhook delivery, keyed on its event or order id.
+
+    The primary key makes replays of an event no-ops. Events acknowledged
+    before processing (fast-ack mode) keep their payload until the batch
+    applier handles them.
+    """
+    
+    __tablename__ = "webhook_events"
+    __table_args__ = (
+        # Oldest received events first, for the batch applier
+        Index("ix_webhook_events_status_created_at", "status", "created_at"),
+    )
+    
+    id = Column(String(128), primary_key=True)
+    event_type = Column(String(64), nullable=True)
+    status = Column(String(16), nullable=False, default=EVENT_RECEIVED)
+    payload = Column(JSONDocument, nullable=True)
+    detail = Column(Text, nullable=True)  # why an event was ignored or failed
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    processed_at = Column(DateTime, nullable=True)
@@ -0,0 +1,28 @@
+"""JSON responses for the report-returning endpoints."""
+from typing import Optional
+from fastapi.responses import JSONResponse, ORJSONResponse
+from app.config import get_settings
+
+settings = get_settings()
+
+
+def response_class():
+    """ORJSONResponse when ``ORJSON_RESPONSES`` is on, else JSONResponse."""
+    return ORJSONResponse if settings.orjson_responses else JSONResponse
+
+
+def dump_json(content) -> bytes:
+    """Serialize plain JSON data the way ``json_response`` would."""
+    return response_class()(content).body
+
+
+def json_response(content, status_code: int = 200, headers: Optional[dict] = None):
+    """
+    Return already-validated JSON data without FastAPI's output pass.
+
+    Report data is validated once where the LLM output is parsed
+    (``ReportSchema``), so the ``response_model`` / ``jsonable_encoder``
+    walk over the nested sections is skipped. ``content`` must contain
+    only JSON types.
+    """
+    return response_class()(content, status_code=status_code, headers=headers)
@@ -0,0 +1,134 @@
+"""Admission control for in-flight LLM validations."""
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from app.config import get_settings
+from app.metrics import (
+    validation_in_flight,
+    validation_queue_depth,
+    validation_queue_wait,
+    validation_admission_rejections,
+)
+
+settings = get_settings()
+
+
+class AdmissionRejected(Exception):
+    """Raised when a validation cannot get an LLM slot in time."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"Validation rejected: {reason}")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionTicket:
+    """A held LLM slot. ``release`` is idempotent."""
+
+    def __init__(self, controller: "AdmissionController"):
+        self._controller = controller
+        self._released = False
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self._controller._release()
+
+
+class AdmissionController:
+    """
+    Bounds concurrent LLM validations.
+
+    Up to ``max_concurrency`` callers run at once; up to ``max_queue`` more
+    wait in FIFO order for at most ``queue_timeout_seconds``. Anyone beyond
+    that is rejected immediately.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int, queue_timeout_seconds: float):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.active = 0
+        self._waiters = deque()
+        self._publish()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def _publish(self):
+        validation_in_flight.labels(tool=settings.tool_name).set(self.active)
+        validation_queue_depth.labels(tool=settings.tool_name).set(len(self._waiters))
+
+    def _reject(self, reason: str):
+        validation_admission_rejections.labels(tool=settings.tool_name, reason=reason).inc()
+        raise AdmissionRejected(reason, self.queue_timeout_seconds)
+
+    async def acquire(self) -> AdmissionTicket:
+        """
+        Wait for an LLM slot.
+
+        Raises:
+            AdmissionRejected: If the queue is full or the wait times out
+        """
+        if self.active < self.max_concurrency and not self._waiters:
+            self.active += 1
+            self._publish()
+            return AdmissionTicket(self)
+        if len(self._waiters) >= self.max_queue:
+            self._reject("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._publish()
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter, timeout=self.queue_timeout_seconds)
+        except asyncio.TimeoutError:
+            self._reject("timeout")
+        except asyncio.CancelledError:
+            # The slot may have been handed over just before cancellation
+            if waiter.done() and not waiter.cancelled():
+                self._release()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            self._publish()
+            validation_queue_wait.labels(tool=settings.tool_name).observe(
+                time.perf_counter() - start
+            )
+        return AdmissionTicket(self)
+
+    def _release(self):
+        # Hand the slot straight to the next waiter so it cannot be stolen
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self._publish()
+                return
+        self.active -= 1
+        self._publish()
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold an LLM slot for the duration of the block."""
+        ticket = await self.acquire()
+        try:
+            yield ticket
+        finally:
+            ticket.release()
+
+
+def build_admission_controller() -> AdmissionController:
+    """Build the admission controller from settings."""
+    return AdmissionController(
+        settings.validation_max_concurrency,
+        settings.validation_max_queue,
+        settings.validation_queue_timeout_seconds,
+    )
+
+
+admission_controller = build_admission_controller()
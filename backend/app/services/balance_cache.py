@@ -0,0 +1,88 @@
+"""In-process cache of token balances served by the status endpoint."""
+import time
+from collections import OrderedDict
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.config import get_settings
+from app.metrics import token_status_cache_requests
+
+settings = get_settings()
+
+_CHANGED_DEVICES = "changed_token_devices"
+
+
+class BalanceCache:
+    """
+    LRU cache of ``get_token_status`` results with a per-entry TTL.
+
+    Only the read-only status endpoint uses it; credits are always
+    reserved against the database, so a stale entry can show an old
+    balance but never lets a device spend more than it has.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+        self._invalidations = 0
+
+    def snapshot(self) -> int:
+        """Marker to pass to ``set`` so a read that raced a write is dropped."""
+        return self._invalidations
+
+    def get(self, device_id: str) -> Optional[dict]:
+        entry = self._entries.get(device_id)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[device_id]
+            token_status_cache_requests.labels(tool=settings.tool_name, result="miss").inc()
+            return None
+        self._entries.move_to_end(device_id)
+        token_status_cache_requests.labels(tool=settings.tool_name, result="hit").inc()
+        return dict(entry[1])
+
+    def set(self, device_id: str, status: dict, snapshot: Optional[int] = None):
+        if self.ttl_seconds <= 0:
+            return
+        if snapshot is not None and snapshot != self._invalidations:
+            return
+        self._entries[device_id] = (time.monotonic() + self.ttl_seconds, dict(status))
+        self._entries.move_to_end(device_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, device_id: str):
+        self._invalidations += 1
+        self._entries.pop(device_id, None)
+
+    def clear(self):
+        self._invalidations += 1
+        self._entries.clear()
+
+
+balance_cache = BalanceCache(
+    settings.token_status_cache_max_entries,
+    settings.token_status_cache_ttl_seconds,
+)
+
+
+def mark_balance_changed(db: AsyncSession, device_id: str):
+    """
+    Invalidate a device's balance now and again when ``db`` commits, so a
+    status read between the write and the commit is not cached.
+    """
+    balance_cache.invalidate(device_id)
+    db.sync_session.info.setdefault(_CHANGED_DEVICES, set()).add(device_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session):
+    for device_id in session.info.pop(_CHANGED_DEVICES, ()):
+        balance_cache.invalidate(device_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back(session: Session):
+    session.info.pop(_CHANGED_DEVICES, None)
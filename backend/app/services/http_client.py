@@ -0,0 +1,74 @@
+"""Shared pooled HTTP clients for upstream services."""
+import httpx
+from typing import Optional
+from app.config import get_settings
+
+settings = get_settings()
+
+_llm_client: Optional[httpx.AsyncClient] = None
+_creem_client: Optional[httpx.AsyncClient] = None
+
+
+def build_llm_client() -> httpx.AsyncClient:
+    """Build the pooled client used for LLM proxy calls."""
+    return httpx.AsyncClient(
+        base_url=settings.llm_proxy_url,
+        timeout=httpx.Timeout(
+            settings.llm_timeout_seconds,
+            connect=settings.llm_connect_timeout_seconds,
+        ),
+        limits=httpx.Limits(
+            max_connections=settings.llm_max_connections,
+            max_keepalive_connections=settings.llm_max_keepalive_connections,
+            keepalive_expiry=settings.llm_keepalive_expiry_seconds,
+        ),
+        http2=settings.llm_http2,
+    )
+
+
+def build_creem_client() -> httpx.AsyncClient:
+    """Build the pooled client used for Creem API calls."""
+    return httpx.AsyncClient(
+        base_url=settings.creem_api_url,
+        timeout=settings.creem_timeout_seconds,
+        limits=httpx.Limits(
+            max_connections=settings.creem_max_connections,
+            max_keepalive_connections=settings.creem_max_keepalive_connections,
+        ),
+    )
+
+
+async def init_http_clients():
+    """Create the shared clients. Called from the application lifespan."""
+    global _llm_client, _creem_client
+    if _llm_client is None:
+        _llm_client = build_llm_client()
+    if _creem_client is None:
+        _creem_client = build_creem_client()
+
+
+async def close_http_clients():
+    """Close the shared clients and release pooled connections."""
+    global _llm_client, _creem_client
+    if _llm_client is not None:
+        await _llm_client.aclose()
+        _llm_client = None
+    if _creem_client is not None:
+        await _creem_client.aclose()
+        _creem_client = None
+
+
+def get_llm_client() -> httpx.AsyncClient:
+    """Get the shared LLM proxy client, creating it if the lifespan has not run."""
+    global _llm_client
+    if _llm_client is None:
+        _llm_client = build_llm_client()
+    return _llm_client
+
+
+def get_creem_client() -> httpx.AsyncClient:
+    """Get the shared Creem API client, creating it if the lifespan has not run."""
+    global _creem_client
+    if _creem_client is None:
+        _creem_client = build_creem_client()
+    return _creem_client
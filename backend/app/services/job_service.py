@@ -0,0 +1,156 @@
+"""Background worker pool for asynchronous validation jobs."""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import select, update
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models.job import ValidationJob, JOB_PENDING, JOB_RUNNING, JOB_FAILED
+from app.services.llm_service import validate_idea, active_prompt_version
+from app.services.report_service import record_validation
+from app.services.result_cache import cache_key, get_result_cache
+from app.services.token_service import CreditReservation, release_credit
+from app.metrics import validation_jobs
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class JobWorkerPool:
+    """
+    Runs queued validation jobs on a fixed number of worker tasks.
+
+    Job state lives in the ``validation_jobs`` table; the in-memory queue
+    only holds ids, so pending jobs are re-queued on start. Workers claim
+    a job with a conditional UPDATE, so several processes can share the
+    table without running a job twice.
+    """
+
+    def __init__(self, session_factory, concurrency: int):
+        self.session_factory = session_factory
+        self.concurrency = concurrency
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers = []
+
+    async def reset_interrupted(self):
+        """
+        Return jobs left running by a previous process to pending.
+
+        Must run once per deployment, before any worker starts, or it
+        would reset jobs another worker is running.
+        """
+        async with self.session_factory() as db:
+            await db.execute(
+                update(ValidationJob)
+                .where(ValidationJob.status == JOB_RUNNING)
+                .values(status=JOB_PENDING)
+            )
+            await db.commit()
+
+    async def start(self):
+        """Start the workers and queue pending jobs."""
+        self._queue = asyncio.Queue()
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(ValidationJob.id)
+                .where(ValidationJob.status == JOB_PENDING)
+                .order_by(ValidationJob.created_at)
+            )
+            for job_id in result.scalars():
+                self._queue.put_nowait(job_id)
+        self._workers = [
+            asyncio.create_task(self._worker()) for _ in range(self.concurrency)
+        ]
+
+    async def stop(self):
+        """Cancel the workers; unfinished jobs resume on the next start."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, job_id: str):
+        """Queue a committed job for execution."""
+        self._queue.put_nowait(job_id)
+
+    async def join(self):
+        """Wait until every queued job has been processed."""
+        await self._queue.join()
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self.run_job(job_id)
+            except Exception:
+                logger.exception("Validation job %s crashed", job_id)
+            finally:
+                self._queue.task_done()
+
+    async def run_job(self, job_id: str):
+        """
+        Run one job to completion.
+
+        The credit was reserved when the job was submitted; it is kept if
+        the report is stored and given back if the job fails.
+        """
+        async with self.session_factory() as db:
+            # Claim the job; with several processes only one of them wins
+            claimed = await db.execute(
+                update(ValidationJob)
+                .where(ValidationJob.id == job_id, ValidationJob.status == JOB_PENDING)
+                .values(
+                    status=JOB_RUNNING,
+                    attempts=ValidationJob.attempts + 1,
+                    started_at=datetime.utcnow(),
+                )
+            )
+            await db.commit()
+            if claimed.rowcount != 1:
+                return
+            job = await db.get(ValidationJob, job_id)
+
+            reservation = CreditReservation(job.device_id, job.credit)
+            try:
+                result_cache = get_result_cache()
+                key = cache_key(
+                    job.idea_title,
+                    job.idea_description,
+                    job.language,
+                    settings.llm_model,
+                    active_prompt_version(),
+                )
+                result = await result_cache.get(db, key)
+                if result is None:
+                    result = await validate_idea(
+                        title=job.idea_title,
+                        description=job.idea_description,
+                        language=job.language,
+                    )
+                    await result_cache.set(db, key, result)
+
+                await record_validation(
+                    db,
+                    reservation,
+                    job.idea_title,
+                    job.idea_description,
+                    job.language,
+                    result,
+                    job=job,
+                )
+            except asyncio.CancelledError:
+                # Left as running; resumed on the next start
+                raise
+            except Exception as e:
+                await db.rollback()
+                await release_credit(db, reservation)
+                job.status = JOB_FAILED
+                job.error = f"Validation failed: {str(e)}"
+                job.finished_at = datetime.utcnow()
+                await db.commit()
+
+            validation_jobs.labels(tool=settings.tool_name, status=job.status).inc()
+
+
+job_pool = JobWorkerPool(SessionLocal, settings.job_workers)
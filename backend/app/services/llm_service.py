@@ -1,68 +1,242 @@
 """LLM service for AI-powered idea validation."""
+import asyncio
+import copy
 import json
+import time
 import httpx
-from typing import Optional
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
 from app.config import get_settings
+from app.metrics import (
+    llm_coalesced_requests,
+    llm_completion_duration,
+    llm_json_repairs,
+    llm_tokens,
+)
+from app.services.http_client import get_llm_client
+from app.services.prompts import PROMPT_VERSION, CompiledPrompt, estimate_tokens, prompt_registry
+from app.services.report_parser import ReportSchema, extract_json_object, parse_report
+from app.services.resilience import is_retryable, llm_caller
+from app.services.result_cache import cache_key
+from app.services.stream_parser import SectionStreamParser
 
 settings = get_settings()
 
+REPORT_SECTIONS = (
+    "overall_score",
+    "market_analysis",
+    "competition_analysis",
+    "technical_feasibility",
+    "business_model",
+    "risks",
+    "suggestions",
+    "summary",
+)
 
-VALIDATION_PROMPT = """You are an expert startup analyst and venture capitalist. Analyze the following startup idea and provide a comprehensive validation report.
 
-**Startup Idea:**
-Title: {title}
-Description: {description}
-
-**Provide your analysis in the following JSON format:**
-{{
-  "overall_score": <integer 0-100>,
-  "market_analysis": {{
+SECTION_FORMATS = {
+    "market_analysis": """{
     "tam": "<Total Addressable Market estimate>",
     "sam": "<Serviceable Available Market estimate>",
     "som": "<Serviceable Obtainable Market estimate>",
     "market_trends": ["<trend 1>", "<trend 2>", ...],
     "target_customers": "<description of ideal customers>",
     "score": <integer 0-100>
-  }},
-  "competition_analysis": {{
+  }""",
+    "competition_analysis": """{
     "direct_competitors": ["<competitor 1>", "<competitor 2>", ...],
     "indirect_competitors": ["<competitor 1>", "<competitor 2>", ...],
     "competitive_advantages": ["<advantage 1>", "<advantage 2>", ...],
     "barriers_to_entry": ["<barrier 1>", "<barrier 2>", ...],
     "score": <integer 0-100>
-  }},
-  "technical_feasibility": {{
+  }""",
+    "technical_feasibility": """{
     "technology_stack": ["<tech 1>", "<tech 2>", ...],
     "development_complexity": "<low/medium/high>",
     "time_to_mvp": "<estimate in weeks/months>",
     "key_technical_challenges": ["<challenge 1>", "<challenge 2>", ...],
     "score": <integer 0-100>
-  }},
-  "business_model": {{
+  }""",
+    "business_model": """{
     "revenue_streams": ["<stream 1>", "<stream 2>", ...],
     "pricing_strategy": "<description>",
     "unit_economics": "<description>",
     "scalability": "<low/medium/high>",
     "score": <integer 0-100>
-  }},
-  "risks": {{
+  }""",
+    "risks": """{
     "market_risks": ["<risk 1>", "<risk 2>", ...],
     "technical_risks": ["<risk 1>", "<risk 2>", ...],
     "financial_risks": ["<risk 1>", "<risk 2>", ...],
     "regulatory_risks": ["<risk 1>", "<risk 2>", ...],
     "overall_risk_level": "<low/medium/high>"
-  }},
-  "suggestions": {{
+  }""",
+    "suggestions": """{
     "immediate_actions": ["<action 1>", "<action 2>", ...],
     "improvements": ["<improvement 1>", "<improvement 2>", ...],
     "pivot_ideas": ["<pivot 1>", "<pivot 2>", ...],
     "resources_needed": ["<resource 1>", "<resource 2>", ...]
-  }},
-  "summary": "<2-3 sentence executive summary of the validation>"
+  }""",
+    "summary": '"<2-3 sentence executive summary of the validation>"',
+}
+
+SECTION_PROMPT = """You are an expert startup analyst and venture capitalist. Analyze the following startup idea and provide one section of a validation report.
+
+**Startup Idea:**
+Title: {title}
+Description: {description}
+
+**Provide the "{section}" section in the following JSON format:**
+{{
+  "{section}": {section_format}
 }}
 
 Respond ONLY with valid JSON. Be specific, actionable, and data-driven in your analysis. Language: {language}"""
 
+# Sections whose failure fails the whole fan-out; the rest degrade to empty
+CRITICAL_SECTIONS = (
+    "market_analysis",
+    "competition_analysis",
+    "technical_feasibility",
+    "business_model",
+)
+
+SECTION_MAX_TOKENS = 1000
+
+
+def active_prompt_version() -> str:
+    """Prompt version of the current mode, used to key cached results."""
+    if settings.llm_fanout_enabled:
+        return f"{PROMPT_VERSION}-fanout"
+    return PROMPT_VERSION
+
+
+def _request_headers() -> dict:
+    return {
+        "Authorization": f"Bearer {settings.llm_proxy_key}",
+        "Content-Type": "application/json",
+    }
+
+
+def _request_body(prompt: CompiledPrompt, title: str, description: str, stream: bool = False) -> dict:
+    if settings.llm_adaptive_max_tokens:
+        max_tokens = prompt.max_tokens(description, settings.llm_max_tokens)
+    else:
+        max_tokens = settings.llm_max_tokens
+    body = {
+        "model": settings.llm_model,
+        "messages": prompt.messages(title, description),
+        "temperature": 0.7,
+        "max_tokens": max_tokens,
+    }
+    if stream:
+        body["stream"] = True
+    return body
+
+
+class LLMUsage:
+    """
+    Tokens and upstream time spent on one report.
+
+    Token counts come from the proxy's ``usage`` block when it sends one
+    and from local estimates otherwise. Metrics are recorded per upstream
+    call, so cached and coalesced results cost nothing.
+    """
+
+    def __init__(self, prompt_version: str):
+        self.prompt_version = prompt_version
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self._started = time.perf_counter()
+
+    def add(self, data: dict, estimated_input: int, content: str):
+        """Count one completion; ``data`` is its response body."""
+        reported = data.get("usage") or {}
+        input_tokens = reported.get("prompt_tokens") or estimated_input
+        output_tokens = reported.get("completion_tokens") or estimate_tokens(content)
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+        llm_tokens.labels(
+            tool=settings.tool_name, direction="input", prompt_version=self.prompt_version
+        ).inc(input_tokens)
+        llm_tokens.labels(
+            tool=settings.tool_name, direction="output", prompt_version=self.prompt_version
+        ).inc(output_tokens)
+
+    def finish(self) -> dict:
+        """Record the elapsed time; returns the ``usage`` entry of a result."""
+        elapsed = time.perf_counter() - self._started
+        llm_completion_duration.labels(
+            tool=settings.tool_name, prompt_version=self.prompt_version
+        ).observe(elapsed)
+        return {
+            "prompt_version": self.prompt_version,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "duration_ms": round(elapsed * 1000),
+        }
+
+
+class _Flight:
+    """An upstream call and the number of callers waiting on it."""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time; concurrent callers with the
+    same key await the call already in flight and share its outcome.
+
+    The call runs in its own task, so one caller giving up (a client
+    disconnect) does not cancel it for the others; it is cancelled only
+    when every caller has gone. Coalescing is per process.
+    """
+
+    def __init__(self, share: Callable[[Any], Any] = copy.deepcopy):
+        self.share = share
+        self._flights: Dict[str, _Flight] = {}
+
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    async def run(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        flight = self._flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _Flight(asyncio.ensure_future(call()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+        else:
+            llm_coalesced_requests.labels(tool=settings.tool_name).inc()
+        
+        flight.waiters += 1
+        try:
+            result = await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+        # Callers may change their copy; the leader's is the original
+        return result if leader else self.share(result)
+
+    def _forget(self, key: str, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+
+def _coalesced_result(result: dict) -> dict:
+    """A joining caller's copy; the upstream usage is the leader's to record."""
+    result = copy.deepcopy(result)
+    result.pop("usage", None)
+    return result
+
+
+validation_flights = SingleFlight(share=_coalesced_result)
+
 
 async def validate_idea(
     title: str,
@@ -72,6 +246,13 @@ async def validate_idea(
     """
     Validate a startup idea using LLM.
     
+    Identical concurrent validations (same normalized title, description,
+    language, model and prompt) share one upstream call; each caller
+    still stores its own report and pays its own credit.
+    
+    The result carries a ``usage`` entry (prompt version, tokens in and
+    out, upstream duration) for the caller that made the upstream call.
+    
     Args:
         title: The idea title
         description: Detailed description of the idea
@@ -80,39 +261,200 @@ async def validate_idea(
     Returns:
         Validation report as dictionary
     """
-    prompt = VALIDATION_PROMPT.format(
+    if not settings.llm_coalesce_enabled:
+        return await _validate_idea(title, description, language)
+    
+    key = cache_key(title, description, language, settings.llm_model, active_prompt_version())
+    return await validation_flights.run(key, lambda: _validate_idea(title, description, language))
+
+
+async def _validate_idea(title: str, description: str, language: str) -> dict:
+    if settings.llm_fanout_enabled:
+        return await validate_idea_fanout(title, description, language)
+    
+    prompt = prompt_registry.get(language)
+    usage = LLMUsage(prompt.version)
+    response = await _post_completion(_request_body(prompt, title, description))
+    data = response.json()
+    content = data["choices"][0]["message"]["content"]
+    usage.add(data, prompt.input_tokens(title, description), content)
+    
+    result, repairs = parse_report(content)
+    _track_repairs(repairs)
+    result["usage"] = usage.finish()
+    return result
+
+
+async def _post_completion(body: dict) -> httpx.Response:
+    """POST a chat completion through the retry/hedge/circuit-breaker layer."""
+    client = get_llm_client()
+    return await llm_caller.call(
+        lambda: client.post(
+            "/v1/chat/completions",
+            headers=_request_headers(),
+            json=body,
+        )
+    )
+
+
+def _track_repairs(repairs: list):
+    for repair in repairs:
+        llm_json_repairs.labels(
+            tool=settings.tool_name,
+            repair=repair.rsplit(": ", 1)[-1],
+        ).inc()
+
+
+async def _generate_section(
+    section: str,
+    title: str,
+    description: str,
+    language: str,
+    semaphore: asyncio.Semaphore,
+    usage: LLMUsage,
+) -> Any:
+    """Generate one report section, retrying on timeouts and bad output."""
+    prompt = SECTION_PROMPT.format(
         title=title,
         description=description,
-        language=language
+        language=language,
+        section=section,
+        section_format=SECTION_FORMATS[section],
     )
+    body = {
+        "model": settings.llm_model,
+        "messages": [
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": 0.7,
+        "max_tokens": SECTION_MAX_TOKENS,
+    }
     
-    async with httpx.AsyncClient(timeout=120.0) as client:
-        response = await client.post(
-            f"{settings.llm_proxy_url}/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {settings.llm_proxy_key}",
-                "Content-Type": "application/json",
-            },
-            json={
-                "model": settings.llm_model,
-                "messages": [
-                    {"role": "user", "content": prompt}
-                ],
-                "temperature": 0.7,
-                "max_tokens": 4000,
-            }
-        )
-        response.raise_for_status()
-        
-        data = response.json()
-        content = data["choices"][0]["message"]["content"]
-        
-        # Parse JSON from response
-        # Handle potential markdown code blocks
-        if "```json" in content:
-            content = content.split("```json")[1].split("```")[0]
-        elif "```" in content:
-            content = content.split("```")[1].split("```")[0]
-        
-        result = json.loads(content.strip())
-        return result
+    last_error: Optional[Exception] = None
+    for _ in range(settings.llm_section_retries + 1):
+        try:
+            async with semaphore:
+                response = await asyncio.wait_for(
+                    _post_completion(body),
+                    timeout=settings.llm_section_timeout_seconds,
+                )
+            data = response.json()
+            content = data["choices"][0]["message"]["content"]
+            usage.add(data, estimate_tokens(prompt), content)
+            value, repairs = extract_json_object(content)
+            _track_repairs(repairs)
+            return value[section]
+        except (httpx.HTTPError, asyncio.TimeoutError, ValueError, KeyError, IndexError) as e:
+            last_error = e
+    raise last_error
+
+
+async def validate_idea_fanout(
+    title: str,
+    description: str,
+    language: str = "en"
+) -> dict:
+    """
+    Validate a startup idea with one concurrent LLM call per report section.
+    
+    Returns the same dict shape as ``validate_idea``. ``overall_score`` is
+    the mean of the section scores. If a non-critical section fails it is
+    left empty and listed under ``missing_sections``.
+    
+    Raises:
+        Exception: The last error of a critical section that failed
+    """
+    semaphore = asyncio.Semaphore(settings.llm_fanout_concurrency)
+    usage = LLMUsage(active_prompt_version())
+    sections = list(SECTION_FORMATS)
+    values = await asyncio.gather(
+        *(
+            _generate_section(section, title, description, language, semaphore, usage)
+            for section in sections
+        ),
+        return_exceptions=True,
+    )
+    
+    result = {}
+    missing = []
+    for section, value in zip(sections, values):
+        if isinstance(value, BaseException):
+            if section in CRITICAL_SECTIONS:
+                raise value
+            missing.append(section)
+            value = "" if section == "summary" else {}
+        result[section] = value
+    
+    result = ReportSchema.model_validate(result).model_dump()
+    scores = [result[section]["score"] for section in CRITICAL_SECTIONS]
+    result["overall_score"] = round(sum(scores) / len(scores))
+    if missing:
+        result["missing_sections"] = missing
+    result["usage"] = usage.finish()
+    return result
+
+
+async def stream_validate_idea(
+    title: str,
+    description: str,
+    language: str = "en",
+    usage: Optional[dict] = None,
+) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Validate a startup idea with a streamed completion.
+    
+    Yields each top-level ``(section, value)`` pair of the report as soon
+    as the model has finished writing it. Once the report is complete,
+    ``usage`` (if given) is filled like the ``usage`` entry of
+    ``validate_idea``, with the output tokens estimated from the stream.
+    
+    Raises:
+        ValueError: If the stream ends before the report JSON is complete
+    """
+    parser = SectionStreamParser()
+    prompt = prompt_registry.get(language)
+    tracker = LLMUsage(prompt.version)
+    streamed = []
+    client = get_llm_client()
+    breaker = llm_caller.breaker
+    breaker.before_call()
+    try:
+        async with client.stream(
+            "POST",
+            "/v1/chat/completions",
+            headers=_request_headers(),
+            json=_request_body(prompt, title, description, stream=True),
+        ) as response:
+            response.raise_for_status()
+            breaker.record_success()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                chunk = json.loads(data)
+                choices = chunk.get("choices") or [{}]
+                content = choices[0].get("delta", {}).get("content")
+                if not content:
+                    continue
+                streamed.append(content)
+                for section in parser.feed(content):
+                    yield section
+                if parser.complete:
+                    break
+    except Exception as e:
+        if is_retryable(e):
+            breaker.record_failure()
+        else:
+            breaker.record_cancelled()
+        raise
+    except BaseException:
+        breaker.record_cancelled()
+        raise
+    
+    tracker.add({}, prompt.input_tokens(title, description), "".join(streamed))
+    if not parser.complete:
+        raise ValueError("LLM stream ended before the report was complete")
+    if usage is not None:
+        usage.update(tracker.finish())
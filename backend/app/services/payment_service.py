@@ -0,0 +1,316 @@
+"""Applying Creem payment webhooks to transactions and token balances."""
+import asyncio
+import hashlib
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models.payment import PaymentTransaction
+from app.models.webhook import (
+    WebhookEvent,
+    EVENT_RECEIVED,
+    EVENT_PROCESSED,
+    EVENT_IGNORED,
+    EVENT_FAILED,
+)
+from app.services.token_service import credit_tokens
+from app.metrics import payment_success, payment_revenue_cents, payment_webhook_events
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+# Product configuration
+PRODUCTS = {
+    "validator_3": {"tokens": 3, "amount_cents": 499},
+    "validator_10": {"tokens": 10, "amount_cents": 999},
+    "validator_30": {"tokens": 30, "amount_cents": 1999},
+}
+
+
+@dataclass(frozen=True)
+class WebhookOutcome:
+    """What handling one webhook event did; ``status`` is success or ignored."""
+    status: str
+    reason: Optional[str] = None
+    tokens_added: int = 0
+    product_sku: Optional[str] = None
+    amount_cents: int = 0
+
+    def to_dict(self) -> dict:
+        """Response body for Creem."""
+        if self.status == "success":
+            return {"status": "success", "tokens_added": self.tokens_added}
+        return {"status": self.status, "reason": self.reason}
+
+
+DUPLICATE = WebhookOutcome("ignored", "already processed")
+
+
+def event_key(payload: dict, body: bytes) -> str:
+    """
+    Idempotency key of a webhook delivery.
+
+    Creem's event id when the payload has one, else the event type and
+    order id, else a hash of the raw body.
+    """
+    if payload.get("id"):
+        return str(payload["id"])[:128]
+    data = payload.get("data")
+    if isinstance(data, dict) and data.get("id"):
+        return f"{payload.get('type')}:{data['id']}"[:128]
+    return "sha256:" + hashlib.sha256(body).hexdigest()
+
+
+async def apply_webhook_event(db: AsyncSession, payload: dict) -> WebhookOutcome:
+    """
+    Apply one event's changes without committing.
+
+    The transaction is completed by a conditional UPDATE, so of several
+    deliveries (or appliers) racing on one checkout only one credits the
+    tokens. The caller commits, making the two changes atomic.
+    """
+    event_type = payload.get("type")
+    if event_type != "checkout.completed":
+        return WebhookOutcome("ignored", f"unhandled event: {event_type}")
+
+    checkout_data = payload.get("data") or {}
+    request_id = checkout_data.get("request_id")
+    if not request_id:
+        return WebhookOutcome("ignored", "no request_id")
+
+    result = await db.execute(
+        update(PaymentTransaction)
+        .where(
+            PaymentTransaction.checkout_id == request_id,
+            PaymentTransaction.status != "completed",
+        )
+        .values(
+            status="completed",
+            completed_at=datetime.utcnow(),
+            creem_order_id=checkout_data.get("id"),
+            webhook_data=payload,
+        )
+        .returning(
+            PaymentTransaction.id,
+            PaymentTransaction.device_id,
+            PaymentTransaction.product_sku,
+            PaymentTransaction.amount_cents,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    transaction = result.first()
+    if transaction is None:
+        exists = await db.scalar(
+            select(PaymentTransaction.id).where(PaymentTransaction.checkout_id == request_id)
+        )
+        return DUPLICATE if exists else WebhookOutcome("ignored", "transaction not found")
+
+    tokens = PRODUCTS.get(transaction.product_sku, {"tokens": 0})["tokens"]
+    await credit_tokens(
+        db,
+        transaction.device_id,
+        tokens,
+        transaction.id,
+        transaction.product_sku,
+    )
+    return WebhookOutcome(
+        "success",
+        tokens_added=tokens,
+        product_sku=transaction.product_sku,
+        amount_cents=transaction.amount_cents,
+    )
+
+
+def track_outcome(outcome: WebhookOutcome):
+    """Record metrics for a committed event."""
+    if outcome.status != "success":
+        result = "duplicate" if outcome is DUPLICATE else "ignored"
+        payment_webhook_events.labels(tool=settings.tool_name, result=result).inc()
+        return
+    payment_webhook_events.labels(tool=settings.tool_name, result="processed").inc()
+    payment_success.labels(tool=settings.tool_name, product_sku=outcome.product_sku).inc()
+    payment_revenue_cents.labels(tool=settings.tool_name).inc(outcome.amount_cents)
+
+
+async def process_webhook(db: AsyncSession, key: str, payload: dict) -> WebhookOutcome:
+    """
+    Record and apply an event in one transaction.
+
+    The event row is inserted first, so a replay of the same event fails
+    on its primary key before touching the transaction or the balance.
+    """
+    event = WebhookEvent(id=key, event_type=payload.get("type"), status=EVENT_RECEIVED)
+    db.add(event)
+    try:
+        await db.flush()
+    except IntegrityError:
+        await db.rollback()
+        track_outcome(DUPLICATE)
+        return DUPLICATE
+
+    outcome = await apply_webhook_event(db, payload)
+    event.status = EVENT_PROCESSED if outcome.status == "success" else EVENT_IGNORED
+    event.detail = outcome.reason
+    event.processed_at = datetime.utcnow()
+    await db.commit()
+
+    track_outcome(outcome)
+    return outcome
+
+
+async def enqueue_webhook(db: AsyncSession, key: str, payload: dict) -> bool:
+    """
+    Store an event for the batch applier (fast-ack mode).
+
+    Returns:
+        False if the event was already received
+    """
+    db.add(WebhookEvent(
+        id=key,
+        event_type=payload.get("type"),
+        status=EVENT_RECEIVED,
+        payload=payload,
+    ))
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        track_outcome(DUPLICATE)
+        return False
+    payment_webhook_events.labels(tool=settings.tool_name, result="queued").inc()
+    return True
+
+
+class WebhookApplier:
+    """
+    Applies events stored by fast-ack webhooks in batches.
+
+    One task wakes when an event is queued, or every ``poll_seconds`` for
+    events stored by other processes or before a restart, and applies up
+    to ``batch_size`` events per transaction. Each event is claimed with a
+    conditional UPDATE, so several processes can run an applier.
+    """
+
+    def __init__(self, session_factory, batch_size: int, poll_seconds: float):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Start the applier; events already received are applied first."""
+        self._wake = asyncio.Event()
+        self._wake.set()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Cancel the applier; received events are applied on the next start."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def notify(self):
+        """Wake the applier for a committed event."""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                while await self.apply_batch() == self.batch_size:
+                    pass
+            except Exception:
+                logger.exception("Applying webhook events failed")
+
+    async def apply_batch(self) -> int:
+        """
+        Apply the oldest received events in one transaction.
+
+        If the batch fails, its events are retried one per transaction and
+        an event that still fails is marked failed, so it cannot block the
+        ones after it.
+
+        Returns:
+            Number of events taken from the table
+        """
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(WebhookEvent.id, WebhookEvent.payload)
+                .where(WebhookEvent.status == EVENT_RECEIVED)
+                .order_by(WebhookEvent.created_at)
+                .limit(self.batch_size)
+            )
+            events = result.all()
+            if not events:
+                return 0
+
+            try:
+                outcomes = [await self._apply(db, key, payload) for key, payload in events]
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                logger.exception("Webhook batch failed; applying its events one by one")
+                outcomes = [await self._apply_alone(db, key, payload) for key, payload in events]
+
+            for outcome in outcomes:
+                if outcome is not None:
+                    track_outcome(outcome)
+            return len(events)
+
+    async def _apply(self, db: AsyncSession, key: str, payload: dict) -> Optional[WebhookOutcome]:
+        claimed = await db.execute(
+            update(WebhookEvent)
+            .where(WebhookEvent.id == key, WebhookEvent.status == EVENT_RECEIVED)
+            .values(status=EVENT_PROCESSED, processed_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        if claimed.rowcount != 1:
+            # Another applier got here first
+            return None
+        outcome = await apply_webhook_event(db, payload)
+        if outcome.status != "success":
+            await db.execute(
+                update(WebhookEvent)
+                .where(WebhookEvent.id == key)
+                .values(status=EVENT_IGNORED, detail=outcome.reason)
+                .execution_options(synchronize_session=False)
+            )
+        return outcome
+
+    async def _apply_alone(self, db: AsyncSession, key: str, payload: dict) -> Optional[WebhookOutcome]:
+        try:
+            outcome = await self._apply(db, key, payload)
+            await db.commit()
+            return outcome
+        except Exception as e:
+            await db.rollback()
+            logger.exception("Webhook event %s failed", key)
+            await db.execute(
+                update(WebhookEvent)
+                .where(WebhookEvent.id == key, WebhookEvent.status == EVENT_RECEIVED)
+                .values(status=EVENT_FAILED, detail=str(e), processed_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            payment_webhook_events.labels(tool=settings.tool_name, result="failed").inc()
+            return None
+
+
+webhook_applier = WebhookApplier(
+    SessionLocal,
+    settings.payment_webhook_batch_size,
+    settings.payment_webhook_poll_seconds,
+)
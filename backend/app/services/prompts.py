@@ -0,0 +1,213 @@
+"""Versioned validation prompts, compiled once per language, and token budgets."""
+import math
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+# Bump whenever a prompt changes so cached results are not reused
+PROMPT_VERSION = "v2"
+
+
+LANGUAGE_NAMES = {
+    "en": "English",
+    "zh": "Simplified Chinese (简体中文)",
+    "ja": "Japanese (日本語)",
+    "de": "German (Deutsch)",
+    "fr": "French (Français)",
+    "ko": "Korean (한국어)",
+    "es": "Spanish (Español)",
+}
+
+# Output tokens relative to English for the same report; Latin languages
+# inflect and compound more, CJK scripts spend about a token per character
+OUTPUT_TOKEN_FACTORS = {
+    "de": 1.25,
+    "fr": 1.2,
+    "es": 1.2,
+    "zh": 1.3,
+    "ja": 1.5,
+    "ko": 1.5,
+}
+
+
+@dataclass(frozen=True)
+class PromptSpec:
+    """One version of the validation prompt: instructions, JSON schema, closing line."""
+    instructions: str
+    schema: str
+    closing: str
+
+
+PROMPTS = {
+    "v2": PromptSpec(
+        instructions=(
+            "You are an expert startup analyst and venture capitalist. Analyze the startup "
+            "idea in the user message and provide a comprehensive validation report."
+        ),
+        schema="""{
+  "overall_score": <integer 0-100>,
+  "market_analysis": {
+    "tam": "<Total Addressable Market estimate>",
+    "sam": "<Serviceable Available Market estimate>",
+    "som": "<Serviceable Obtainable Market estimate>",
+    "market_trends": ["<trend 1>", "<trend 2>", ...],
+    "target_customers": "<description of ideal customers>",
+    "score": <integer 0-100>
+  },
+  "competition_analysis": {
+    "direct_competitors": ["<competitor 1>", "<competitor 2>", ...],
+    "indirect_competitors": ["<competitor 1>", "<competitor 2>", ...],
+    "competitive_advantages": ["<advantage 1>", "<advantage 2>", ...],
+    "barriers_to_entry": ["<barrier 1>", "<barrier 2>", ...],
+    "score": <integer 0-100>
+  },
+  "technical_feasibility": {
+    "technology_stack": ["<tech 1>", "<tech 2>", ...],
+    "development_complexity": "<low/medium/high>",
+    "time_to_mvp": "<estimate in weeks/months>",
+    "key_technical_challenges": ["<challenge 1>", "<challenge 2>", ...],
+    "score": <integer 0-100>
+  },
+  "business_model": {
+    "revenue_streams": ["<stream 1>", "<stream 2>", ...],
+    "pricing_strategy": "<description>",
+    "unit_economics": "<description>",
+    "scalability": "<low/medium/high>",
+    "score": <integer 0-100>
+  },
+  "risks": {
+    "market_risks": ["<risk 1>", "<risk 2>", ...],
+    "technical_risks": ["<risk 1>", "<risk 2>", ...],
+    "financial_risks": ["<risk 1>", "<risk 2>", ...],
+    "regulatory_risks": ["<risk 1>", "<risk 2>", ...],
+    "overall_risk_level": "<low/medium/high>"
+  },
+  "suggestions": {
+    "immediate_actions": ["<action 1>", "<action 2>", ...],
+    "improvements": ["<improvement 1>", "<improvement 2>", ...],
+    "pivot_ideas": ["<pivot 1>", "<pivot 2>", ...],
+    "resources_needed": ["<resource 1>", "<resource 2>", ...]
+  },
+  "summary": "<2-3 sentence executive summary of the validation>"
+}""",
+        closing=(
+            "Respond ONLY with valid JSON. Be specific, actionable, and data-driven in your "
+            "analysis. Write every text value in {language_name} and keep the JSON keys in English."
+        ),
+    ),
+}
+
+
+# Scripts that tokenize at roughly one token per character
+_WIDE_CHARS = re.compile(r"[\u2e80-\u9fff\uac00-\ud7af\uf900-\ufaff\uff00-\uffef]")
+_PLACEHOLDER = re.compile(r"<[^>]+>")
+
+# Expected size of one filled-in schema value, and how many values the
+# model adds to a list beyond the two the schema shows
+TOKENS_PER_VALUE = 24
+EXTRA_LIST_ITEMS = 2
+# Margin over the expected report size so long answers are not truncated
+OUTPUT_HEADROOM = 1.25
+# Detailed descriptions get more detailed analyses, up to this many tokens
+MAX_DESCRIPTION_ALLOWANCE = 500
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate a BPE token count without a tokenizer.
+
+    About four characters per token for Latin text and one per CJK,
+    kana or hangul character; close enough for budgets and metrics.
+    """
+    wide = len(_WIDE_CHARS.findall(text))
+    return math.ceil(wide + (len(text) - wide) / 4)
+
+
+def expected_output_tokens(schema: str) -> int:
+    """Expected tokens of an English report that fills in ``schema``."""
+    values = len(_PLACEHOLDER.findall(schema))
+    lists = schema.count("...")
+    structure = estimate_tokens(_PLACEHOLDER.sub("", schema).replace("...", ""))
+    return structure + (values + lists * EXTRA_LIST_ITEMS) * TOKENS_PER_VALUE
+
+
+@dataclass(frozen=True)
+class CompiledPrompt:
+    """
+    A prompt version rendered for one language.
+
+    ``system`` is the static prefix: identical for every request in the
+    language, so proxy-side prompt caching can reuse it. Only the user
+    message carries the idea.
+    """
+    version: str
+    language: str
+    system: str
+    system_tokens: int
+    output_tokens: int
+
+    def messages(self, title: str, description: str) -> List[dict]:
+        return [
+            {"role": "system", "content": self.system},
+            {"role": "user", "content": f"**Startup Idea:**\nTitle: {title}\nDescription: {description}"},
+        ]
+
+    def input_tokens(self, title: str, description: str) -> int:
+        """Estimated prompt tokens of a request."""
+        return self.system_tokens + estimate_tokens(title) + estimate_tokens(description) + 12
+
+    def max_tokens(self, description: str, ceiling: int) -> int:
+        """Completion budget: the expected report size plus headroom, at most ``ceiling``."""
+        allowance = min(estimate_tokens(description), MAX_DESCRIPTION_ALLOWANCE)
+        return min(ceiling, math.ceil((self.output_tokens + allowance) * OUTPUT_HEADROOM))
+
+
+def compile_prompt(spec: PromptSpec, version: str, language: str) -> CompiledPrompt:
+    """Render ``spec`` for ``language`` and size its token budgets."""
+    closing = spec.closing.format(language_name=LANGUAGE_NAMES.get(language, language))
+    system = (
+        f"{spec.instructions}\n\n"
+        f"**Provide your analysis in the following JSON format:**\n{spec.schema}\n\n"
+        f"{closing}"
+    )
+    factor = OUTPUT_TOKEN_FACTORS.get(language, 1.0)
+    return CompiledPrompt(
+        version=version,
+        language=language,
+        system=system,
+        system_tokens=estimate_tokens(system),
+        output_tokens=math.ceil(expected_output_tokens(spec.schema) * factor),
+    )
+
+
+class PromptRegistry:
+    """
+    Compiled prompts by version and language.
+
+    Every known language of every version is compiled up front; other
+    language codes are compiled on first use.
+    """
+
+    def __init__(self, specs: Dict[str, PromptSpec]):
+        self._specs = specs
+        self._compiled: Dict[Tuple[str, str], CompiledPrompt] = {
+            (version, language): compile_prompt(spec, version, language)
+            for version, spec in specs.items()
+            for language in LANGUAGE_NAMES
+        }
+
+    def get(self, language: str, version: str = PROMPT_VERSION) -> CompiledPrompt:
+        """
+        Get the prompt of ``version`` for ``language``.
+
+        Raises:
+            KeyError: If ``version`` is not registered
+        """
+        prompt = self._compiled.get((version, language))
+        if prompt is None:
+            prompt = compile_prompt(self._specs[version], version, language)
+            self._compiled[(version, language)] = prompt
+        return prompt
+
+
+prompt_registry = PromptRegistry(PROMPTS)
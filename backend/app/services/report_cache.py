@@ -0,0 +1,84 @@
+"""In-process cache of serialized reports for shared report links."""
+import hashlib
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+from app.config import get_settings
+from app.models.report import ValidationReport
+from app.metrics import report_cache_requests
+from app.responses import dump_json
+
+settings = get_settings()
+
+
+class CachedReport(NamedTuple):
+    """A report body ready to send, with its strong ETag."""
+    etag: str
+    body: bytes
+
+
+def report_etag(report: ValidationReport) -> str:
+    """
+    Strong ETag for a report.
+
+    Reports are never modified after they are written, so the id and the
+    creation time identify the exact bytes served.
+    """
+    created_at = report.created_at.isoformat() if report.created_at else ""
+    digest = hashlib.sha256(f"{report.id}\x1f{created_at}".encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def serialize_report(report: ValidationReport) -> CachedReport:
+    """Render a report to the JSON bytes the endpoint returns."""
+    # Packed reports already hold the serialized body
+    body = report.to_json() if report.payload is not None else dump_json(report.to_dict())
+    return CachedReport(report_etag(report), body)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Whether an ``If-None-Match`` header matches ``etag``.
+
+    Uses the weak comparison that RFC 9110 prescribes for
+    ``If-None-Match``, so ``W/`` prefixes added by proxies still match.
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class ReportCache:
+    """LRU cache of serialized reports keyed by report id."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CachedReport]" = OrderedDict()
+
+    def get(self, report_id: str) -> Optional[CachedReport]:
+        entry = self._entries.get(report_id)
+        if entry is None:
+            report_cache_requests.labels(tool=settings.tool_name, result="miss").inc()
+            return None
+        self._entries.move_to_end(report_id)
+        report_cache_requests.labels(tool=settings.tool_name, result="hit").inc()
+        return entry
+
+    def set(self, report_id: str, entry: CachedReport):
+        if self.max_entries <= 0:
+            return
+        self._entries[report_id] = entry
+        self._entries.move_to_end(report_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+
+report_cache = ReportCache(settings.report_cache_max_entries)
@@ -0,0 +1,333 @@
+"""Extraction, repair and schema validation of LLM report JSON."""
+import json
+from typing import Any, ClassVar, List, Tuple
+from pydantic import BaseModel, ConfigDict, ValidationInfo, field_validator, model_validator
+
+
+class ReportParseError(ValueError):
+    """Raised when no JSON object can be recovered from LLM output."""
+
+
+def _find_object_start(text: str) -> int:
+    start = text.find("{")
+    if start < 0:
+        raise ReportParseError("No JSON object found in LLM response")
+    return start
+
+
+def _closers(stack: list) -> str:
+    return "".join("}" if frame[0] == "{" else "]" for frame in reversed(stack))
+
+
+def _repair_json(text: str, start: int, repairs: List[str]) -> str:
+    """
+    Re-emit the JSON object starting at ``start`` in one pass, fixing
+    trailing commas, raw control characters inside strings, and truncation.
+
+    Truncated output is cut back to the last complete value and the open
+    containers are closed.
+    """
+    out = []
+    # Each frame: [bracket, expect] where expect is key/colon/value/comma
+    stack = []
+    safe_len = 0
+    safe_closers = ""
+    in_string = False
+    escape = False
+    string_is_key = False
+    scalar_start = -1
+    pending_comma = False
+    i = start
+    n = len(text.rstrip())
+
+    while i < n:
+        c = text[i]
+
+        if in_string:
+            if escape:
+                escape = False
+                out.append(c)
+            elif c == "\\":
+                escape = True
+                out.append(c)
+            elif c == '"':
+                in_string = False
+                out.append(c)
+                if string_is_key:
+                    stack[-1][1] = "colon"
+                else:
+                    stack[-1][1] = "comma"
+                    safe_len, safe_closers = len(out), _closers(stack)
+            elif c < " ":
+                out.append({"\n": "\\n", "\r": "\\r", "\t": "\\t"}.get(c, "\\u%04x" % ord(c)))
+                if "control_character" not in repairs:
+                    repairs.append("control_character")
+            else:
+                out.append(c)
+            i += 1
+            continue
+
+        if scalar_start >= 0:
+            if c not in ",}] \t\r\n":
+                out.append(c)
+                i += 1
+                continue
+            token = text[scalar_start:i]
+            try:
+                json.loads(token)
+            except ValueError:
+                raise ReportParseError(f"Invalid JSON literal: {token[:20]}")
+            scalar_start = -1
+            stack[-1][1] = "comma"
+            safe_len, safe_closers = len(out), _closers(stack)
+
+        if c in " \t\r\n":
+            pass
+        elif c in "}]":
+            if pending_comma:
+                pending_comma = False
+                if "trailing_comma" not in repairs:
+                    repairs.append("trailing_comma")
+            stack.pop()
+            out.append(c)
+            if not stack:
+                if text[i + 1:].strip() not in ("", "```") and "surrounding_text" not in repairs:
+                    repairs.append("surrounding_text")
+                return "".join(out)
+            stack[-1][1] = "comma"
+            safe_len, safe_closers = len(out), _closers(stack)
+        else:
+            if pending_comma:
+                out.append(",")
+                pending_comma = False
+                stack[-1][1] = "key" if stack[-1][0] == "{" else "value"
+            if c == ",":
+                pending_comma = True
+            elif c == ":":
+                out.append(c)
+                stack[-1][1] = "value"
+            elif c in "{[":
+                out.append(c)
+                stack.append([c, "key" if c == "{" else "value"])
+                safe_len, safe_closers = len(out), _closers(stack)
+            elif c == '"':
+                in_string = True
+                string_is_key = stack[-1][0] == "{" and stack[-1][1] == "key"
+                out.append(c)
+            else:
+                scalar_start = i
+                out.append(c)
+        i += 1
+
+    # Input ended inside the object
+    repairs.append("truncated")
+    if in_string and not string_is_key:
+        if escape:
+            out.pop()
+        out.append('"')
+        stack[-1][1] = "comma"
+        safe_len, safe_closers = len(out), _closers(stack)
+    elif scalar_start >= 0:
+        try:
+            json.loads(text[scalar_start:n])
+            safe_len, safe_closers = len(out), _closers(stack)
+        except ValueError:
+            pass
+    return "".join(out[:safe_len]) + safe_closers
+
+
+def extract_json_object(text: str) -> Tuple[dict, List[str]]:
+    """
+    Locate the outermost JSON object in LLM output and decode it.
+
+    The common case (one clean object, optionally fenced or wrapped in
+    prose) is decoded from a single slice. Otherwise the object is
+    re-emitted in one pass with repairs applied.
+
+    Returns:
+        Tuple of (decoded object, list of repairs applied)
+
+    Raises:
+        ReportParseError: If no object can be recovered
+    """
+    start = _find_object_start(text)
+    repairs: List[str] = []
+    end = text.rfind("}")
+    prefix = text[:start].strip()
+    suffix = text[end + 1:].strip() if end > start else ""
+    if prefix not in ("", "```", "```json") or suffix not in ("", "```"):
+        repairs.append("surrounding_text")
+
+    if end > start:
+        try:
+            value = json.loads(text[start:end + 1])
+            if isinstance(value, dict):
+                return value, repairs
+        except ValueError:
+            pass
+
+    repaired = _repair_json(text, start, repairs)
+    try:
+        value = json.loads(repaired)
+    except ValueError as e:
+        raise ReportParseError(f"Could not repair LLM JSON: {e}") from e
+    if not isinstance(value, dict):
+        raise ReportParseError("LLM JSON is not an object")
+    return value, repairs
+
+
+def _record(info: ValidationInfo, repair: str):
+    if info.context is not None:
+        info.context.setdefault("repairs", []).append(repair)
+
+
+class _Section(BaseModel):
+    """Base for report sections: coerces common LLM type slips."""
+
+    model_config = ConfigDict(extra="allow")
+
+    @field_validator("*", mode="before")
+    @classmethod
+    def _coerce(cls, value: Any, info: ValidationInfo) -> Any:
+        annotation = cls.model_fields[info.field_name].annotation
+        path = f"{cls.section_name}.{info.field_name}"
+        if annotation is List[str]:
+            if value is None:
+                _record(info, f"{path}: null")
+                return []
+            if isinstance(value, str):
+                _record(info, f"{path}: string wrapped in list")
+                return [value]
+            if isinstance(value, list) and not all(isinstance(v, str) for v in value):
+                _record(info, f"{path}: items coerced to string")
+                return [v if isinstance(v, str) else json.dumps(v) for v in value]
+        elif annotation is str:
+            if value is None:
+                _record(info, f"{path}: null")
+                return ""
+            if not isinstance(value, str):
+                _record(info, f"{path}: coerced to string")
+                return json.dumps(value)
+        elif annotation is int:
+            return _coerce_score(value, info, path)
+        return value
+
+
+def _coerce_score(value: Any, info: ValidationInfo, path: str) -> int:
+    try:
+        score = int(round(float(str(value).strip().rstrip("%"))))
+    except (TypeError, ValueError):
+        _record(info, f"{path}: invalid score")
+        return 0
+    if score != value:
+        _record(info, f"{path}: coerced to integer")
+    if score < 0 or score > 100:
+        _record(info, f"{path}: clamped")
+        score = min(100, max(0, score))
+    return score
+
+
+class MarketAnalysis(_Section):
+    section_name: ClassVar[str] = "market_analysis"
+    tam: str = ""
+    sam: str = ""
+    som: str = ""
+    market_trends: List[str] = []
+    target_customers: str = ""
+    score: int = 0
+
+
+class CompetitionAnalysis(_Section):
+    section_name: ClassVar[str] = "competition_analysis"
+    direct_competitors: List[str] = []
+    indirect_competitors: List[str] = []
+    competitive_advantages: List[str] = []
+    barriers_to_entry: List[str] = []
+    score: int = 0
+
+
+class TechnicalFeasibility(_Section):
+    section_name: ClassVar[str] = "technical_feasibility"
+    technology_stack: List[str] = []
+    development_complexity: str = ""
+    time_to_mvp: str = ""
+    key_technical_challenges: List[str] = []
+    score: int = 0
+
+
+class BusinessModel(_Section):
+    section_name: ClassVar[str] = "business_model"
+    revenue_streams: List[str] = []
+    pricing_strategy: str = ""
+    unit_economics: str = ""
+    scalability: str = ""
+    score: int = 0
+
+
+class Risks(_Section):
+    section_name: ClassVar[str] = "risks"
+    market_risks: List[str] = []
+    technical_risks: List[str] = []
+    financial_risks: List[str] = []
+    regulatory_risks: List[str] = []
+    overall_risk_level: str = ""
+
+
+class Suggestions(_Section):
+    section_name: ClassVar[str] = "suggestions"
+    immediate_actions: List[str] = []
+    improvements: List[str] = []
+    pivot_ideas: List[str] = []
+    resources_needed: List[str] = []
+
+
+class ReportSchema(BaseModel):
+    """Typed shape of a validation report as produced by the LLM."""
+
+    model_config = ConfigDict(extra="ignore")
+
+    overall_score: int = 0
+    market_analysis: MarketAnalysis = MarketAnalysis()
+    competition_analysis: CompetitionAnalysis = CompetitionAnalysis()
+    technical_feasibility: TechnicalFeasibility = TechnicalFeasibility()
+    business_model: BusinessModel = BusinessModel()
+    risks: Risks = Risks()
+    suggestions: Suggestions = Suggestions()
+    summary: str = ""
+
+    @model_validator(mode="before")
+    @classmethod
+    def _check_sections(cls, data: Any, info: ValidationInfo) -> Any:
+        if not isinstance(data, dict):
+            return data
+        data = dict(data)
+        for name, field in cls.model_fields.items():
+            if name not in data:
+                _record(info, f"{name}: missing")
+            elif field.annotation not in (int, str) and not isinstance(data[name], dict):
+                _record(info, f"{name}: not an object")
+                del data[name]
+        if "overall_score" in data:
+            data["overall_score"] = _coerce_score(data["overall_score"], info, "overall_score")
+        if "summary" in data and not isinstance(data["summary"], str):
+            _record(info, "summary: coerced to string")
+            data["summary"] = "" if data["summary"] is None else json.dumps(data["summary"])
+        return data
+
+
+def parse_report(content: str) -> Tuple[dict, List[str]]:
+    """
+    Parse an LLM validation report.
+
+    Returns:
+        Tuple of (report dict matching ReportSchema, list of repairs)
+
+    Raises:
+        ReportParseError: If no JSON object can be recovered
+    """
+    data, repairs = extract_json_object(content)
+    if not any(name in data for name in ReportSchema.model_fields):
+        raise ReportParseError("LLM response does not contain a validation report")
+    context = {"repairs": repairs}
+    report = ReportSchema.model_validate(data, context=context)
+    return report.model_dump(), context["repairs"]
@@ -0,0 +1,120 @@
+"""Persisting validation reports and charging for them."""
+from datetime import datetime
+from typing import List, NamedTuple, Optional, Sequence
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import get_settings
+from app.models.job import ValidationJob, JOB_SUCCEEDED
+from app.models.report import ValidationReport
+from app.models.types import new_id
+from app.services.llm_service import active_prompt_version
+from app.services.token_service import CreditReservation
+from app.metrics import core_function_calls, tokens_consumed, free_trial_used
+
+settings = get_settings()
+
+
+class ReportEntry(NamedTuple):
+    """One validation to store with ``record_validations``."""
+    reservation: CreditReservation
+    title: str
+    description: str
+    language: str
+    result: dict
+
+
+def build_report(
+    reservation: CreditReservation,
+    title: str,
+    description: str,
+    language: str,
+    result: dict,
+) -> ValidationReport:
+    """
+    Build the report row for an LLM result, with its id already assigned.
+
+    With ``REPORT_STORAGE=packed`` the content is stored as one compressed
+    blob instead of separate columns. The ``usage`` entry of a fresh LLM
+    result is stored with the report.
+    """
+    usage = result.get("usage") or {}
+    report = ValidationReport(
+        id=new_id(),
+        created_at=datetime.utcnow(),
+        idea_title=title,
+        idea_description=description,
+        language=language,
+        overall_score=result.get("overall_score", 0),
+        market_analysis=result.get("market_analysis"),
+        competition_analysis=result.get("competition_analysis"),
+        technical_feasibility=result.get("technical_feasibility"),
+        business_model=result.get("business_model"),
+        risks=result.get("risks"),
+        suggestions=result.get("suggestions"),
+        summary=result.get("summary", ""),
+        device_id=reservation.device_id,
+        prompt_version=usage.get("prompt_version", active_prompt_version()),
+        input_tokens=usage.get("input_tokens"),
+        output_tokens=usage.get("output_tokens"),
+        llm_duration_ms=usage.get("duration_ms"),
+    )
+    if settings.report_storage == "packed":
+        report.pack(settings.report_compression_level)
+    return report
+
+
+def _track(reservation: CreditReservation):
+    core_function_calls.labels(tool="idea-validator").inc()
+    if reservation.kind == "free_trial":
+        free_trial_used.labels(tool="idea-validator").inc()
+    else:
+        tokens_consumed.labels(tool="idea-validator").inc()
+
+
+async def record_validation(
+    db: AsyncSession,
+    reservation: CreditReservation,
+    title: str,
+    description: str,
+    language: str,
+    result: dict,
+    job: Optional[ValidationJob] = None,
+) -> ValidationReport:
+    """
+    Save the report and mark ``job`` done, keeping the reserved credit.
+
+    The report and the job update are committed together, so a job that
+    succeeded always has its report.
+    """
+    report = build_report(reservation, title, description, language, result)
+    db.add(report)
+    await db.flush()
+
+    if job is not None:
+        job.status = JOB_SUCCEEDED
+        job.report_id = report.id
+        job.error = None
+        job.finished_at = datetime.utcnow()
+
+    await db.commit()
+
+    _track(reservation)
+    return report
+
+
+async def record_validations(db: AsyncSession, entries: Sequence[ReportEntry]) -> List[ValidationReport]:
+    """
+    Save several reports in one transaction, keeping their reserved credits.
+
+    The ids are assigned up front, so the rows go out as a single
+    executemany INSERT rather than one round trip per report.
+    """
+    reports = [
+        build_report(entry.reservation, entry.title, entry.description, entry.language, entry.result)
+        for entry in entries
+    ]
+    db.add_all(reports)
+    await db.commit()
+
+    for entry in entries:
+        _track(entry.reservation)
+    return reports
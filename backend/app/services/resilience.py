@@ -0,0 +1,223 @@
+"""Retry, hedging and circuit breaking for upstream HTTP calls."""
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional
+import httpx
+from app.config import get_settings
+from app.metrics import (
+    llm_circuit_state,
+    llm_circuit_rejections,
+    llm_upstream_retries,
+    llm_hedged_requests,
+)
+
+settings = get_settings()
+
+CIRCUIT_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+
+class CircuitOpenError(Exception):
+    """Raised when the circuit is open and calls fail fast."""
+
+    def __init__(self, retry_after: float):
+        super().__init__("LLM service temporarily unavailable")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    Opens after ``failure_threshold`` failures in a row, rejects calls for
+    ``recovery_seconds``, then lets a single probe through (half-open).
+    """
+
+    def __init__(self, failure_threshold: int, recovery_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._publish()
+
+    def _publish(self):
+        llm_circuit_state.labels(tool=settings.tool_name).set(CIRCUIT_STATES[self.state])
+
+    def _set_state(self, state: str):
+        self.state = state
+        self._publish()
+
+    def before_call(self):
+        """Raise CircuitOpenError if the call should not be attempted."""
+        if self.state == "open":
+            elapsed = time.monotonic() - self.opened_at
+            if elapsed < self.recovery_seconds:
+                llm_circuit_rejections.labels(tool=settings.tool_name).inc()
+                raise CircuitOpenError(self.recovery_seconds - elapsed)
+            self._set_state("half_open")
+        if self.state == "half_open":
+            if self._probe_in_flight:
+                llm_circuit_rejections.labels(tool=settings.tool_name).inc()
+                raise CircuitOpenError(self.recovery_seconds)
+            self._probe_in_flight = True
+
+    def record_cancelled(self):
+        """Release a half-open probe slot when the call was cancelled."""
+        self._probe_in_flight = False
+
+    def record_success(self):
+        self.failures = 0
+        self._probe_in_flight = False
+        if self.state != "closed":
+            self._set_state("closed")
+
+    def record_failure(self):
+        self._probe_in_flight = False
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            self._set_state("open")
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies."""
+
+    def __init__(self, window: int = 200):
+        self.samples = deque(maxlen=window)
+
+    def observe(self, seconds: float):
+        self.samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def is_retryable(error: Exception) -> bool:
+    """Transport errors, 429 and 5xx are worth retrying."""
+    if isinstance(error, httpx.TransportError):
+        return True
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    return False
+
+
+class ResilientCaller:
+    """Wraps an idempotent upstream call with retries, hedging and a breaker."""
+
+    def __init__(
+        self,
+        breaker: CircuitBreaker,
+        retry_attempts: int,
+        backoff_seconds: float,
+        backoff_max_seconds: float,
+        hedge_enabled: bool = False,
+        hedge_min_samples: int = 20,
+        hedge_min_delay_seconds: float = 1.0,
+    ):
+        self.breaker = breaker
+        self.retry_attempts = retry_attempts
+        self.backoff_seconds = backoff_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.hedge_enabled = hedge_enabled
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_min_delay_seconds = hedge_min_delay_seconds
+        self.latency = LatencyTracker()
+
+    def hedge_delay(self) -> Optional[float]:
+        """Delay before a hedged request, or None if hedging is off."""
+        if not self.hedge_enabled or len(self.latency.samples) < self.hedge_min_samples:
+            return None
+        return max(self.hedge_min_delay_seconds, self.latency.percentile(0.95))
+
+    async def _attempt(self, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        start = time.monotonic()
+        response = await send()
+        response.raise_for_status()
+        self.latency.observe(time.monotonic() - start)
+        return response
+
+    async def _hedged(self, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        delay = self.hedge_delay()
+        if delay is None:
+            return await self._attempt(send)
+
+        primary = asyncio.ensure_future(self._attempt(send))
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return primary.result()
+
+        llm_hedged_requests.labels(tool=settings.tool_name).inc()
+        hedge = asyncio.ensure_future(self._attempt(send))
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def call(self, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        """
+        Run ``send`` until it succeeds, a non-retryable error occurs, or the
+        retry budget is spent.
+
+        Raises:
+            CircuitOpenError: If the breaker is open
+            httpx.HTTPError: The last upstream error
+        """
+        for attempt in range(self.retry_attempts + 1):
+            self.breaker.before_call()
+            try:
+                response = await self._hedged(send)
+            except asyncio.CancelledError:
+                self.breaker.record_cancelled()
+                raise
+            except Exception as e:
+                if not is_retryable(e):
+                    if isinstance(e, httpx.HTTPStatusError):
+                        # The upstream answered; a 4xx is the caller's problem
+                        self.breaker.record_success()
+                    else:
+                        self.breaker.record_cancelled()
+                    raise
+                self.breaker.record_failure()
+                if attempt == self.retry_attempts:
+                    raise
+                llm_upstream_retries.labels(tool=settings.tool_name).inc()
+                backoff = min(self.backoff_max_seconds, self.backoff_seconds * (2 ** attempt))
+                await asyncio.sleep(random.uniform(0, backoff))
+                continue
+            self.breaker.record_success()
+            return response
+
+
+def build_llm_caller() -> ResilientCaller:
+    """Build the resilience layer for LLM proxy calls from settings."""
+    return ResilientCaller(
+        breaker=CircuitBreaker(
+            settings.llm_circuit_failure_threshold,
+            settings.llm_circuit_recovery_seconds,
+        ),
+        retry_attempts=settings.llm_retry_attempts,
+        backoff_seconds=settings.llm_retry_backoff_seconds,
+        backoff_max_seconds=settings.llm_retry_backoff_max_seconds,
+        hedge_enabled=settings.llm_hedge_enabled,
+        hedge_min_samples=settings.llm_hedge_min_samples,
+        hedge_min_delay_seconds=settings.llm_hedge_min_delay_seconds,
+    )
+
+
+llm_caller = build_llm_caller()
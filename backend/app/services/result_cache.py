@@ -0,0 +1,164 @@
+"""Content-addressed cache of LLM validation results."""
+import copy
+import hashlib
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import get_settings
+from app.models.cache import ValidationCacheEntry
+from app.metrics import llm_cache_requests, llm_cache_evictions
+
+settings = get_settings()
+
+
+def normalize_text(text: str) -> str:
+    """Normalize user input so trivially different submissions share a key."""
+    text = unicodedata.normalize("NFKC", text)
+    return " ".join(text.split()).casefold()
+
+
+def cache_key(title: str, description: str, language: str, model: str, prompt_version: str) -> str:
+    """Hash the normalized request into a cache key."""
+    parts = [
+        normalize_text(title),
+        normalize_text(description),
+        language,
+        model,
+        prompt_version,
+    ]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def _cacheable(result: dict) -> dict:
+    """The report without its ``usage``: a cache hit costs no tokens."""
+    return {name: value for name, value in result.items() if name != "usage"}
+
+
+class MemoryResultCache:
+    """In-process LRU cache with per-entry TTL."""
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+
+    async def get(self, db: AsyncSession, key: str) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            llm_cache_requests.labels(tool=settings.tool_name, result="miss").inc()
+            return None
+
+        expires_at, result = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            llm_cache_evictions.labels(tool=settings.tool_name, reason="expired").inc()
+            llm_cache_requests.labels(tool=settings.tool_name, result="miss").inc()
+            return None
+
+        self._entries.move_to_end(key)
+        llm_cache_requests.labels(tool=settings.tool_name, result="hit").inc()
+        return copy.deepcopy(result)
+
+    async def set(self, db: AsyncSession, key: str, result: dict):
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, copy.deepcopy(_cacheable(result)))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            llm_cache_evictions.labels(tool=settings.tool_name, reason="lru").inc()
+
+    def clear(self):
+        self._entries.clear()
+
+
+class DatabaseResultCache:
+    """Cache stored in the validation_cache table so it survives restarts."""
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+    async def get(self, db: AsyncSession, key: str) -> Optional[dict]:
+        entry = await db.get(ValidationCacheEntry, key)
+        if entry is None:
+            llm_cache_requests.labels(tool=settings.tool_name, result="miss").inc()
+            return None
+
+        now = datetime.utcnow()
+        if entry.expires_at <= now:
+            await db.delete(entry)
+            await db.commit()
+            llm_cache_evictions.labels(tool=settings.tool_name, reason="expired").inc()
+            llm_cache_requests.labels(tool=settings.tool_name, result="miss").inc()
+            return None
+
+        entry.last_accessed_at = now
+        await db.commit()
+        llm_cache_requests.labels(tool=settings.tool_name, result="hit").inc()
+        return entry.result
+
+    async def set(self, db: AsyncSession, key: str, result: dict):
+        now = datetime.utcnow()
+        await db.merge(ValidationCacheEntry(
+            key=key,
+            result=_cacheable(result),
+            created_at=now,
+            expires_at=now + timedelta(seconds=self.ttl_seconds),
+            last_accessed_at=now,
+        ))
+        await db.commit()
+
+        count = await db.scalar(select(func.count()).select_from(ValidationCacheEntry))
+        overflow = count - self.max_entries
+        if overflow > 0:
+            oldest = (
+                select(ValidationCacheEntry.key)
+                .order_by(ValidationCacheEntry.last_accessed_at)
+                .limit(overflow)
+            )
+            await db.execute(
+                delete(ValidationCacheEntry).where(ValidationCacheEntry.key.in_(oldest))
+            )
+            await db.commit()
+            llm_cache_evictions.labels(tool=settings.tool_name, reason="lru").inc(overflow)
+
+    def clear(self):
+        pass
+
+
+class NullResultCache:
+    """Cache backend that never stores anything."""
+
+    async def get(self, db: AsyncSession, key: str) -> Optional[dict]:
+        return None
+
+    async def set(self, db: AsyncSession, key: str, result: dict):
+        pass
+
+    def clear(self):
+        pass
+
+
+def build_result_cache(backend: str):
+    """Build a cache backend by name."""
+    if backend == "memory":
+        return MemoryResultCache(settings.result_cache_max_entries, settings.result_cache_ttl_seconds)
+    if backend == "database":
+        return DatabaseResultCache(settings.result_cache_max_entries, settings.result_cache_ttl_seconds)
+    if backend == "none":
+        return NullResultCache()
+    raise ValueError(f"Unknown result cache backend: {backend}")
+
+
+_result_cache = None
+
+
+def get_result_cache():
+    """Get the configured result cache."""
+    global _result_cache
+    if _result_cache is None:
+        _result_cache = build_result_cache(settings.result_cache_backend)
+    return _result_cache
@@ -0,0 +1,100 @@
+"""Incremental parser that emits top-level JSON sections as they complete."""
+import json
+from typing import Any, List, Tuple
+
+
+class SectionStreamParser:
+    """
+    Feed streamed LLM text and get back each top-level ``key: value`` pair
+    of the outermost JSON object as soon as its value is complete.
+
+    Text before the first ``{`` (e.g. a ```json fence) is ignored, as is
+    anything after the closing ``}``.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.sections = {}
+        self.complete = False
+        self._pos = 0
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect = "key"
+        self._key = None
+        self._key_start = 0
+        self._value_start = 0
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Add text and return the sections completed by it."""
+        self.buffer += chunk
+        emitted = []
+        buf = self.buffer
+        i = self._pos
+        while i < len(buf) and not self.complete:
+            c = buf[i]
+            if not self._started:
+                if c == "{":
+                    self._started = True
+                    self._depth = 1
+                i += 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._expect == "key_string":
+                        self._key = json.loads(buf[self._key_start:i + 1])
+                        self._expect = "colon"
+                i += 1
+                continue
+
+            if c == '"':
+                self._in_string = True
+                if self._depth == 1 and self._expect == "key":
+                    self._key_start = i
+                    self._expect = "key_string"
+                elif self._depth == 1 and self._expect == "value":
+                    self._value_start = i
+                    self._expect = "in_value"
+            elif c == ":" and self._depth == 1 and self._expect == "colon":
+                self._expect = "value"
+            elif c in "{[":
+                if self._depth == 1 and self._expect == "value":
+                    self._value_start = i
+                    self._expect = "in_value"
+                self._depth += 1
+            elif c in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    if self._expect == "in_value":
+                        self._emit(buf[self._value_start:i], emitted)
+                    self.complete = True
+                elif self._depth == 1 and self._expect == "in_value":
+                    self._emit(buf[self._value_start:i + 1], emitted)
+                    self._expect = "comma"
+            elif c == "," and self._depth == 1:
+                if self._expect == "in_value":
+                    self._emit(buf[self._value_start:i], emitted)
+                self._expect = "key"
+            elif self._depth == 1 and self._expect == "value" and not c.isspace():
+                # Start of a scalar (number, true/false/null)
+                self._value_start = i
+                self._expect = "in_value"
+            i += 1
+
+        self._pos = i
+        return emitted
+
+    def _emit(self, text: str, emitted: list):
+        try:
+            value = json.loads(text)
+        except ValueError:
+            return
+        self.sections[self._key] = value
+        emitted.append((self._key, value))
@@ -1,35 +1,76 @@
 """Token service for managing generation credits."""
-from typing import Optional, Tuple
-from sqlalchemy.orm import Session
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+from sqlalchemy import and_, delete, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.token import GenerationToken
+from app.models.types import new_id
+from app.services.balance_cache import balance_cache, mark_balance_changed
 
 
-def get_or_create_token_record(db: Session, device_id: str) -> GenerationToken:
-    """Get or create a token record for a device."""
-    token = db.query(GenerationToken).filter(
-        GenerationToken.device_id == device_id
-    ).first()
+# Dialect-specific INSERT constructs that support ON CONFLICT
+_UPSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+@dataclass(frozen=True)
+class CreditReservation:
+    """A credit taken by ``reserve_credit``; ``kind`` is free_trial or paid."""
+    device_id: str
+    kind: str
+
+
+async def get_token_record(db: AsyncSession, device_id: str) -> Optional[GenerationToken]:
+    """Get a device's token record without creating one."""
+    result = await db.execute(
+        select(GenerationToken).where(GenerationToken.device_id == device_id)
+    )
+    return result.scalars().first()
+
+
+async def get_or_create_token_record(db: AsyncSession, device_id: str) -> GenerationToken:
+    """
+    Get or create a token record for a device.
+    
+    Only write paths (consuming or buying credits) call this; reads treat
+    a missing row as a fresh device.
+    """
+    result = await db.execute(
+        select(GenerationToken).where(GenerationToken.device_id == device_id)
+    )
+    token = result.scalars().first()
     
     if not token:
         token = GenerationToken(device_id=device_id)
         db.add(token)
-        db.commit()
-        db.refresh(token)
+        try:
+            await db.commit()
+        except IntegrityError:
+            # A concurrent request created the row first
+            await db.rollback()
+            result = await db.execute(
+                select(GenerationToken).where(GenerationToken.device_id == device_id)
+            )
+            return result.scalars().one()
+        await db.refresh(token)
     
     return token
 
 
-def check_can_generate(db: Session, device_id: str) -> Tuple[bool, str]:
+async def check_can_generate(db: AsyncSession, device_id: str) -> Tuple[bool, str]:
     """
     Check if a device can generate a validation.
     
     Returns:
         Tuple of (can_generate, reason)
     """
-    token = get_or_create_token_record(db, device_id)
+    token = await get_token_record(db, device_id)
     
     # Check free trial
-    if not token.free_trial_used:
+    if token is None or not token.free_trial_used:
         return True, "free_trial"
     
     # Check paid tokens
@@ -39,44 +80,196 @@ def check_can_generate(db: Session, device_id: str) -> Tuple[bool, str]:
     return False, "no_tokens"
 
 
-def use_generation(db: Session, device_id: str) -> bool:
+async def reserve_credit(db: AsyncSession, device_id: str) -> Optional[CreditReservation]:
+    """
+    Atomically take one credit, free trial first.
+    
+    Each attempt is a single conditional UPDATE, so concurrent requests
+    for one device can never take more credits than it has. The caller
+    commits, and hands the reservation to ``release_credit`` if the
+    validation fails.
+    
+    Returns:
+        The reservation, or None if no credits are available
+    """
+    await get_or_create_token_record(db, device_id)
+    mark_balance_changed(db, device_id)
+    
+    result = await db.execute(
+        update(GenerationToken)
+        .where(
+            GenerationToken.device_id == device_id,
+            GenerationToken.free_trial_used.is_(False),
+        )
+        .values(free_trial_used=True)
+        .execution_options(synchronize_session="fetch")
+    )
+    if result.rowcount == 1:
+        return CreditReservation(device_id, "free_trial")
+    
+    result = await db.execute(
+        update(GenerationToken)
+        .where(
+            GenerationToken.device_id == device_id,
+            GenerationToken.tokens_total > GenerationToken.tokens_used,
+        )
+        .values(tokens_used=GenerationToken.tokens_used + 1)
+        .execution_options(synchronize_session="fetch")
+    )
+    if result.rowcount == 1:
+        return CreditReservation(device_id, "paid")
+    
+    return None
+
+
+async def reserve_credits(db: AsyncSession, device_id: str, count: int) -> Optional[List[CreditReservation]]:
+    """
+    Atomically take ``count`` credits, all or none, free trial first.
+    
+    As in ``reserve_credit`` each attempt is one conditional UPDATE, so
+    concurrent requests can never take more credits than the device has.
+    The caller commits.
+    
+    Returns:
+        The reservations, or None if fewer than ``count`` credits are available
+    """
+    await get_or_create_token_record(db, device_id)
+    mark_balance_changed(db, device_id)
+    
+    result = await db.execute(
+        update(GenerationToken)
+        .where(
+            GenerationToken.device_id == device_id,
+            GenerationToken.free_trial_used.is_(False),
+            GenerationToken.tokens_total - GenerationToken.tokens_used >= count - 1,
+        )
+        .values(
+            free_trial_used=True,
+            tokens_used=GenerationToken.tokens_used + (count - 1),
+        )
+        .execution_options(synchronize_session="fetch")
+    )
+    if result.rowcount == 1:
+        return [CreditReservation(device_id, "free_trial")] + [CreditReservation(device_id, "paid")] * (count - 1)
+    
+    result = await db.execute(
+        update(GenerationToken)
+        .where(
+            GenerationToken.device_id == device_id,
+            GenerationToken.tokens_total - GenerationToken.tokens_used >= count,
+        )
+        .values(tokens_used=GenerationToken.tokens_used + count)
+        .execution_options(synchronize_session="fetch")
+    )
+    if result.rowcount == 1:
+        return [CreditReservation(device_id, "paid")] * count
+    
+    return None
+
+
+async def release_credit(db: AsyncSession, reservation: CreditReservation):
+    """Give back a reserved credit. The caller commits."""
+    mark_balance_changed(db, reservation.device_id)
+    stmt = update(GenerationToken).where(GenerationToken.device_id == reservation.device_id)
+    if reservation.kind == "free_trial":
+        stmt = stmt.values(free_trial_used=False)
+    else:
+        stmt = stmt.where(GenerationToken.tokens_used > 0).values(
+            tokens_used=GenerationToken.tokens_used - 1
+        )
+    await db.execute(stmt.execution_options(synchronize_session="fetch"))
+
+
+async def release_credits(db: AsyncSession, reservations: Sequence[CreditReservation]):
+    """Give back several reserved credits, one UPDATE per device. The caller commits."""
+    paid = Counter(r.device_id for r in reservations if r.kind == "paid")
+    for reservation in reservations:
+        if reservation.kind == "free_trial":
+            await release_credit(db, reservation)
+    for device_id, count in paid.items():
+        mark_balance_changed(db, device_id)
+        await db.execute(
+            update(GenerationToken)
+            .where(GenerationToken.device_id == device_id, GenerationToken.tokens_used >= count)
+            .values(tokens_used=GenerationToken.tokens_used - count)
+            .execution_options(synchronize_session="fetch")
+        )
+
+
+async def use_generation(db: AsyncSession, device_id: str) -> bool:
     """
     Use one generation credit.
     
     Returns:
         True if successful, False if no credits available
     """
-    token = get_or_create_token_record(db, device_id)
-    
-    # Use free trial first
-    if not token.free_trial_used:
-        token.free_trial_used = True
-        db.commit()
-        return True
+    reservation = await reserve_credit(db, device_id)
+    if reservation is None:
+        return False
+    await db.commit()
+    return True
+
+
+async def credit_tokens(db: AsyncSession, device_id: str, tokens: int, payment_id: str, product_sku: str):
+    """
+    Add purchased tokens in one statement, creating the record if needed.
     
-    # Use paid tokens
-    if token.tokens_remaining > 0:
-        token.tokens_used += 1
-        db.commit()
-        return True
+    An INSERT ... ON CONFLICT DO UPDATE increments the balance in SQL, so
+    concurrent purchases for one device all count and nothing commits
+    here: the caller can credit tokens and complete the payment in one
+    transaction.
+    """
+    mark_balance_changed(db, device_id)
+    dialect = db.get_bind().dialect.name
+    insert = _UPSERTS.get(dialect)
+    if insert is None:
+        raise ValueError(f"Unsupported database dialect for token upsert: {dialect}")
     
-    return False
+    now = datetime.utcnow()
+    stmt = insert(GenerationToken).values(
+        id=new_id(),
+        device_id=device_id,
+        tokens_total=tokens,
+        tokens_used=0,
+        free_trial_used=False,
+        payment_id=payment_id,
+        product_sku=product_sku,
+        created_at=now,
+        updated_at=now,
+    )
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[GenerationToken.device_id],
+            set_={
+                "tokens_total": GenerationToken.tokens_total + tokens,
+                "payment_id": payment_id,
+                "product_sku": product_sku,
+                "updated_at": now,
+            },
+        )
+    )
 
 
-def add_tokens(db: Session, device_id: str, tokens: int, payment_id: str, product_sku: str) -> GenerationToken:
-    """Add tokens after successful payment."""
-    token = get_or_create_token_record(db, device_id)
-    token.tokens_total += tokens
-    token.payment_id = payment_id
-    token.product_sku = product_sku
-    db.commit()
-    db.refresh(token)
+async def add_tokens(db: AsyncSession, device_id: str, tokens: int, payment_id: str, product_sku: str) -> GenerationToken:
+    """Add tokens after successful payment and commit."""
+    await credit_tokens(db, device_id, tokens, payment_id, product_sku)
+    await db.commit()
+    token = await get_token_record(db, device_id)
+    await db.refresh(token)
+    balance_cache.set(device_id, _status(token))
     return token
 
 
-def get_token_status(db: Session, device_id: str) -> dict:
-    """Get token status for a device."""
-    token = get_or_create_token_record(db, device_id)
+def _status(token: Optional[GenerationToken]) -> dict:
+    if token is None:
+        # No row yet: a fresh device with its free trial available
+        return {
+            "free_trial_used": False,
+            "tokens_total": 0,
+            "tokens_used": 0,
+            "tokens_remaining": 0,
+            "can_generate": True,
+        }
     return {
         "free_trial_used": token.free_trial_used,
         "tokens_total": token.tokens_total,
@@ -84,3 +277,58 @@ def get_token_status(db: Session, device_id: str) -> dict:
         "tokens_remaining": token.tokens_remaining,
         "can_generate": not token.free_trial_used or token.tokens_remaining > 0,
     }
+
+
+async def get_token_status(db: AsyncSession, device_id: str) -> dict:
+    """Get token status for a device, served from the balance cache when fresh."""
+    status = balance_cache.get(device_id)
+    if status is not None:
+        return status
+    
+    snapshot = balance_cache.snapshot()
+    token = await get_token_record(db, device_id)
+    status = _status(token)
+    balance_cache.set(device_id, status, snapshot)
+    return status
+
+
+_UNUSED = and_(
+    GenerationToken.free_trial_used.is_(False),
+    GenerationToken.tokens_total == 0,
+    GenerationToken.tokens_used == 0,
+    GenerationToken.payment_id.is_(None),
+)
+
+
+async def delete_unused_token_records(
+    db: AsyncSession,
+    created_before: datetime,
+    batch_size: int = 1000,
+) -> int:
+    """
+    Delete token records that never used the free trial or bought tokens.
+    
+    Rows are deleted in batches, each in its own transaction, so the table
+    is never locked for long.
+    
+    Returns:
+        Number of rows deleted
+    """
+    deleted = 0
+    while True:
+        result = await db.execute(
+            select(GenerationToken.id)
+            .where(_UNUSED, GenerationToken.created_at < created_before)
+            .limit(batch_size)
+        )
+        ids = result.scalars().all()
+        if not ids:
+            return deleted
+        # Re-check the condition in case a row was used since the select
+        result = await db.execute(
+            delete(GenerationToken)
+            .where(GenerationToken.id.in_(ids), _UNUSED)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        deleted += result.rowcount
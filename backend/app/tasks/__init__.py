@@ -0,0 +1 @@
+"""Batch maintenance tasks, run with ``python -m app.tasks.<name>``."""
@@ -0,0 +1,37 @@
+"""Delete GenerationToken rows for devices that never used a credit.
+
+Earlier versions created a row on every status read, so the table holds
+many rows for crawlers and one-off visitors. Safe to run repeatedly, e.g.
+from cron.
+
+Usage (from backend/):
+    python -m app.tasks.cleanup_tokens --older-than-days 7 --batch-size 1000
+"""
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+
+from app.database import SessionLocal, engine
+from app.services.token_service import delete_unused_token_records
+
+
+async def run(older_than_days: int, batch_size: int) -> int:
+    """Delete unused rows created more than ``older_than_days`` ago."""
+    created_before = datetime.utcnow() - timedelta(days=older_than_days)
+    async with SessionLocal() as db:
+        return await delete_unused_token_records(db, created_before, batch_size)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--older-than-days", type=int, default=7)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    deleted = await run(args.older_than_days, args.batch_size)
+    await engine.dispose()
+    print(f"Deleted {deleted} unused token records")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,79 @@
+"""Convert stored validation reports between the column and packed formats.
+
+Rewrites reports in batches; the ``payload`` column comes from the
+Alembic migrations. Safe to stop and rerun; only reports not yet in the
+target format are touched.
+
+Usage (from backend/):
+    python -m app.tasks.migrate_report_storage --to packed --batch-size 500
+    python -m app.tasks.migrate_report_storage --to columns
+"""
+import argparse
+import asyncio
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.database import SessionLocal, engine
+from app.models.report import ValidationReport
+
+settings = get_settings()
+
+
+async def convert_reports(db: AsyncSession, to: str, batch_size: int = 500, level: int = 6) -> int:
+    """
+    Rewrite reports into the ``to`` format ("packed" or "columns").
+
+    Args:
+        db: Database session
+        to: Target storage format
+        batch_size: Reports converted per commit
+        level: zlib compression level for packed reports
+
+    Returns:
+        Number of reports converted
+    """
+    if to == "packed":
+        pending = ValidationReport.payload.is_(None)
+    elif to == "columns":
+        pending = ValidationReport.payload.is_not(None)
+    else:
+        raise ValueError(f"Unknown report storage format: {to}")
+
+    converted = 0
+    while True:
+        result = await db.execute(
+            select(ValidationReport).where(pending).order_by(ValidationReport.id).limit(batch_size)
+        )
+        reports = result.scalars().all()
+        if not reports:
+            return converted
+        for report in reports:
+            if to == "packed":
+                report.pack(level)
+            else:
+                report.unpack()
+        await db.commit()
+        db.expunge_all()
+        converted += len(reports)
+
+
+async def run(to: str, batch_size: int) -> int:
+    async with SessionLocal() as db:
+        return await convert_reports(db, to, batch_size, settings.report_compression_level)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--to", choices=("packed", "columns"), default="packed")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    converted = await run(args.to, args.batch_size)
+    await engine.dispose()
+    print(f"Converted {converted} reports to {args.to} storage")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
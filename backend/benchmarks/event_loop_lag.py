@@ -0,0 +1,166 @@
+"""Event-loop lag under concurrent /tokens/status and /validate load.
+
+Compares the old blocking pattern (sync SQLAlchemy Session called inline from
+async handlers) with the async session path the app now uses. The LLM call is
+replaced with an ``asyncio.sleep`` so only database work competes for the loop.
+
+Usage (from backend/):
+    python -m benchmarks.event_loop_lag --requests 400 --concurrency 50
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from unittest.mock import patch
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base, get_db
+from app.main import app
+from app.models.report import ValidationReport
+from app.models.token import GenerationToken
+
+REPORT = {
+    "overall_score": 70,
+    "market_analysis": {"score": 70},
+    "competition_analysis": {"score": 70},
+    "technical_feasibility": {"score": 70},
+    "business_model": {"score": 70},
+    "risks": {"overall_risk_level": "medium"},
+    "suggestions": {"improvements": []},
+    "summary": "Benchmark report.",
+}
+
+
+class LagProbe:
+    """Samples how late a periodic sleep wakes up."""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples = []
+        self._task = None
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(time.perf_counter() - start - self.interval)
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+
+async def fake_validate_idea(**kwargs) -> dict:
+    """Stand-in for the LLM call."""
+    await asyncio.sleep(0.05)
+    return dict(REPORT)
+
+
+async def run_blocking(path: str, total: int, concurrency: int):
+    """Old pattern: sync Session work inline on the event loop."""
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with sem:
+            db = Session()
+            try:
+                device_id = f"device-{i}"
+                token = db.execute(
+                    select(GenerationToken).where(GenerationToken.device_id == device_id)
+                ).scalars().first()
+                if not token:
+                    token = GenerationToken(device_id=device_id)
+                    db.add(token)
+                    db.commit()
+                if i % 2:
+                    result = await fake_validate_idea()
+                    token.free_trial_used = True
+                    db.commit()
+                    db.add(ValidationReport(
+                        idea_title="Bench", idea_description="Bench idea description",
+                        device_id=device_id, **result,
+                    ))
+                    db.commit()
+            finally:
+                db.close()
+
+    await asyncio.gather(*(one(i) for i in range(total)))
+    engine.dispose()
+
+
+async def run_async(path: str, total: int, concurrency: int):
+    """New pattern: the real app with the async session."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    Session = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_get_db():
+        async with Session() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    sem = asyncio.Semaphore(concurrency)
+    body = {
+        "idea_title": "Bench",
+        "idea_description": "A benchmark idea description that is long enough.",
+        "language": "en",
+    }
+    with patch("app.api.v1.validate.validate_idea", fake_validate_idea):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+            async def one(i: int):
+                async with sem:
+                    if i % 2:
+                        await client.post(f"/api/v1/validate?device_id=device-{i}", json=body)
+                    else:
+                        await client.get(f"/api/v1/tokens/status?device_id=device-{i}")
+
+            await asyncio.gather(*(one(i) for i in range(total)))
+    app.dependency_overrides.clear()
+    await engine.dispose()
+
+
+def summarize(name: str, probe: LagProbe, elapsed: float, total: int):
+    samples = sorted(probe.samples) or [0.0]
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    print(
+        f"{name:<9} requests={total} elapsed={elapsed:.2f}s "
+        f"lag_mean={statistics.mean(samples) * 1000:.2f}ms "
+        f"lag_p99={p99 * 1000:.2f}ms lag_max={samples[-1] * 1000:.2f}ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    for name, runner in (("blocking", run_blocking), ("async", run_async)):
+        with tempfile.TemporaryDirectory() as tmp:
+            probe = LagProbe()
+            probe.start()
+            start = time.perf_counter()
+            await runner(os.path.join(tmp, "bench.db"), args.requests, args.concurrency)
+            elapsed = time.perf_counter() - start
+            await probe.stop()
+            summarize(name, probe, elapsed, args.requests)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
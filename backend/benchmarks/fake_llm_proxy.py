@@ -0,0 +1,311 @@
+"""A local stand-in for the OpenAI-compatible LLM proxy.
+
+Serves ``POST /v1/chat/completions``, plain and ``"stream": true`` (SSE
+chunks ending in ``data: [DONE]``), with a made-up but well-formed report:
+the full report for validation prompts, or ``{"<section>": ...}`` for the
+fan-out section prompts. Nothing leaves the machine, so the backend's
+throughput can be measured without the real ``LLM_PROXY_URL``.
+
+Each request waits a sampled time to first token (fixed, uniform or
+lognormal), then produces its completion at ``--tokens-per-second``
+(0 = all at once). ``--error-rate`` of requests fail with
+``--error-status`` after the first-token wait. ``GET /stats`` returns
+request, stream and error counts and the peak number in flight.
+
+Usage (from backend/):
+    python -m benchmarks.fake_llm_proxy --port 8089 --latency lognormal --latency-ms 800 --tokens-per-second 400
+    LLM_PROXY_URL=http://127.0.0.1:8089 uvicorn app.main:app
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, List
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.services.prompts import estimate_tokens
+
+SECTION_REQUEST = re.compile(r'\*\*Provide the "(\w+)" section')
+
+WORDS = (
+    "market customers growth pricing channel retention platform segment revenue "
+    "adoption partners regulation competitors onboarding workflow analytics"
+).split()
+
+
+@dataclass
+class ProxyProfile:
+    """How the fake proxy behaves; every field has a command line flag."""
+    latency: str = "lognormal"
+    latency_ms: float = 500.0
+    jitter: float = 0.5
+    tokens_per_second: float = 0.0
+    output_tokens: int = 1500
+    chunk_tokens: int = 8
+    error_rate: float = 0.0
+    error_status: int = 503
+    seed: int = 0
+
+    def first_token_seconds(self, rng: random.Random) -> float:
+        """Sample the wait before the first token."""
+        base = self.latency_ms / 1000
+        if self.latency == "fixed":
+            return base
+        if self.latency == "uniform":
+            return max(0.0, rng.uniform(base * (1 - self.jitter), base * (1 + self.jitter)))
+        # lognormal with ``latency_ms`` as the median: a long right tail
+        return base * math.exp(rng.gauss(0, self.jitter))
+
+
+@dataclass
+class ProxyStats:
+    requests: int = 0
+    streams: int = 0
+    errors: int = 0
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    completion_tokens: int = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "streams": self.streams,
+            "errors": self.errors,
+            "peak_in_flight": self.peak_in_flight,
+            "completion_tokens": self.completion_tokens,
+        }
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def _items(rng: random.Random, words: int) -> List[str]:
+    return [_text(rng, words) for _ in range(4)]
+
+
+def build_section(section: str, rng: random.Random, words: int) -> object:
+    """A value of ``section`` shaped like the prompt's JSON schema."""
+    score = rng.randint(40, 90)
+    sections = {
+        "overall_score": score,
+        "market_analysis": {
+            "tam": _text(rng, words),
+            "sam": _text(rng, words),
+            "som": _text(rng, words),
+            "market_trends": _items(rng, words),
+            "target_customers": _text(rng, words),
+            "score": score,
+        },
+        "competition_analysis": {
+            "direct_competitors": _items(rng, words),
+            "indirect_competitors": _items(rng, words),
+            "competitive_advantages": _items(rng, words),
+            "barriers_to_entry": _items(rng, words),
+            "score": score,
+        },
+        "technical_feasibility": {
+            "technology_stack": _items(rng, words),
+            "development_complexity": rng.choice(["low", "medium", "high"]),
+            "time_to_mvp": f"{rng.randint(4, 16)} weeks",
+            "key_technical_challenges": _items(rng, words),
+            "score": score,
+        },
+        "business_model": {
+            "revenue_streams": _items(rng, words),
+            "pricing_strategy": _text(rng, words),
+            "unit_economics": _text(rng, words),
+            "scalability": rng.choice(["low", "medium", "high"]),
+            "score": score,
+        },
+        "risks": {
+            "market_risks": _items(rng, words),
+            "technical_risks": _items(rng, words),
+            "financial_risks": _items(rng, words),
+            "regulatory_risks": _items(rng, words),
+            "overall_risk_level": rng.choice(["low", "medium", "high"]),
+        },
+        "suggestions": {
+            "immediate_actions": _items(rng, words),
+            "improvements": _items(rng, words),
+            "pivot_ideas": _items(rng, words),
+            "resources_needed": _items(rng, words),
+        },
+        "summary": _text(rng, words * 4),
+    }
+    return sections[section]
+
+
+# About 90 text values in a full report, 1-2 tokens per filler word
+REPORT_VALUES = 90
+SECTION_VALUES = 17
+
+
+def build_completion(body: dict, profile: ProxyProfile, rng: random.Random) -> str:
+    """The completion text for a chat request: a full report or one section."""
+    prompt = "\n".join(str(m.get("content", "")) for m in body.get("messages", []))
+    budget = min(profile.output_tokens, body.get("max_tokens") or profile.output_tokens)
+    match = SECTION_REQUEST.search(prompt)
+    if match:
+        words = max(2, budget // SECTION_VALUES // 2)
+        return json.dumps({match.group(1): build_section(match.group(1), rng, words)}, ensure_ascii=False)
+
+    words = max(2, budget // REPORT_VALUES // 2)
+    report = {
+        section: build_section(section, rng, words)
+        for section in (
+            "overall_score",
+            "market_analysis",
+            "competition_analysis",
+            "technical_feasibility",
+            "business_model",
+            "risks",
+            "suggestions",
+            "summary",
+        )
+    }
+    return "```json\n" + json.dumps(report, indent=2, ensure_ascii=False) + "\n```"
+
+
+def _chunks(content: str, chunk_tokens: int) -> List[str]:
+    size = max(1, chunk_tokens * 4)
+    return [content[i:i + size] for i in range(0, len(content), size)]
+
+
+def create_app(profile: ProxyProfile) -> FastAPI:
+    """Build the fake proxy application for ``profile``."""
+    app = FastAPI(title="Fake LLM proxy")
+    rng = random.Random(profile.seed)
+    stats = ProxyStats()
+    app.state.stats = stats
+
+    async def generation_pause(tokens: int):
+        if profile.tokens_per_second > 0:
+            await asyncio.sleep(tokens / profile.tokens_per_second)
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stream = bool(body.get("stream"))
+        stats.requests += 1
+        stats.streams += stream
+        stats.in_flight += 1
+        stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+        # A stream is still in flight when its response is returned
+        handed_off = False
+        try:
+            await asyncio.sleep(profile.first_token_seconds(rng))
+            if rng.random() < profile.error_rate:
+                stats.errors += 1
+                return JSONResponse(
+                    status_code=profile.error_status,
+                    content={"error": {"message": "injected upstream error"}},
+                )
+            content = build_completion(body, profile, rng)
+            prompt_tokens = sum(estimate_tokens(str(m.get("content", ""))) for m in body.get("messages", []))
+            completion_tokens = estimate_tokens(content)
+            stats.completion_tokens += completion_tokens
+            created = int(time.time())
+            model = body.get("model", "fake-model")
+
+            if not stream:
+                await generation_pause(completion_tokens)
+                return {
+                    "id": f"chatcmpl-{stats.requests}",
+                    "object": "chat.completion",
+                    "created": created,
+                    "model": model,
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }],
+                    "usage": {
+                        "prompt_tokens": prompt_tokens,
+                        "completion_tokens": completion_tokens,
+                        "total_tokens": prompt_tokens + completion_tokens,
+                    },
+                }
+
+            async def events() -> AsyncIterator[bytes]:
+                try:
+                    for piece in _chunks(content, profile.chunk_tokens):
+                        await generation_pause(profile.chunk_tokens)
+                        chunk = {
+                            "id": f"chatcmpl-{stats.requests}",
+                            "object": "chat.completion.chunk",
+                            "created": created,
+                            "model": model,
+                            "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}],
+                        }
+                        yield f"data: {json.dumps(chunk)}\n\n".encode()
+                    yield b"data: [DONE]\n\n"
+                finally:
+                    stats.in_flight -= 1
+
+            handed_off = True
+            return StreamingResponse(events(), media_type="text/event-stream")
+        finally:
+            if not handed_off:
+                stats.in_flight -= 1
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats.to_dict()
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    return app
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser):
+    """Add a flag for every ``ProxyProfile`` field."""
+    defaults = ProxyProfile()
+    parser.add_argument("--latency", choices=["fixed", "uniform", "lognormal"], default=defaults.latency)
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms,
+                        help="time to first token (the median for lognormal)")
+    parser.add_argument("--jitter", type=float, default=defaults.jitter,
+                        help="lognormal sigma, or the +/- fraction for uniform")
+    parser.add_argument("--tokens-per-second", type=float, default=defaults.tokens_per_second)
+    parser.add_argument("--output-tokens", type=int, default=defaults.output_tokens)
+    parser.add_argument("--chunk-tokens", type=int, default=defaults.chunk_tokens)
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate)
+    parser.add_argument("--error-status", type=int, default=defaults.error_status)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def profile_from_args(args: argparse.Namespace) -> ProxyProfile:
+    return ProxyProfile(
+        latency=args.latency,
+        latency_ms=args.latency_ms,
+        jitter=args.jitter,
+        tokens_per_second=args.tokens_per_second,
+        output_tokens=args.output_tokens,
+        chunk_tokens=args.chunk_tokens,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        seed=args.seed,
+    )
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    uvicorn.run(create_app(profile_from_args(args)), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
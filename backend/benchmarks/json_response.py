@@ -0,0 +1,78 @@
+"""Response serialization for report-returning endpoints.
+
+Times turning a parsed ~4000-token report into response bytes:
+
+* legacy   - build ``ValidateResponse``, then FastAPI's ``response_model``
+             pass (validate + serialize) and ``JSONResponse``
+* json     - ``json_response`` with the stdlib JSONResponse
+* orjson   - ``json_response`` with ORJSONResponse
+
+and, for GET /api/v1/reports/{id}, ``jsonable_encoder`` + JSONResponse
+against ``dump_json`` with each response class.
+
+Usage (from backend/):
+    python -m benchmarks.json_response --repeat 2000
+"""
+import argparse
+import timeit
+from unittest.mock import patch
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.api.v1.validate import ValidateResponse
+from app.config import get_settings
+from app.responses import dump_json, json_response
+from benchmarks.report_storage import build_report
+
+RESPONSE_FIELD = create_model_field(name="Response_validate", type_=ValidateResponse, mode="serialization")
+
+
+def legacy_validate(result: dict) -> bytes:
+    model = ValidateResponse(report_id="r" * 36, **result)
+    # serialize_response never awaits here, so drive it without an event loop
+    try:
+        serialize_response(field=RESPONSE_FIELD, response_content=model).send(None)
+    except StopIteration as done:
+        return JSONResponse(done.value).body
+
+
+def fast_validate(result: dict) -> bytes:
+    return json_response({"report_id": "r" * 36, **result}).body
+
+
+def legacy_report(report: dict) -> bytes:
+    return JSONResponse(jsonable_encoder(report)).body
+
+
+def time_call(fn, arg, repeat: int) -> float:
+    fn(arg)
+    return timeit.timeit(lambda: fn(arg), number=repeat) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    _, result = build_report(7)
+    report = {"id": "r" * 36, "idea_title": "Idea", "idea_description": "Description",
+              "language": "en", **result, "created_at": "2025-01-01T00:00:00"}
+    print(f"report: {len(dump_json(report))} bytes")
+
+    legacy = time_call(legacy_validate, result, args.repeat)
+    print(f"POST /validate legacy (response_model) {legacy:>8.1f}us")
+    for name, enabled in (("json", False), ("orjson", True)):
+        with patch.object(get_settings(), "orjson_responses", enabled):
+            print(f"POST /validate {name:<22} {time_call(fast_validate, result, args.repeat):>8.1f}us")
+
+    print(f"GET /reports legacy (jsonable_encoder) {time_call(legacy_report, report, args.repeat):>8.1f}us")
+    for name, enabled in (("json", False), ("orjson", True)):
+        with patch.object(get_settings(), "orjson_responses", enabled):
+            print(f"GET /reports {name:<24} {time_call(dump_json, report, args.repeat):>8.1f}us")
+
+
+if __name__ == "__main__":
+    main()
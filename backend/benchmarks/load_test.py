@@ -0,0 +1,384 @@
+"""End-to-end load test of the backend against the fake LLM proxy.
+
+Starts ``benchmarks.fake_llm_proxy`` in a subprocess (or uses
+``--proxy-url``), runs the app in-process over ASGI on a fresh database
+(a temporary tuned SQLite file unless ``--database-url`` is given) and
+sends an open-loop mix of requests at ``--rps`` for ``--seconds``:
+
+* validate  - POST /api/v1/validate (``--repeat-ratio`` of ideas repeat,
+              exercising the result cache and request coalescing)
+* stream    - POST /api/v1/validate/stream, read to the end
+* status    - GET /api/v1/tokens/status
+* report    - GET /api/v1/reports/{id}
+* webhook   - POST /api/v1/payment/webhook completing a pending checkout
+
+Requests are started on schedule whether or not earlier ones finished,
+so a slow backend shows up as latency instead of a lower offered rate.
+Reported: p50/p95/p99 per request kind, event-loop lag, time spent in
+write statements (on SQLite mostly waiting for the write lock) and
+"database is locked" errors, and the proxy's own counts. With
+``--max-error-rate`` / ``--max-p99-ms`` the exit status is 1 when a
+limit is exceeded, so a short run can gate CI; it needs no network.
+
+Usage (from backend/):
+    python -m benchmarks.load_test --rps 50 --seconds 30 --latency-ms 800 --tokens-per-second 400
+    python -m benchmarks.load_test --rps 20 --seconds 5 --latency-ms 50 --max-error-rate 0 --max-p99-ms 2000
+"""
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from contextlib import asynccontextmanager
+from unittest.mock import patch
+
+import httpx
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import get_settings
+from app.database import Base, build_engine, get_db
+from app.main import app
+from app.models.payment import PaymentTransaction
+from app.models.report import ValidationReport
+from app.models.token import GenerationToken
+from app.services.job_service import job_pool
+from app.services.payment_service import webhook_applier
+from benchmarks.event_loop_lag import LagProbe
+from benchmarks.fake_llm_proxy import add_profile_arguments
+
+settings = get_settings()
+
+KINDS = ("validate", "stream", "status", "report", "webhook")
+DEFAULT_MIX = "validate=2,stream=1,status=10,report=6,webhook=1"
+DEVICES = 200
+SEED_REPORTS = 100
+REPEATED_IDEAS = 20
+DESCRIPTION = (
+    "A marketplace that matches independent repair shops with customers who want "
+    "refurbished electronics, with warranties handled by the platform."
+)
+
+
+def parse_mix(text: str) -> dict:
+    mix = {}
+    for part in text.split(","):
+        kind, _, weight = part.partition("=")
+        if kind not in KINDS:
+            raise SystemExit(f"unknown request kind in --mix: {kind}")
+        mix[kind] = float(weight)
+    return mix
+
+
+def percentile(values: list, q: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+class DbWaits:
+    """Times write statements and counts lock errors through engine events."""
+
+    def __init__(self, engine):
+        self.durations = []
+        self.locked = 0
+        sync_engine = engine.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", self._before)
+        event.listen(sync_engine, "after_cursor_execute", self._after)
+        event.listen(sync_engine, "handle_error", self._error)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info["load_test_started"] = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.pop("load_test_started", None)
+        if started is not None and statement.lstrip()[:6].upper() in ("INSERT", "UPDATE", "DELETE"):
+            self.durations.append(time.perf_counter() - started)
+
+    def _error(self, context):
+        if "locked" in str(context.original_exception).lower():
+            self.locked += 1
+
+
+async def seed(sessions, checkouts: int) -> list:
+    """Devices with credits, some reports to read, and checkouts to complete."""
+    async with sessions() as db:
+        db.add_all(
+            GenerationToken(device_id=f"load-{n}", tokens_total=1_000_000, tokens_used=0)
+            for n in range(DEVICES)
+        )
+        reports = [
+            ValidationReport(
+                idea_title=f"Seeded idea {n}",
+                idea_description=DESCRIPTION,
+                device_id=f"load-{n % DEVICES}",
+                overall_score=70,
+                market_analysis={"score": 70},
+                summary="Seeded report.",
+            )
+            for n in range(SEED_REPORTS)
+        ]
+        db.add_all(reports)
+        db.add_all(
+            PaymentTransaction(
+                checkout_id=f"load-checkout-{n}",
+                device_id=f"load-{n % DEVICES}",
+                product_sku="validator_10",
+                amount_cents=999,
+            )
+            for n in range(checkouts)
+        )
+        await db.commit()
+        return [report.id for report in reports]
+
+
+class LoadRun:
+    """The request kinds and what each request measured."""
+
+    def __init__(self, client: AsyncClient, report_ids: list, repeat_ratio: float, rng: random.Random):
+        self.client = client
+        self.report_ids = report_ids
+        self.repeat_ratio = repeat_ratio
+        self.rng = rng
+        self.latencies = defaultdict(list)
+        self.failures = defaultdict(Counter)
+        self.counter = 0
+
+    def _device(self) -> str:
+        return f"load-{self.rng.randrange(DEVICES)}"
+
+    def _idea(self) -> dict:
+        if self.rng.random() < self.repeat_ratio:
+            title = f"Repeated idea {self.rng.randrange(REPEATED_IDEAS)}"
+        else:
+            title = f"Load test idea {self.counter}"
+        return {"idea_title": title, "idea_description": DESCRIPTION, "language": "en"}
+
+    async def validate(self) -> int:
+        response = await self.client.post(f"/api/v1/validate?device_id={self._device()}", json=self._idea())
+        if response.status_code == 200:
+            self.report_ids.append(response.json()["report_id"])
+        return response.status_code
+
+    async def stream(self) -> int:
+        async with self.client.stream(
+            "POST", f"/api/v1/validate/stream?device_id={self._device()}", json=self._idea()
+        ) as response:
+            body = (await response.aread()).decode()
+        if response.status_code == 200 and "event: complete" not in body:
+            return 599
+        return response.status_code
+
+    async def status(self) -> int:
+        response = await self.client.get(f"/api/v1/tokens/status?device_id={self._device()}")
+        return response.status_code
+
+    async def report(self) -> int:
+        response = await self.client.get(f"/api/v1/reports/{self.rng.choice(self.report_ids)}")
+        return response.status_code
+
+    async def webhook(self) -> int:
+        n = self.counter
+        body = json.dumps({
+            "id": f"load-event-{n}",
+            "type": "checkout.completed",
+            "data": {"id": f"load-order-{n}", "request_id": f"load-checkout-{n}"},
+        }).encode()
+        headers = {"Content-Type": "application/json"}
+        if settings.creem_webhook_secret:
+            headers["Creem-Signature"] = hmac.new(
+                settings.creem_webhook_secret.encode(), body, hashlib.sha256
+            ).hexdigest()
+        response = await self.client.post("/api/v1/payment/webhook", content=body, headers=headers)
+        return response.status_code
+
+    async def one(self, kind: str):
+        self.counter += 1
+        started = time.perf_counter()
+        try:
+            status = await getattr(self, kind)()
+        except Exception as e:
+            self.failures[kind][type(e).__name__] += 1
+            return
+        if status >= 400:
+            self.failures[kind][status] += 1
+        else:
+            self.latencies[kind].append(time.perf_counter() - started)
+
+
+async def offer_load(run: LoadRun, mix: dict, rps: float, seconds: float, poisson: bool, rng: random.Random) -> float:
+    """Start requests on schedule; returns the worst lateness of a start."""
+    kinds, weights = zip(*mix.items())
+    tasks = set()
+    worst_late = 0.0
+    start = time.perf_counter()
+    due = 0.0
+    while due < seconds:
+        delay = start + due - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        worst_late = max(worst_late, -delay)
+        task = asyncio.create_task(run.one(rng.choices(kinds, weights)[0]))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        due += rng.expovariate(rps) if poisson else 1 / rps
+    if tasks:
+        await asyncio.gather(*tasks)
+    return worst_late
+
+
+def wait_for_proxy(url: str, process: subprocess.Popen, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit("fake LLM proxy exited during startup")
+        try:
+            if httpx.get(f"{url}/health").status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise SystemExit("fake LLM proxy did not start")
+
+
+@asynccontextmanager
+async def fake_proxy(args: argparse.Namespace):
+    """URL of a running fake proxy: ``--proxy-url`` or a new subprocess."""
+    if args.proxy_url:
+        yield args.proxy_url
+        return
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    command = [
+        sys.executable, "-m", "benchmarks.fake_llm_proxy", "--port", str(port),
+        "--latency", args.latency, "--latency-ms", str(args.latency_ms), "--jitter", str(args.jitter),
+        "--tokens-per-second", str(args.tokens_per_second), "--output-tokens", str(args.output_tokens),
+        "--chunk-tokens", str(args.chunk_tokens), "--error-rate", str(args.error_rate),
+        "--error-status", str(args.error_status), "--seed", str(args.seed),
+    ]
+    process = subprocess.Popen(command)
+    url = f"http://127.0.0.1:{port}"
+    try:
+        await asyncio.to_thread(wait_for_proxy, url, process)
+        yield url
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def report(run: LoadRun, probe: LagProbe, waits: DbWaits, proxy_stats: dict, elapsed: float, late: float) -> tuple:
+    total = sum(len(v) for v in run.latencies.values())
+    failed = sum(sum(c.values()) for c in run.failures.values())
+    print(f"{'request':<9} {'ok':>6} {'failed':>7} {'ok/s':>7} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    worst_p99 = 0.0
+    for kind in KINDS:
+        values = run.latencies.get(kind, [])
+        if not values and not run.failures.get(kind):
+            continue
+        ms = [v * 1000 for v in values]
+        p99 = percentile(ms, 0.99)
+        if ms:
+            worst_p99 = max(worst_p99, p99)
+        print(
+            f"{kind:<9} {len(ms):>6} {sum(run.failures[kind].values()):>7} {len(ms) / elapsed:>7.1f} "
+            f"{percentile(ms, 0.5):>7.1f}ms {percentile(ms, 0.95):>7.1f}ms {p99:>7.1f}ms "
+            f"{max(ms, default=float('nan')):>7.1f}ms"
+        )
+    for kind, reasons in run.failures.items():
+        print(f"  {kind} failures: {dict(reasons)}")
+
+    lag = [s * 1000 for s in probe.samples] or [0.0]
+    print(
+        f"event loop lag: mean={statistics.mean(lag):.2f}ms p99={percentile(lag, 0.99):.2f}ms "
+        f"max={max(lag):.2f}ms; worst start delay {late * 1000:.1f}ms"
+    )
+    writes = [d * 1000 for d in waits.durations]
+    print(
+        f"db writes: {len(writes)} p50={percentile(writes, 0.5):.2f}ms p99={percentile(writes, 0.99):.2f}ms "
+        f"max={max(writes, default=float('nan')):.2f}ms; locked errors={waits.locked}"
+    )
+    print(f"llm proxy: {proxy_stats}")
+    error_rate = failed / (total + failed) if total + failed else 0.0
+    return error_rate, worst_p99
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rps", type=float, default=20)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="weights per request kind")
+    parser.add_argument("--poisson", action="store_true", help="Poisson arrivals instead of evenly spaced")
+    parser.add_argument("--repeat-ratio", type=float, default=0.2)
+    parser.add_argument("--database-url", default="", help="tables are dropped and recreated; defaults to a temporary SQLite file")
+    parser.add_argument("--proxy-url", default="", help="use a running proxy instead of starting one")
+    parser.add_argument("--max-error-rate", type=float, default=None)
+    parser.add_argument("--max-p99-ms", type=float, default=None)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    mix = parse_mix(args.mix)
+    rng = random.Random(args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = build_engine(args.database_url or f"sqlite:///{os.path.join(tmp, 'load.db')}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+        sessions = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+        checkouts = int(args.rps * args.seconds) + 1
+        report_ids = await seed(sessions, checkouts)
+        waits = DbWaits(engine)
+
+        async def override_get_db():
+            async with sessions() as db:
+                yield db
+
+        app.dependency_overrides[get_db] = override_get_db
+        try:
+            async with fake_proxy(args) as proxy_url:
+                # httpx rejects the "Bearer " header of an empty key
+                with patch.object(settings, "llm_proxy_url", proxy_url), \
+                        patch.object(settings, "llm_proxy_key", settings.llm_proxy_key or "load-test"), \
+                        patch.object(job_pool, "session_factory", sessions), \
+                        patch.object(webhook_applier, "session_factory", sessions):
+                    async with app.router.lifespan_context(app):
+                        async with AsyncClient(
+                            transport=ASGITransport(app=app), base_url="http://load", timeout=None
+                        ) as client:
+                            run = LoadRun(client, report_ids, args.repeat_ratio, rng)
+                            probe = LagProbe()
+                            probe.start()
+                            started = time.perf_counter()
+                            late = await offer_load(run, mix, args.rps, args.seconds, args.poisson, rng)
+                            elapsed = time.perf_counter() - started
+                            await probe.stop()
+                async with httpx.AsyncClient() as http:
+                    proxy_stats = (await http.get(f"{proxy_url}/stats")).json()
+        finally:
+            app.dependency_overrides.clear()
+            await engine.dispose()
+
+    error_rate, worst_p99 = report(run, probe, waits, proxy_stats, elapsed, late)
+    failed = []
+    if args.max_error_rate is not None and error_rate > args.max_error_rate:
+        failed.append(f"error rate {error_rate:.2%} > {args.max_error_rate:.2%}")
+    if args.max_p99_ms is not None and worst_p99 > args.max_p99_ms:
+        failed.append(f"p99 {worst_p99:.0f}ms > {args.max_p99_ms:.0f}ms")
+    for reason in failed:
+        print(f"FAILED: {reason}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,139 @@
+"""Per-request overhead and series growth of the request metrics middleware.
+
+Drives a minimal app with a ``/api/v1/reports/{report_id}`` route directly
+over ASGI (no HTTP client) with a distinct report id per request, and
+compares no middleware, the previous ``@app.middleware("http")`` version,
+and the pure ASGI ``MetricsMiddleware``. Each variant gets its own
+registry; series counts and ``/metrics`` size are reported at the end.
+
+Usage (from backend/):
+    python -m benchmarks.metrics_middleware --requests 100000
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from unittest.mock import patch
+
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
+from prometheus_client import CollectorRegistry, Counter, Histogram, generate_latest
+
+from app.middleware import BOT_PATTERNS, MetricsMiddleware
+
+TOOL = "idea-validator"
+USER_AGENT = b"Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 Chrome/120.0"
+
+
+def make_metrics(registry: CollectorRegistry):
+    return (
+        Counter("http_requests_total", "", ["tool", "endpoint", "method", "status"], registry=registry),
+        Histogram("http_request_duration_seconds", "", ["tool", "endpoint", "method"], registry=registry),
+        Counter("crawler_visits_total", "", ["tool", "bot"], registry=registry),
+    )
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/v1/reports/{report_id}")
+    async def get_report(report_id: str):
+        return PlainTextResponse(report_id)
+
+    return app
+
+
+def add_legacy_middleware(app: FastAPI, registry: CollectorRegistry):
+    """The middleware as it was before: BaseHTTPMiddleware, raw path labels."""
+    http_requests, http_request_duration, crawler_visits = make_metrics(registry)
+
+    @app.middleware("http")
+    async def metrics_middleware(request: Request, call_next):
+        start_time = time.time()
+        ua = request.headers.get("user-agent", "")
+        for bot in BOT_PATTERNS:
+            if bot.lower() in ua.lower():
+                crawler_visits.labels(tool=TOOL, bot=bot).inc()
+                break
+        response = await call_next(request)
+        duration = time.time() - start_time
+        endpoint = request.url.path
+        http_requests.labels(tool=TOOL, endpoint=endpoint, method=request.method,
+                             status=response.status_code).inc()
+        http_request_duration.labels(tool=TOOL, endpoint=endpoint,
+                                     method=request.method).observe(duration)
+        return response
+
+
+async def drive(app, total: int) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for _ in range(total):
+        path = f"/api/v1/reports/{uuid.uuid4()}"
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "root_path": "",
+            "query_string": b"",
+            "headers": [(b"host", b"bench"), (b"user-agent", USER_AGENT)],
+            "client": ("127.0.0.1", 1234),
+            "server": ("bench", 80),
+        }
+        await app(scope, receive, send)
+    return time.perf_counter() - start
+
+
+def series(registry: CollectorRegistry) -> int:
+    return sum(
+        1
+        for metric in registry.collect()
+        for sample in metric.samples
+        if sample.name == "http_requests_total"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100000)
+    args = parser.parse_args()
+
+    baseline = await drive(make_app(), args.requests)
+    print(f"{'none':<8} per_request={baseline / args.requests * 1e6:.1f}us")
+
+    legacy_registry = CollectorRegistry()
+    legacy_app = make_app()
+    add_legacy_middleware(legacy_app, legacy_registry)
+
+    asgi_registry = CollectorRegistry()
+    asgi_app = make_app()
+    asgi_app.add_middleware(MetricsMiddleware, tool=TOOL)
+    http_requests, http_request_duration, crawler_visits = make_metrics(asgi_registry)
+
+    for name, app, registry in (("legacy", legacy_app, legacy_registry), ("asgi", asgi_app, asgi_registry)):
+        with patch("app.middleware.http_requests", http_requests), \
+                patch("app.middleware.http_request_duration", http_request_duration), \
+                patch("app.middleware.crawler_visits", crawler_visits):
+            elapsed = await drive(app, args.requests)
+        start = time.perf_counter()
+        exposition = generate_latest(registry)
+        scrape = time.perf_counter() - start
+        print(
+            f"{name:<8} per_request={elapsed / args.requests * 1e6:.1f}us "
+            f"overhead={(elapsed - baseline) / args.requests * 1e6:.1f}us "
+            f"request_series={series(registry)} "
+            f"scrape_bytes={len(exposition)} scrape_time={scrape * 1000:.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,54 @@
+"""LLM report parsing: legacy split-on-backticks vs report_parser.
+
+Uses the fuzz corpus in tests/fixtures/llm_responses. For each response it
+times the legacy ``split("```json")`` + ``json.loads`` path (where it works
+at all) against ``extract_json_object`` and the full ``parse_report``.
+
+Usage (from backend/):
+    python -m benchmarks.report_parse --repeat 2000
+"""
+import argparse
+import json
+import timeit
+from pathlib import Path
+
+from app.services.report_parser import ReportParseError, extract_json_object, parse_report
+
+CORPUS_DIR = Path(__file__).parent.parent / "tests" / "fixtures" / "llm_responses"
+
+
+def legacy_parse(content: str) -> dict:
+    if "```json" in content:
+        content = content.split("```json")[1].split("```")[0]
+    elif "```" in content:
+        content = content.split("```")[1].split("```")[0]
+    return json.loads(content.strip())
+
+
+def time_call(fn, content: str, repeat: int) -> str:
+    try:
+        fn(content)
+    except (ValueError, ReportParseError):
+        return "fails"
+    seconds = timeit.timeit(lambda: fn(content), number=repeat)
+    return f"{seconds / repeat * 1e6:.1f}us"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'response':<30} {'bytes':>6} {'legacy':>10} {'extract':>10} {'parse_report':>13}")
+    for path in sorted(CORPUS_DIR.glob("*.txt")):
+        content = path.read_text()
+        print(
+            f"{path.name:<30} {len(content):>6} "
+            f"{time_call(legacy_parse, content, args.repeat):>10} "
+            f"{time_call(extract_json_object, content, args.repeat):>10} "
+            f"{time_call(parse_report, content, args.repeat):>13}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""Report storage: one JSON column per section vs one packed blob.
+
+Builds a deterministic corpus of full-size reports (4000-5000 LLM tokens
+each, mixed languages), stores it in a fresh SQLite file per format and
+reports the bytes stored per report, the insert time and the time to
+load a report and produce the response body of GET /api/v1/reports/{id}.
+
+Usage (from backend/):
+    python -m benchmarks.report_storage --reports 500 --reads 2000
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.database import Base
+from app.models.report import ValidationReport, dump_json
+
+WORDS = {
+    "en": (
+        "market customers pricing churn retention onboarding subscription growth "
+        "competitors differentiation channel partnerships regulation compliance "
+        "acquisition funnel margin scalability integration analytics platform"
+    ).split(),
+    "de": (
+        "Markt Kunden Preisgestaltung Abwanderung Bindung Wachstum Wettbewerber "
+        "Differenzierung Vertrieb Partnerschaften Regulierung Skalierbarkeit"
+    ).split(),
+    "ja": "市場 顧客 価格 解約 成長 競合 差別化 販売 提携 規制 収益 拡張性".split(),
+}
+
+
+def _sentence(rng: random.Random, language: str, words: int) -> str:
+    vocabulary = WORDS[language]
+    separator = "" if language == "ja" else " "
+    return separator.join(rng.choice(vocabulary) for _ in range(words)) + "."
+
+
+def _items(rng, language, count, words=14):
+    return [_sentence(rng, language, words) for _ in range(count)]
+
+
+def build_report(seed: int) -> tuple[str, dict]:
+    """A report shaped like the model output, 4000-5000 tokens long."""
+    rng = random.Random(seed)
+    language = rng.choice(list(WORDS))
+    paragraph = lambda: " ".join(_items(rng, language, 4, 18))  # noqa: E731
+    result = {
+        "overall_score": rng.randint(30, 90),
+        "market_analysis": {
+            "tam": paragraph(), "sam": paragraph(), "som": paragraph(),
+            "market_trends": _items(rng, language, 8),
+            "target_customers": paragraph(),
+            "score": rng.randint(30, 90),
+        },
+        "competition_analysis": {
+            "direct_competitors": [
+                {"name": f"Competitor {i}", "strengths": _items(rng, language, 3), "weaknesses": _items(rng, language, 3)}
+                for i in range(5)
+            ],
+            "indirect_competitors": _items(rng, language, 5, 8),
+            "competitive_advantages": _items(rng, language, 6),
+            "barriers_to_entry": _items(rng, language, 5),
+            "score": rng.randint(30, 90),
+        },
+        "technical_feasibility": {
+            "technology_stack": _items(rng, language, 8, 4),
+            "development_complexity": rng.choice(["low", "medium", "high"]),
+            "time_to_mvp": f"{rng.randint(4, 24)} weeks",
+            "key_technical_challenges": _items(rng, language, 6),
+            "score": rng.randint(30, 90),
+        },
+        "business_model": {
+            "revenue_streams": _items(rng, language, 5),
+            "pricing_strategy": paragraph(),
+            "unit_economics": paragraph(),
+            "scalability": paragraph(),
+            "score": rng.randint(30, 90),
+        },
+        "risks": {
+            "market_risks": _items(rng, language, 5),
+            "technical_risks": _items(rng, language, 5),
+            "financial_risks": _items(rng, language, 5),
+            "regulatory_risks": _items(rng, language, 5),
+            "overall_risk_level": rng.choice(["low", "medium", "high"]),
+        },
+        "suggestions": {
+            "immediate_actions": _items(rng, language, 6),
+            "improvements": _items(rng, language, 6),
+            "pivot_ideas": _items(rng, language, 4),
+            "resources_needed": _items(rng, language, 4),
+        },
+        "summary": " ".join(_items(rng, language, 8, 20)),
+    }
+    return language, result
+
+
+def _report(seed: int, packed: bool) -> ValidationReport:
+    language, result = build_report(seed)
+    report = ValidationReport(
+        id=str(uuid.UUID(int=seed)),
+        created_at=datetime(2025, 1, 1),
+        idea_title=f"Idea {seed}",
+        idea_description=_sentence(random.Random(-seed), language, 40),
+        language=language,
+        device_id=f"device-{seed}",
+        **result,
+    )
+    if packed:
+        report.pack()
+    return report
+
+
+async def measure(packed: bool, reports: int, reads: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "reports.db")
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        sessions = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+        corpus = [_report(seed, packed) for seed in range(1, reports + 1)]
+        started = time.perf_counter()
+        async with sessions() as db:
+            for report in corpus:
+                db.add(report)
+                await db.commit()
+        insert_seconds = time.perf_counter() - started
+
+        rng = random.Random(0)
+        started = time.perf_counter()
+        for _ in range(reads):
+            report_id = str(uuid.UUID(int=rng.randint(1, reports)))
+            async with sessions() as db:
+                report = await db.get(ValidationReport, report_id)
+                report.to_json()
+        read_seconds = time.perf_counter() - started
+
+        await engine.dispose()
+        return {
+            "file": os.path.getsize(path) / reports,
+            "insert": insert_seconds / reports,
+            "read": read_seconds / reads,
+        }
+
+
+def encode_decode_only(reports: int, repeat: int):
+    """Serialization cost alone, without the database."""
+    corpus = [build_report(seed)[1] for seed in range(1, reports + 1)]
+    columns = [_report(seed, False) for seed in range(1, 51)]
+    packed = [_report(seed, True) for seed in range(1, 51)]
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for report in columns:
+            report.to_json()
+    column_seconds = (time.perf_counter() - started) / (repeat * len(columns))
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for report in packed:
+            report.to_json()
+    packed_seconds = (time.perf_counter() - started) / (repeat * len(packed))
+    tokens = sum(len(dump_json(r)) for r in corpus) / len(corpus) / 4
+    return column_seconds, packed_seconds, tokens
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reports", type=int, default=500)
+    parser.add_argument("--reads", type=int, default=2000)
+    args = parser.parse_args()
+
+    column_body, packed_body, tokens = encode_decode_only(args.reports, 20)
+    print(f"corpus: {args.reports} reports, ~{tokens:.0f} tokens each")
+    print(f"to_json only: columns {column_body * 1e6:.0f}us, packed {packed_body * 1e6:.0f}us")
+    print(f"{'format':<8} {'file B/report':>14} {'insert':>10} {'load+body':>10}")
+    for name, packed in (("columns", False), ("packed", True)):
+        result = await measure(packed, args.reports, args.reads)
+        print(
+            f"{name:<8} {result['file']:>14.0f} "
+            f"{result['insert'] * 1e3:>8.2f}ms {result['read'] * 1e6:>8.0f}us"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,127 @@
+"""Concurrent reads and writes on file-backed SQLite: default vs tuned profile.
+
+Each worker loops for a fixed time. A write reserves a credit and stores a
+report in one transaction, the shape of a finished validation; a read
+looks up a token balance and a report by id. The default profile is a
+plain aiosqlite engine (rollback journal, NullPool); the tuned one is
+``app.database.build_engine`` (WAL, synchronous=NORMAL, busy timeout,
+cache/mmap pragmas, pooled connections).
+
+Usage (from backend/):
+    python -m benchmarks.sqlite_concurrency --workers 32 --seconds 10 --write-ratio 0.2
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.database import Base, build_engine, to_async_url
+from app.models.report import ValidationReport
+from app.models.token import GenerationToken
+from app.services.token_service import get_token_record, reserve_credit
+
+DEVICES = 500
+
+
+async def seed(sessions) -> list:
+    async with sessions() as db:
+        for device in range(DEVICES):
+            db.add(GenerationToken(device_id=f"device-{device}", tokens_total=1_000_000, tokens_used=0))
+        reports = [
+            ValidationReport(idea_title="Idea", idea_description="Description " * 20, device_id="seed")
+            for _ in range(200)
+        ]
+        db.add_all(reports)
+        await db.commit()
+        return [report.id for report in reports]
+
+
+async def write(db, rng: random.Random):
+    device_id = f"device-{rng.randrange(DEVICES)}"
+    await reserve_credit(db, device_id)
+    db.add(ValidationReport(
+        idea_title="Idea",
+        idea_description="Description " * 20,
+        device_id=device_id,
+        market_analysis={"summary": "x" * 2000},
+    ))
+    await db.commit()
+
+
+async def read(db, rng: random.Random, report_ids: list):
+    await get_token_record(db, f"device-{rng.randrange(DEVICES)}")
+    await db.get(ValidationReport, rng.choice(report_ids))
+    await db.rollback()
+
+
+async def measure(engine, workers: int, seconds: float, write_ratio: float) -> dict:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    report_ids = await seed(sessions)
+
+    latencies = {"read": [], "write": []}
+    errors = 0
+    deadline = time.perf_counter() + seconds
+
+    async def worker(seed_value: int):
+        nonlocal errors
+        rng = random.Random(seed_value)
+        while time.perf_counter() < deadline:
+            kind = "write" if rng.random() < write_ratio else "read"
+            started = time.perf_counter()
+            try:
+                async with sessions() as db:
+                    if kind == "write":
+                        await write(db, rng)
+                    else:
+                        await read(db, rng, report_ids)
+            except OperationalError:
+                errors += 1
+                continue
+            latencies[kind].append(time.perf_counter() - started)
+
+    await asyncio.gather(*(worker(i) for i in range(workers)))
+    await engine.dispose()
+
+    def pct(values, q):
+        return statistics.quantiles(values, n=100)[q - 1] * 1e3 if len(values) > 1 else float("nan")
+
+    return {
+        "reads": len(latencies["read"]) / seconds,
+        "writes": len(latencies["write"]) / seconds,
+        "read_p99": pct(latencies["read"], 99),
+        "write_p50": pct(latencies["write"], 50),
+        "write_p99": pct(latencies["write"], 99),
+        "errors": errors,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    args = parser.parse_args()
+
+    print(f"{'profile':<8} {'reads/s':>8} {'writes/s':>9} {'read p99':>9} {'write p50':>10} {'write p99':>10} {'errors':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ("default", "tuned"):
+            url = f"sqlite:///{os.path.join(tmp, name + '.db')}"
+            engine = build_engine(url) if name == "tuned" else create_async_engine(to_async_url(url))
+            result = await measure(engine, args.workers, args.seconds, args.write_ratio)
+            print(
+                f"{name:<8} {result['reads']:>8.0f} {result['writes']:>9.0f} "
+                f"{result['read_p99']:>7.1f}ms {result['write_p50']:>8.1f}ms "
+                f"{result['write_p99']:>8.1f}ms {result['errors']:>7}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
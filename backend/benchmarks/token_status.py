@@ -0,0 +1,75 @@
+"""Throughput of GET /api/v1/tokens/status with and without the balance cache.
+
+Simulates the frontend polling pattern: a pool of devices each hitting the
+status endpoint repeatedly against a file-backed SQLite database.
+
+Usage (from backend/):
+    python -m benchmarks.token_status --devices 200 --polls 10 --concurrency 50
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from unittest.mock import patch
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.database import Base, get_db
+from app.main import app
+from app.services.balance_cache import BalanceCache
+from app.config import get_settings
+
+settings = get_settings()
+
+
+async def run(path: str, cache: BalanceCache, devices: int, polls: int, concurrency: int) -> float:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    Session = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_get_db():
+        async with Session() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    sem = asyncio.Semaphore(concurrency)
+    with patch("app.services.token_service.balance_cache", cache), \
+            patch("app.services.balance_cache.balance_cache", cache):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+            async def poll(device: int):
+                async with sem:
+                    response = await client.get(f"/api/v1/tokens/status?device_id=device-{device}")
+                    response.raise_for_status()
+
+            # First visit creates the rows; not part of the measurement
+            await asyncio.gather(*(poll(d) for d in range(devices)))
+            start = time.perf_counter()
+            await asyncio.gather(*(poll(d) for _ in range(polls) for d in range(devices)))
+            elapsed = time.perf_counter() - start
+    app.dependency_overrides.clear()
+    await engine.dispose()
+    return elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=200)
+    parser.add_argument("--polls", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    total = args.devices * args.polls
+    for name, ttl in (("uncached", 0), ("cached", settings.token_status_cache_ttl_seconds)):
+        cache = BalanceCache(settings.token_status_cache_max_entries, ttl)
+        with tempfile.TemporaryDirectory() as tmp:
+            elapsed = await run(
+                os.path.join(tmp, "bench.db"), cache, args.devices, args.polls, args.concurrency
+            )
+        print(f"{name:<9} requests={total} elapsed={elapsed:.2f}s throughput={total / elapsed:.0f} req/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
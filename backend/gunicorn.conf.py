@@ -0,0 +1,62 @@
+"""Gunicorn configuration for running several uvicorn workers.
+
+Usage (from backend/):
+    alembic upgrade head
+    gunicorn app.main:app -c gunicorn.conf.py
+
+WEB_CONCURRENCY overrides the worker count, which defaults to the number
+of CPUs this process may run on.
+"""
+import asyncio
+import os
+import shutil
+
+# Workers skip the one-off startup work; the master does it in on_starting
+os.environ["STARTUP_TASKS_ENABLED"] = "false"
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus-multiproc")
+
+
+def default_workers() -> int:
+    """Worker count from WEB_CONCURRENCY, else the usable CPU count."""
+    if os.getenv("WEB_CONCURRENCY"):
+        return max(1, int(os.environ["WEB_CONCURRENCY"]))
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return max(1, os.cpu_count() or 1)
+
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = default_workers()
+worker_class = "uvicorn.workers.UvicornWorker"
+# LLM calls can take up to LLM_TIMEOUT_SECONDS; leave headroom
+timeout = 180
+graceful_timeout = 30
+keepalive = 5
+accesslog = "-"
+
+
+def reset_multiproc_dir(path: str):
+    """Remove metric files left by a previous run and recreate the directory."""
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+async def _prepare():
+    from app.database import engine
+    from app.main import run_startup_tasks
+
+    await run_startup_tasks()
+    await engine.dispose()
+
+
+def on_starting(server):
+    """Runs once in the master before any worker is forked."""
+    reset_multiproc_dir(os.environ["PROMETHEUS_MULTIPROC_DIR"])
+    asyncio.run(_prepare())
+
+
+def child_exit(server, worker):
+    """Drop the live gauges of a worker that exited."""
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
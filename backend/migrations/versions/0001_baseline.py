@@ -0,0 +1,77 @@
+"""Baseline schema, as created by init_db before migrations existed.
+
+Databases created by the old ``Base.metadata.create_all`` startup hook
+already have these tables but no alembic_version table; env.py stamps
+them at this revision before upgrading.
+
+Revision ID: 0001
+Revises:
+Create Date: 2025-01-20
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "validation_reports",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("idea_title", sa.String(255), nullable=False),
+        sa.Column("idea_description", sa.Text(), nullable=False),
+        sa.Column("language", sa.String(10)),
+        sa.Column("overall_score", sa.Integer()),
+        sa.Column("market_analysis", sa.JSON()),
+        sa.Column("competition_analysis", sa.JSON()),
+        sa.Column("technical_feasibility", sa.JSON()),
+        sa.Column("business_model", sa.JSON()),
+        sa.Column("risks", sa.JSON()),
+        sa.Column("suggestions", sa.JSON()),
+        sa.Column("summary", sa.Text()),
+        sa.Column("device_id", sa.String(64)),
+        sa.Column("created_at", sa.DateTime()),
+    )
+
+    op.create_table(
+        "generation_tokens",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("device_id", sa.String(64), nullable=False),
+        sa.Column("tokens_total", sa.Integer()),
+        sa.Column("tokens_used", sa.Integer()),
+        sa.Column("free_trial_used", sa.Boolean()),
+        sa.Column("payment_id", sa.String(64)),
+        sa.Column("product_sku", sa.String(64)),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    op.create_index("ix_generation_tokens_device_id", "generation_tokens", ["device_id"])
+
+    op.create_table(
+        "payment_transactions",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("checkout_id", sa.String(64), nullable=False),
+        sa.Column("device_id", sa.String(64), nullable=False),
+        sa.Column("product_sku", sa.String(64), nullable=False),
+        sa.Column("amount_cents", sa.Integer(), nullable=False),
+        sa.Column("currency", sa.String(3)),
+        sa.Column("status", sa.String(20)),
+        sa.Column("creem_order_id", sa.String(64)),
+        sa.Column("webhook_data", sa.JSON()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("completed_at", sa.DateTime()),
+    )
+    op.create_index(
+        "ix_payment_transactions_checkout_id", "payment_transactions", ["checkout_id"], unique=True
+    )
+    op.create_index("ix_payment_transactions_device_id", "payment_transactions", ["device_id"])
+
+
+def downgrade():
+    op.drop_table("payment_transactions")
+    op.drop_table("generation_tokens")
+    op.drop_table("validation_reports")
@@ -0,0 +1,54 @@
+"""Result cache and job tables, packed report payload column.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-01-20
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "validation_cache",
+        sa.Column("key", sa.String(64), primary_key=True),
+        sa.Column("result", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.Column("last_accessed_at", sa.DateTime()),
+    )
+    op.create_index("ix_validation_cache_expires_at", "validation_cache", ["expires_at"])
+    op.create_index("ix_validation_cache_last_accessed_at", "validation_cache", ["last_accessed_at"])
+
+    op.create_table(
+        "validation_jobs",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("status", sa.String(16), nullable=False),
+        sa.Column("idea_title", sa.String(255), nullable=False),
+        sa.Column("idea_description", sa.Text(), nullable=False),
+        sa.Column("language", sa.String(10)),
+        sa.Column("device_id", sa.String(64), nullable=False),
+        sa.Column("credit", sa.String(16), nullable=False),
+        sa.Column("report_id", sa.String(36)),
+        sa.Column("error", sa.Text()),
+        sa.Column("attempts", sa.Integer()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("started_at", sa.DateTime()),
+        sa.Column("finished_at", sa.DateTime()),
+    )
+    op.create_index("ix_validation_jobs_status", "validation_jobs", ["status"])
+
+    op.add_column("validation_reports", sa.Column("payload", sa.LargeBinary()))
+
+
+def downgrade():
+    with op.batch_alter_table("validation_reports") as batch:
+        batch.drop_column("payload")
+    op.drop_table("validation_jobs")
+    op.drop_table("validation_cache")
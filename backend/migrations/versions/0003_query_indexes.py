@@ -0,0 +1,98 @@
+"""Indexes for the hot queries; one token row per device.
+
+* validation_reports (device_id, created_at): a device's reports, newest first
+* validation_reports (created_at): recent reports
+* generation_tokens device_id becomes unique; duplicate rows for a device
+  are merged first (earlier versions could create two under concurrency)
+* generation_tokens (created_at): unused-row cleanup
+* payment_transactions (status, created_at): pending/failed payment scans
+* validation_jobs (status, created_at) replaces the status index, so the
+  worker's "oldest pending" query needs no sort
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2025-01-21
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+tokens = sa.table(
+    "generation_tokens",
+    sa.column("id", sa.String),
+    sa.column("device_id", sa.String),
+    sa.column("tokens_total", sa.Integer),
+    sa.column("tokens_used", sa.Integer),
+    sa.column("free_trial_used", sa.Boolean),
+    sa.column("created_at", sa.DateTime),
+)
+
+
+def merge_duplicate_tokens(bind):
+    """Fold every device's token rows into its oldest row."""
+    duplicated = bind.execute(
+        sa.select(tokens.c.device_id)
+        .group_by(tokens.c.device_id)
+        .having(sa.func.count() > 1)
+    ).scalars().all()
+
+    for device_id in duplicated:
+        rows = bind.execute(
+            sa.select(tokens)
+            .where(tokens.c.device_id == device_id)
+            .order_by(tokens.c.created_at, tokens.c.id)
+        ).all()
+        keep = rows[0]
+        bind.execute(
+            tokens.update()
+            .where(tokens.c.id == keep.id)
+            .values(
+                tokens_total=sum(row.tokens_total or 0 for row in rows),
+                tokens_used=sum(row.tokens_used or 0 for row in rows),
+                free_trial_used=any(row.free_trial_used for row in rows),
+            )
+        )
+        bind.execute(
+            tokens.delete().where(tokens.c.device_id == device_id, tokens.c.id != keep.id)
+        )
+
+
+def upgrade():
+    # Offline (--sql) runs cannot read rows; merge duplicates by hand first
+    if not context.is_offline_mode():
+        merge_duplicate_tokens(op.get_bind())
+    op.drop_index("ix_generation_tokens_device_id", table_name="generation_tokens")
+    op.create_index("ix_generation_tokens_device_id", "generation_tokens", ["device_id"], unique=True)
+    op.create_index("ix_generation_tokens_created_at", "generation_tokens", ["created_at"])
+
+    op.create_index(
+        "ix_validation_reports_device_id_created_at", "validation_reports", ["device_id", "created_at"]
+    )
+    op.create_index("ix_validation_reports_created_at", "validation_reports", ["created_at"])
+
+    op.create_index(
+        "ix_payment_transactions_status_created_at", "payment_transactions", ["status", "created_at"]
+    )
+
+    op.drop_index("ix_validation_jobs_status", table_name="validation_jobs")
+    op.create_index("ix_validation_jobs_status_created_at", "validation_jobs", ["status", "created_at"])
+
+
+def downgrade():
+    op.drop_index("ix_validation_jobs_status_created_at", table_name="validation_jobs")
+    op.create_index("ix_validation_jobs_status", "validation_jobs", ["status"])
+
+    op.drop_index("ix_payment_transactions_status_created_at", table_name="payment_transactions")
+
+    op.drop_index("ix_validation_reports_created_at", table_name="validation_reports")
+    op.drop_index("ix_validation_reports_device_id_created_at", table_name="validation_reports")
+
+    op.drop_index("ix_generation_tokens_created_at", table_name="generation_tokens")
+    op.drop_index("ix_generation_tokens_device_id", table_name="generation_tokens")
+    op.create_index("ix_generation_tokens_device_id", "generation_tokens", ["device_id"])
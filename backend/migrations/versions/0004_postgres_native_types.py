@@ -0,0 +1,74 @@
+"""Native PostgreSQL types: JSONB documents and UUID keys.
+
+The models map these columns to JSONB / UUID on PostgreSQL and to JSON /
+VARCHAR(36) elsewhere, so this revision only changes PostgreSQL
+databases.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2025-01-22
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+JSON_COLUMNS = {
+    "validation_reports": [
+        "market_analysis",
+        "competition_analysis",
+        "technical_feasibility",
+        "business_model",
+        "risks",
+        "suggestions",
+    ],
+    "payment_transactions": ["webhook_data"],
+    "validation_cache": ["result"],
+}
+
+UUID_COLUMNS = {
+    "validation_reports": ["id"],
+    "generation_tokens": ["id"],
+    "payment_transactions": ["id"],
+    "validation_jobs": ["id", "report_id"],
+}
+
+
+def _is_postgresql() -> bool:
+    return op.get_context().dialect.name == "postgresql"
+
+
+def upgrade():
+    if not _is_postgresql():
+        return
+    for table, columns in JSON_COLUMNS.items():
+        for column in columns:
+            op.alter_column(
+                table, column,
+                type_=postgresql.JSONB(),
+                postgresql_using=f"{column}::jsonb",
+            )
+    for table, columns in UUID_COLUMNS.items():
+        for column in columns:
+            op.alter_column(
+                table, column,
+                type_=postgresql.UUID(as_uuid=False),
+                postgresql_using=f"{column}::uuid",
+            )
+
+
+def downgrade():
+    if not _is_postgresql():
+        return
+    for table, columns in UUID_COLUMNS.items():
+        for column in columns:
+            op.alter_column(table, column, type_=sa.String(36), postgresql_using=f"{column}::text")
+    for table, columns in JSON_COLUMNS.items():
+        for column in columns:
+            op.alter_column(table, column, type_=sa.JSON(), postgresql_using=f"{column}::json")
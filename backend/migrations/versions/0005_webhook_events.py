@@ -0,0 +1,35 @@
+"""Webhook event table for idempotent and deferred payment processing.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2025-01-23
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "webhook_events",
+        sa.Column("id", sa.String(128), primary_key=True),
+        sa.Column("event_type", sa.String(64)),
+        sa.Column("status", sa.String(16), nullable=False),
+        sa.Column("payload", sa.JSON().with_variant(postgresql.JSONB(), "postgresql")),
+        sa.Column("detail", sa.Text()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("processed_at", sa.DateTime()),
+    )
+    op.create_index(
+        "ix_webhook_events_status_created_at", "webhook_events", ["status", "created_at"]
+    )
+
+
+def downgrade():
+    op.drop_table("webhook_events")
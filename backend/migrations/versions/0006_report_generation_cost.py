@@ -0,0 +1,33 @@
+"""Prompt version, token counts and LLM time per report.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2025-01-24
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+COLUMNS = (
+    ("prompt_version", sa.String(32)),
+    ("input_tokens", sa.Integer()),
+    ("output_tokens", sa.Integer()),
+    ("llm_duration_ms", sa.Integer()),
+)
+
+
+def upgrade():
+    for name, type_ in COLUMNS:
+        op.add_column("validation_reports", sa.Column(name, type_))
+
+
+def downgrade():
+    with op.batch_alter_table("validation_reports") as batch:
+        for name, _ in reversed(COLUMNS):
+            batch.drop_column(name)
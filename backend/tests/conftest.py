@@ -1,53 +1,125 @@
 """Test fixtures and configuration."""
+import os
 import pytest
-from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+import pytest_asyncio
+from unittest.mock import patch
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool, StaticPool
 
 from app.main import app
-from app.database import Base, get_db
+from app.database import Base, get_db, engine as app_engine, to_async_url
+from app.services.balance_cache import balance_cache
+from app.services.job_service import job_pool
+from app.services.payment_service import webhook_applier
+from app.services.report_cache import report_cache
+from app.services.resilience import build_llm_caller
+from app.services.result_cache import get_result_cache
 
 
-# Create in-memory SQLite for tests
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+# In-memory SQLite unless TEST_DATABASE_URL points at a PostgreSQL test
+# database (e.g. docker compose --profile postgres up postgres)
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL", "")
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
+if TEST_DATABASE_URL:
+    SQLALCHEMY_DATABASE_URL = to_async_url(TEST_DATABASE_URL)
+    # Every test runs in its own event loop, and asyncpg connections
+    # cannot be shared between loops, so nothing is pooled
+    engine = create_async_engine(SQLALCHEMY_DATABASE_URL, poolclass=NullPool)
+else:
+    SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
+    engine = create_async_engine(
+        SQLALCHEMY_DATABASE_URL,
+        poolclass=StaticPool,
+    )
+
+TestingSessionLocal = async_sessionmaker(
+    bind=engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
 )
 
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session", autouse=True)
+async def dispose_engines():
+    """Dispose async engines so aiosqlite worker threads exit with the session."""
+    yield
+    await engine.dispose()
+    await app_engine.dispose()
 
 
-@pytest.fixture(scope="function")
-def db():
+@pytest_asyncio.fixture(scope="function")
+async def db():
     """Create a fresh database for each test."""
-    Base.metadata.create_all(bind=engine)
-    db = TestingSessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-        Base.metadata.drop_all(bind=engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with TestingSessionLocal() as session:
+        yield session
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+
+
+@pytest_asyncio.fixture(scope="function")
+async def file_sessions(tmp_path):
+    """Sessions on a file database, each with its own connection, for concurrency tests."""
+    if TEST_DATABASE_URL:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        yield TestingSessionLocal
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+        return
+    
+    file_engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'concurrency.db'}",
+        connect_args={"timeout": 30},
+    )
+    async with file_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(bind=file_engine, class_=AsyncSession, expire_on_commit=False)
+    await file_engine.dispose()
 
 
-@pytest.fixture(scope="function")
-def client(db):
+@pytest_asyncio.fixture(scope="function")
+async def client(db):
     """Create a test client with database override."""
-    def override_get_db():
-        try:
-            yield db
-        finally:
-            pass
+    async def override_get_db():
+        yield db
     
     app.dependency_overrides[get_db] = override_get_db
-    with TestClient(app) as test_client:
-        yield test_client
+    with patch.object(job_pool, "session_factory", TestingSessionLocal), \
+            patch.object(webhook_applier, "session_factory", TestingSessionLocal):
+        async with app.router.lifespan_context(app):
+            async with AsyncClient(
+                transport=ASGITransport(app=app),
+                base_url="http://testserver",
+            ) as test_client:
+                yield test_client
     app.dependency_overrides.clear()
 
 
+@pytest.fixture(autouse=True)
+def clear_result_cache():
+    """Keep cached LLM results, balances and reports from leaking between tests."""
+    get_result_cache().clear()
+    balance_cache.clear()
+    report_cache.clear()
+    yield
+    get_result_cache().clear()
+    balance_cache.clear()
+    report_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def llm_caller():
+    """Give each test a fresh circuit breaker and no retry backoff."""
+    caller = build_llm_caller()
+    caller.backoff_seconds = 0
+    with patch("app.services.llm_service.llm_caller", caller):
+        yield caller
+
+
 @pytest.fixture
 def device_id():
     """Test device ID."""
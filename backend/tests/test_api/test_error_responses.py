@@ -7,14 +7,14 @@ import pytest
 from unittest.mock import patch
 
 
-def test_402_error_detail_is_string(client, device_id, db):
+async def test_402_error_detail_is_string(client, device_id, db):
     """Verify 402 error detail is serializable as string."""
     from app.services.token_service import use_generation
     
     # Use up free trial
-    use_generation(db, device_id)
+    await use_generation(db, device_id)
     
-    response = client.post(
+    response = await client.post(
         f"/api/v1/validate?device_id={device_id}",
         json={
             "idea_title": "Test Idea",
@@ -33,9 +33,9 @@ def test_402_error_detail_is_string(client, device_id, db):
     assert "object Object" not in detail.lower()
 
 
-def test_400_error_detail_is_string(client):
+async def test_400_error_detail_is_string(client):
     """Verify 400 error detail is serializable as string."""
-    response = client.get("/api/v1/tokens/status")  # Missing device_id
+    response = await client.get("/api/v1/tokens/status")  # Missing device_id
     
     assert response.status_code == 400
     data = response.json()
@@ -44,9 +44,9 @@ def test_400_error_detail_is_string(client):
     assert isinstance(detail, str), f"400 detail must be string, got {type(detail)}: {detail}"
 
 
-def test_404_error_detail_is_string(client):
+async def test_404_error_detail_is_string(client):
     """Verify 404 error detail is serializable as string."""
-    response = client.get("/api/v1/reports/non-existent-id")
+    response = await client.get("/api/v1/reports/non-existent-id")
     
     assert response.status_code == 404
     data = response.json()
@@ -56,11 +56,11 @@ def test_404_error_detail_is_string(client):
 
 
 @patch("app.api.v1.validate.validate_idea")
-def test_500_error_detail_is_string(mock_validate, client, device_id):
+async def test_500_error_detail_is_string(mock_validate, client, device_id):
     """Verify 500 error detail is serializable as string."""
     mock_validate.side_effect = Exception("LLM service unavailable")
     
-    response = client.post(
+    response = await client.post(
         f"/api/v1/validate?device_id={device_id}",
         json={
             "idea_title": "Test Idea",
@@ -77,9 +77,9 @@ def test_500_error_detail_is_string(mock_validate, client, device_id):
     assert "[object Object]" not in detail
 
 
-def test_422_validation_error_is_serializable(client, device_id):
+async def test_422_validation_error_is_serializable(client, device_id):
     """Verify 422 validation errors are properly serializable."""
-    response = client.post(
+    response = await client.post(
         f"/api/v1/validate?device_id={device_id}",
         json={
             "idea_title": "",  # Invalid: too short
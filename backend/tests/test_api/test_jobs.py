@@ -0,0 +1,175 @@
+"""Tests for asynchronous validation jobs."""
+import asyncio
+import pytest
+from sqlalchemy import select
+from unittest.mock import patch, AsyncMock
+
+from app.models.job import ValidationJob, JOB_PENDING, JOB_RUNNING
+from app.models.report import ValidationReport
+from app.services.job_service import job_pool
+from app.services.token_service import add_tokens, get_token_status, reserve_credit
+from tests.conftest import TestingSessionLocal
+
+
+BODY = {
+    "idea_title": "AI Food Planner",
+    "idea_description": "An AI-powered meal planning application for busy families.",
+    "language": "en",
+}
+
+RESULT = {
+    "overall_score": 75,
+    "market_analysis": {"score": 70},
+    "summary": "A promising startup idea.",
+}
+
+
+def _job(device_id: str, status: str = JOB_PENDING, credit: str = "paid") -> ValidationJob:
+    return ValidationJob(
+        device_id=device_id,
+        status=status,
+        credit=credit,
+        idea_title=BODY["idea_title"],
+        idea_description=BODY["idea_description"],
+    )
+
+
+async def _submit(client, device_id):
+    response = await client.post(f"/api/v1/validate?mode=async&device_id={device_id}", json=BODY)
+    assert response.status_code == 202
+    return response
+
+
+@patch("app.services.job_service.validate_idea", new_callable=AsyncMock)
+async def test_async_mode_returns_job_and_result(mock_validate, client, device_id):
+    """Test async mode queues a job whose result can be polled."""
+    mock_validate.return_value = RESULT
+
+    response = await _submit(client, device_id)
+    job_id = response.json()["job_id"]
+    assert response.headers["Location"] == f"/api/v1/jobs/{job_id}"
+    assert response.json()["status"] == "pending"
+
+    await job_pool.join()
+    job = await client.get(f"/api/v1/jobs/{job_id}")
+
+    assert job.status_code == 200
+    data = job.json()
+    assert data["status"] == "succeeded"
+    assert data["result"]["id"] == data["report_id"]
+    assert data["result"]["overall_score"] == 75
+
+    status = await client.get(f"/api/v1/tokens/status?device_id={device_id}")
+    assert status.json()["free_trial_used"] is True
+
+
+@patch("app.services.job_service.validate_idea", new_callable=AsyncMock)
+async def test_failed_job_is_not_charged(mock_validate, client, device_id):
+    """Test a failing job reports the error and keeps the credit."""
+    mock_validate.side_effect = RuntimeError("upstream down")
+
+    job_id = (await _submit(client, device_id)).json()["job_id"]
+    await job_pool.join()
+    data = (await client.get(f"/api/v1/jobs/{job_id}")).json()
+
+    assert data["status"] == "failed"
+    assert "upstream down" in data["error"]
+    assert "result" not in data
+    status = await client.get(f"/api/v1/tokens/status?device_id={device_id}")
+    assert status.json()["free_trial_used"] is False
+
+
+async def test_async_mode_requires_credit(client, device_id):
+    """Test credits are checked before a job is queued."""
+    response = await client.post("/api/v1/validate?mode=async", json=BODY)
+    assert response.status_code == 400
+
+
+async def test_invalid_mode(client, device_id):
+    """Test unknown modes are rejected."""
+    response = await client.post(f"/api/v1/validate?mode=later&device_id={device_id}", json=BODY)
+    assert response.status_code == 422
+
+
+async def test_get_unknown_job(client):
+    """Test polling an unknown job returns 404."""
+    response = await client.get("/api/v1/jobs/does-not-exist")
+    assert response.status_code == 404
+
+
+@patch("app.services.job_service.validate_idea", new_callable=AsyncMock)
+async def test_pending_jobs_resume_on_start(mock_validate, db, device_id):
+    """Test pending and interrupted jobs are re-run after a restart, once each."""
+    mock_validate.return_value = RESULT
+    await add_tokens(db, device_id, 3, "pay_1", "validator_3")
+    for status in (JOB_PENDING, JOB_RUNNING):
+        reservation = await reserve_credit(db, device_id)
+        db.add(_job(device_id, status, reservation.kind))
+    await db.commit()
+
+    with patch.object(job_pool, "session_factory", TestingSessionLocal):
+        await job_pool.reset_interrupted()
+        await job_pool.start()
+        await job_pool.join()
+        await job_pool.stop()
+
+    jobs = (await db.execute(
+        select(ValidationJob).execution_options(populate_existing=True)
+    )).scalars().all()
+    assert [j.status for j in jobs] == ["succeeded", "succeeded"]
+    assert all(j.attempts == 1 for j in jobs)
+    reports = (await db.execute(select(ValidationReport))).scalars().all()
+    assert sorted(r.id for r in reports) == sorted(j.report_id for j in jobs)
+    status = await get_token_status(db, device_id)
+    assert status["free_trial_used"] is True
+    assert status["tokens_used"] == 1
+
+
+@patch("app.services.job_service.validate_idea", new_callable=AsyncMock)
+async def test_job_is_claimed_once(mock_validate, file_sessions, device_id):
+    """Test two workers racing for one job run it once."""
+    mock_validate.return_value = RESULT
+    async with file_sessions() as db:
+        await add_tokens(db, device_id, 1, "pay_1", "validator_3")
+        job = _job(device_id)
+        db.add(job)
+        await db.commit()
+
+    with patch.object(job_pool, "session_factory", file_sessions):
+        await asyncio.gather(job_pool.run_job(job.id), job_pool.run_job(job.id))
+
+    assert mock_validate.await_count == 1
+    async with file_sessions() as db:
+        assert (await db.get(ValidationJob, job.id)).attempts == 1
+
+
+@patch("app.services.job_service.validate_idea", new_callable=AsyncMock)
+async def test_finished_job_is_not_rerun(mock_validate, client, db, device_id):
+    """Test running a finished job again does not charge twice."""
+    mock_validate.return_value = RESULT
+    job_id = (await _submit(client, device_id)).json()["job_id"]
+    await job_pool.join()
+
+    await job_pool.run_job(job_id)
+
+    assert mock_validate.await_count == 1
+    reports = (await db.execute(select(ValidationReport))).scalars().all()
+    assert len(reports) == 1
+
+
+@patch("app.services.job_service.validate_idea", new_callable=AsyncMock)
+async def test_failed_job_releases_paid_credit(mock_validate, client, db, device_id):
+    """Test a failed job gives back the paid credit it reserved."""
+    mock_validate.side_effect = RuntimeError("upstream down")
+    await add_tokens(db, device_id, 3, "pay_1", "validator_3")
+    await reserve_credit(db, device_id)
+    await db.commit()
+
+    job_id = (await _submit(client, device_id)).json()["job_id"]
+    status = await client.get(f"/api/v1/tokens/status?device_id={device_id}")
+    assert status.json()["tokens_remaining"] == 2
+    await job_pool.join()
+
+    status = await client.get(f"/api/v1/tokens/status?device_id={device_id}")
+    assert status.json()["tokens_remaining"] == 3
+    assert (await client.get(f"/api/v1/jobs/{job_id}")).json()["status"] == "failed"
@@ -2,24 +2,24 @@
 import pytest
 
 
-def test_health_check(client):
+async def test_health_check(client):
     """Test health endpoint returns healthy status."""
-    response = client.get("/health")
+    response = await client.get("/health")
     assert response.status_code == 200
     assert response.json()["status"] == "healthy"
 
 
-def test_root_endpoint(client):
+async def test_root_endpoint(client):
     """Test root endpoint returns API info."""
-    response = client.get("/")
+    response = await client.get("/")
     assert response.status_code == 200
     data = response.json()
     assert "service" in data
     assert "version" in data
 
 
-def test_metrics_endpoint(client):
+async def test_metrics_endpoint(client):
     """Test metrics endpoint returns Prometheus format."""
-    response = client.get("/metrics")
+    response = await client.get("/metrics")
     assert response.status_code == 200
     assert "text/plain" in response.headers["content-type"] or "text/plain" in str(response.headers)
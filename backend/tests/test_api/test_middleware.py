@@ -0,0 +1,79 @@
+"""Tests for the request metrics middleware."""
+import pytest
+
+from app.metrics import http_requests, http_request_duration, crawler_visits
+from app.middleware import UNMATCHED_ROUTE, match_bot
+
+
+def _requests(endpoint: str, method: str, status: int) -> float:
+    return http_requests.labels(
+        tool="idea-validator", endpoint=endpoint, method=method, status=status
+    )._value.get()
+
+
+def _endpoints() -> set:
+    return {
+        sample.labels["endpoint"]
+        for metric in http_requests.collect()
+        for sample in metric.samples
+    }
+
+
+async def test_requests_are_labelled_by_route_template(client):
+    """Test path parameters do not create new series."""
+    template = "/api/v1/reports/{report_id}"
+    before = _requests(template, "GET", 404)
+
+    for report_id in ("a1", "b2", "c3"):
+        response = await client.get(f"/api/v1/reports/{report_id}")
+        assert response.status_code == 404
+
+    assert _requests(template, "GET", 404) == before + 3
+    assert not any(e.startswith("/api/v1/reports/") and e != template for e in _endpoints())
+
+
+async def test_unmatched_paths_share_one_label(client):
+    """Test unknown paths are not recorded verbatim."""
+    before = _requests(UNMATCHED_ROUTE, "GET", 404)
+
+    await client.get("/wp-admin/setup.php")
+    await client.get("/.env")
+
+    assert _requests(UNMATCHED_ROUTE, "GET", 404) == before + 2
+    assert "/.env" not in _endpoints()
+
+
+async def test_duration_is_observed(client):
+    """Test request latency is recorded per route."""
+    histogram = http_request_duration.labels(tool="idea-validator", endpoint="/health", method="GET")
+    before = histogram._sum.get()
+
+    await client.get("/health")
+
+    assert histogram._sum.get() > before
+
+
+async def test_crawler_visits_are_counted(client):
+    """Test bot User-Agents are counted under the canonical bot name."""
+    counter = crawler_visits.labels(tool="idea-validator", bot="Googlebot")
+    before = counter._value.get()
+
+    await client.get("/health", headers={"User-Agent": "Mozilla/5.0 (compatible; GOOGLEBOT/2.1)"})
+    await client.get("/health", headers={"User-Agent": "Mozilla/5.0 Firefox/120.0"})
+
+    assert counter._value.get() == before + 1
+
+
+@pytest.mark.parametrize(
+    "user_agent, bot",
+    [
+        ("Mozilla/5.0 (compatible; bingbot/2.0)", "bingbot"),
+        ("facebookexternalhit/1.1", "facebookexternalhit"),
+        ("Mozilla/5.0 (compatible; Yahoo! Slurp)", "Slurp"),
+        ("Mozilla/5.0 (X11; Linux x86_64) Chrome/120.0", None),
+        ("", None),
+    ],
+)
+def test_match_bot(user_agent, bot):
+    """Test the precompiled bot regex."""
+    assert match_bot(user_agent) == bot
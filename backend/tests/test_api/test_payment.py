@@ -1,12 +1,13 @@
 """Tests for payment API endpoints."""
 import pytest
 import json
-from unittest.mock import patch, AsyncMock
+import httpx
+from unittest.mock import patch, AsyncMock, MagicMock
 
 
-def test_checkout_invalid_product(client, device_id):
+async def test_checkout_invalid_product(client, device_id):
     """Test checkout with invalid product SKU."""
-    response = client.post(
+    response = await client.post(
         "/api/v1/payment/checkout",
         json={
             "product_sku": "invalid_product",
@@ -20,9 +21,9 @@ def test_checkout_invalid_product(client, device_id):
     assert isinstance(detail, str), f"Error detail should be string: {detail}"
 
 
-def test_checkout_missing_device_id(client):
+async def test_checkout_missing_device_id(client):
     """Test checkout without device ID."""
-    response = client.post(
+    response = await client.post(
         "/api/v1/payment/checkout",
         json={
             "product_sku": "validator_3",
@@ -33,23 +34,20 @@ def test_checkout_missing_device_id(client):
     assert response.status_code in [400, 422, 500]
 
 
-@patch("app.api.v1.payment.httpx.AsyncClient")
-def test_checkout_success(mock_client, client, device_id):
+@patch("app.api.v1.payment.get_creem_client")
+async def test_checkout_success(mock_get_client, client, device_id):
     """Test successful checkout creation."""
     # Mock Creem API response
-    mock_response = AsyncMock()
+    mock_response = MagicMock()
     mock_response.status_code = 200
     mock_response.json.return_value = {
         "checkout_url": "https://checkout.creem.io/xxx",
         "id": "chk_123"
     }
-    mock_response.raise_for_status = AsyncMock()
     
     mock_client_instance = AsyncMock()
     mock_client_instance.post.return_value = mock_response
-    mock_client_instance.__aenter__.return_value = mock_client_instance
-    mock_client_instance.__aexit__.return_value = None
-    mock_client.return_value = mock_client_instance
+    mock_get_client.return_value = mock_client_instance
     
     # Need to set product IDs in env
     with patch("app.api.v1.payment.settings") as mock_settings:
@@ -57,7 +55,7 @@ def test_checkout_success(mock_client, client, device_id):
         mock_settings.creem_product_ids = json.dumps({"validator_3": "prod_123"})
         mock_settings.frontend_url = "https://example.com"
         
-        response = client.post(
+        response = await client.post(
             "/api/v1/payment/checkout",
             json={
                 "product_sku": "validator_3",
@@ -65,13 +63,38 @@ def test_checkout_success(mock_client, client, device_id):
             }
         )
     
-    # May fail due to config, but should not be 500 with unhandled error
-    assert response.status_code in [200, 500]
+    assert response.status_code == 200
+    assert response.json()["checkout_url"] == "https://checkout.creem.io/xxx"
+    assert mock_client_instance.post.call_args.args[0] == "/v1/checkouts"
 
 
-def test_verify_payment_not_found(client):
+@patch("app.api.v1.payment.get_creem_client")
+async def test_checkout_upstream_error(mock_get_client, client, device_id):
+    """Test Creem HTTP errors surface as a string 500 detail."""
+    mock_client_instance = AsyncMock()
+    mock_client_instance.post.side_effect = httpx.ConnectError("connection refused")
+    mock_get_client.return_value = mock_client_instance
+    
+    with patch("app.api.v1.payment.settings") as mock_settings:
+        mock_settings.creem_api_key = "test_key"
+        mock_settings.creem_product_ids = json.dumps({"validator_3": "prod_123"})
+        mock_settings.frontend_url = "https://example.com"
+        
+        response = await client.post(
+            "/api/v1/payment/checkout",
+            json={
+                "product_sku": "validator_3",
+                "device_id": device_id
+            }
+        )
+    
+    assert response.status_code == 500
+    assert "Payment service error" in response.json()["detail"]
+
+
+async def test_verify_payment_not_found(client):
     """Test verifying non-existent payment."""
-    response = client.get("/api/v1/payment/verify/non-existent-id")
+    response = await client.get("/api/v1/payment/verify/non-existent-id")
     assert response.status_code == 404
     
     data = response.json()
@@ -79,9 +102,9 @@ def test_verify_payment_not_found(client):
     assert isinstance(detail, str), f"Error detail should be string: {detail}"
 
 
-def test_webhook_invalid_json(client):
+async def test_webhook_invalid_json(client):
     """Test webhook with invalid JSON."""
-    response = client.post(
+    response = await client.post(
         "/api/v1/payment/webhook",
         content=b"not valid json",
         headers={"Content-Type": "application/json"}
@@ -89,9 +112,9 @@ def test_webhook_invalid_json(client):
     assert response.status_code == 400
 
 
-def test_webhook_unhandled_event(client):
+async def test_webhook_unhandled_event(client):
     """Test webhook with unhandled event type."""
-    response = client.post(
+    response = await client.post(
         "/api/v1/payment/webhook",
         json={"type": "unknown.event", "data": {}}
     )
@@ -100,7 +123,7 @@ def test_webhook_unhandled_event(client):
     assert data["status"] == "ignored"
 
 
-def test_webhook_checkout_completed(client, db, device_id):
+async def test_webhook_checkout_completed(client, db, device_id):
     """Test webhook for completed checkout."""
     from app.models.payment import PaymentTransaction
     
@@ -113,10 +136,10 @@ def test_webhook_checkout_completed(client, db, device_id):
         status="pending"
     )
     db.add(transaction)
-    db.commit()
+    await db.commit()
     
     # Send webhook
-    response = client.post(
+    response = await client.post(
         "/api/v1/payment/webhook",
         json={
             "type": "checkout.completed",
@@ -133,5 +156,94 @@ def test_webhook_checkout_completed(client, db, device_id):
     assert data["tokens_added"] == 3
     
     # Verify transaction status
-    db.refresh(transaction)
+    await db.refresh(transaction)
+    assert transaction.status == "completed"
+
+
+async def _pending_transaction(db, device_id, checkout_id="test-checkout-123"):
+    from app.models.payment import PaymentTransaction
+    
+    transaction = PaymentTransaction(
+        checkout_id=checkout_id,
+        device_id=device_id,
+        product_sku="validator_3",
+        amount_cents=499,
+        status="pending"
+    )
+    db.add(transaction)
+    await db.commit()
+    return transaction
+
+
+def _completed_event(checkout_id="test-checkout-123", order_id="order_456"):
+    return {
+        "type": "checkout.completed",
+        "data": {"request_id": checkout_id, "id": order_id},
+    }
+
+
+async def test_webhook_replay_credits_once(client, db, device_id):
+    """Test a redelivered event is recognised by its id and credits nothing."""
+    from app.services.token_service import get_token_status
+    
+    await _pending_transaction(db, device_id)
+    
+    first = await client.post("/api/v1/payment/webhook", json=_completed_event())
+    replay = await client.post("/api/v1/payment/webhook", json=_completed_event())
+    # A different event for the same checkout is caught by the status check
+    other = await client.post("/api/v1/payment/webhook", json=_completed_event(order_id="order_789"))
+    
+    assert first.json() == {"status": "success", "tokens_added": 3}
+    assert replay.json() == {"status": "ignored", "reason": "already processed"}
+    assert other.json() == {"status": "ignored", "reason": "already processed"}
+    assert (await get_token_status(db, device_id))["tokens_total"] == 3
+
+
+async def test_webhook_failure_changes_nothing(client, db, device_id):
+    """Test a failure while crediting leaves the payment pending for Creem's retry."""
+    from app.models.webhook import WebhookEvent
+    
+    transaction = await _pending_transaction(db, device_id)
+    
+    with patch("app.services.payment_service.credit_tokens", side_effect=RuntimeError("db down")):
+        with pytest.raises(RuntimeError):
+            await client.post("/api/v1/payment/webhook", json=_completed_event())
+    
+    await db.rollback()
+    await db.refresh(transaction)
+    assert transaction.status == "pending"
+    assert await db.get(WebhookEvent, "checkout.completed:order_456") is None
+    
+    retry = await client.post("/api/v1/payment/webhook", json=_completed_event())
+    assert retry.json()["status"] == "success"
+
+
+async def test_webhook_rejects_non_object_payload(client):
+    """Test a JSON body that is not an object is rejected."""
+    response = await client.post("/api/v1/payment/webhook", json=["checkout.completed"])
+    assert response.status_code == 400
+
+
+async def test_webhook_fast_ack(client, db, device_id):
+    """Test fast-ack stores the event, answers 202 and leaves crediting to the applier."""
+    from app.config import get_settings
+    from app.services.payment_service import webhook_applier
+    
+    transaction = await _pending_transaction(db, device_id)
+    
+    with patch.object(get_settings(), "payment_webhook_fast_ack", True):
+        response = await client.post("/api/v1/payment/webhook", json=_completed_event())
+        replay = await client.post("/api/v1/payment/webhook", json=_completed_event())
+    
+    assert response.status_code == 202
+    assert response.json() == {"status": "accepted"}
+    assert replay.status_code == 200
+    assert replay.json()["reason"] == "already processed"
+    await db.refresh(transaction)
+    assert transaction.status == "pending"
+    
+    assert await webhook_applier.apply_batch() == 1
+    
+    await db.refresh(transaction)
     assert transaction.status == "completed"
+    assert transaction.creem_order_id == "order_456"
@@ -0,0 +1,91 @@
+"""Tests for shared report links."""
+from unittest.mock import patch, AsyncMock
+
+from app.config import get_settings
+from app.models.report import ValidationReport
+from app.services.report_cache import etag_matches, report_cache
+
+
+async def _report(db) -> ValidationReport:
+    report = ValidationReport(
+        idea_title="AI Food Planner",
+        idea_description="An AI-powered meal planning application for busy families.",
+        language="en",
+        overall_score=75,
+        market_analysis={"score": 70, "summary": "Große Nachfrage"},
+        summary="A promising startup idea.",
+    )
+    db.add(report)
+    await db.commit()
+    return report
+
+
+async def test_get_report(client, db):
+    """Test a report is returned with caching headers."""
+    report = await _report(db)
+
+    response = await client.get(f"/api/v1/reports/{report.id}")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.headers["etag"].startswith('"')
+    assert "immutable" in response.headers["cache-control"]
+    assert "max-age=31536000" in response.headers["cache-control"]
+    assert response.json() == report.to_dict()
+
+
+async def test_repeated_reads_skip_the_database(client, db):
+    """Test the serialized report is served from the cache."""
+    report = await _report(db)
+    first = await client.get(f"/api/v1/reports/{report.id}")
+
+    with patch.object(db, "execute", AsyncMock()) as execute:
+        second = await client.get(f"/api/v1/reports/{report.id}")
+
+    execute.assert_not_called()
+    assert second.content == first.content
+    assert second.headers["etag"] == first.headers["etag"]
+
+
+async def test_conditional_get_returns_304(client, db):
+    """Test a matching If-None-Match gets an empty 304."""
+    report = await _report(db)
+    etag = (await client.get(f"/api/v1/reports/{report.id}")).headers["etag"]
+    report_cache.clear()
+
+    response = await client.get(f"/api/v1/reports/{report.id}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+    stale = await client.get(f"/api/v1/reports/{report.id}", headers={"If-None-Match": '"other"'})
+    assert stale.status_code == 200
+
+
+async def test_missing_report_is_not_cached(client, db):
+    """Test a 404 does not get long-lived caching headers."""
+    response = await client.get("/api/v1/reports/missing")
+
+    assert response.status_code == 404
+    assert "immutable" not in response.headers.get("cache-control", "")
+    assert report_cache.get("missing") is None
+
+
+def test_etag_matches():
+    """Test If-None-Match parsing."""
+    assert etag_matches('"a", W/"b"', '"b"')
+    assert etag_matches("*", '"b"')
+    assert not etag_matches('"a"', '"b"')
+    assert not etag_matches(None, '"b"')
+
+
+async def test_orjson_body_matches(client, db):
+    """Test the orjson response path serializes reports identically."""
+    report = await _report(db)
+    expected = (await client.get(f"/api/v1/reports/{report.id}")).content
+    report_cache.clear()
+
+    with patch.object(get_settings(), "orjson_responses", True):
+        response = await client.get(f"/api/v1/reports/{report.id}")
+
+    assert response.content == expected
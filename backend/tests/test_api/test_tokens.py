@@ -2,9 +2,9 @@
 import pytest
 
 
-def test_get_token_status_new_device(client, device_id):
+async def test_get_token_status_new_device(client, device_id):
     """Test getting token status for new device."""
-    response = client.get(f"/api/v1/tokens/status?device_id={device_id}")
+    response = await client.get(f"/api/v1/tokens/status?device_id={device_id}")
     assert response.status_code == 200
     data = response.json()
     
@@ -15,9 +15,9 @@ def test_get_token_status_new_device(client, device_id):
     assert data["can_generate"] is True
 
 
-def test_get_token_status_without_device_id(client):
+async def test_get_token_status_without_device_id(client):
     """Test getting token status without device ID fails."""
-    response = client.get("/api/v1/tokens/status")
+    response = await client.get("/api/v1/tokens/status")
     assert response.status_code == 400
     
     data = response.json()
@@ -25,14 +25,14 @@ def test_get_token_status_without_device_id(client):
     assert isinstance(detail, str), f"Error detail should be string: {detail}"
 
 
-def test_token_status_after_free_trial(client, db, device_id):
+async def test_token_status_after_free_trial(client, db, device_id):
     """Test token status after using free trial."""
     from app.services.token_service import use_generation
     
     # Use free trial
-    use_generation(db, device_id)
+    await use_generation(db, device_id)
     
-    response = client.get(f"/api/v1/tokens/status?device_id={device_id}")
+    response = await client.get(f"/api/v1/tokens/status?device_id={device_id}")
     assert response.status_code == 200
     data = response.json()
     
@@ -2,10 +2,12 @@
 import pytest
 from unittest.mock import patch, AsyncMock
 
+from app.config import get_settings
 
-def test_validate_without_device_id(client):
+
+async def test_validate_without_device_id(client):
     """Test validation without device ID fails."""
-    response = client.post(
+    response = await client.post(
         "/api/v1/validate",
         json={
             "idea_title": "Test Idea",
@@ -20,9 +22,9 @@ def test_validate_without_device_id(client):
     assert isinstance(detail, str), f"Error detail should be string: {detail}"
 
 
-def test_validate_with_empty_title(client, device_id):
+async def test_validate_with_empty_title(client, device_id):
     """Test validation with empty title fails."""
-    response = client.post(
+    response = await client.post(
         f"/api/v1/validate?device_id={device_id}",
         json={
             "idea_title": "",
@@ -33,9 +35,9 @@ def test_validate_with_empty_title(client, device_id):
     assert response.status_code == 422  # Validation error
 
 
-def test_validate_with_short_description(client, device_id):
+async def test_validate_with_short_description(client, device_id):
     """Test validation with short description fails."""
-    response = client.post(
+    response = await client.post(
         f"/api/v1/validate?device_id={device_id}",
         json={
             "idea_title": "Test Idea",
@@ -46,9 +48,9 @@ def test_validate_with_short_description(client, device_id):
     assert response.status_code == 422  # Validation error
 
 
-def test_validate_with_invalid_language(client, device_id):
+async def test_validate_with_invalid_language(client, device_id):
     """Test validation with invalid language fails."""
-    response = client.post(
+    response = await client.post(
         f"/api/v1/validate?device_id={device_id}",
         json={
             "idea_title": "Test Idea",
@@ -60,7 +62,7 @@ def test_validate_with_invalid_language(client, device_id):
 
 
 @patch("app.api.v1.validate.validate_idea")
-def test_validate_success(mock_validate, client, device_id):
+async def test_validate_success(mock_validate, client, device_id):
     """Test successful validation."""
     mock_validate.return_value = {
         "overall_score": 75,
@@ -73,7 +75,7 @@ def test_validate_success(mock_validate, client, device_id):
         "summary": "A promising startup idea."
     }
     
-    response = client.post(
+    response = await client.post(
         f"/api/v1/validate?device_id={device_id}",
         json={
             "idea_title": "AI Food Planner",
@@ -88,8 +90,41 @@ def test_validate_success(mock_validate, client, device_id):
     assert "report_id" in data
 
 
+@pytest.mark.parametrize("orjson_responses", [False, True])
+@patch("app.api.v1.validate.validate_idea")
+async def test_validate_response_body(mock_validate, orjson_responses, client, device_id):
+    """Test both JSON response classes return the parsed report unchanged."""
+    result = {
+        "overall_score": 75,
+        "market_analysis": {"tam": "10B", "market_trends": ["Nachhaltigkeit", "健康"], "score": 70},
+        "competition_analysis": {},
+        "technical_feasibility": {},
+        "business_model": {},
+        "risks": {},
+        "suggestions": {},
+        "summary": "A promising startup idea."
+    }
+    mock_validate.return_value = result
+    
+    with patch.object(get_settings(), "orjson_responses", orjson_responses):
+        response = await client.post(
+            f"/api/v1/validate?device_id={device_id}",
+            json={
+                "idea_title": "AI Food Planner",
+                "idea_description": "An AI-powered meal planning application for busy families.",
+                "language": "en"
+            }
+        )
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    data = response.json()
+    assert data.pop("report_id")
+    assert data == result
+
+
 @patch("app.api.v1.validate.validate_idea")
-def test_validate_consumes_free_trial(mock_validate, client, db, device_id):
+async def test_validate_consumes_free_trial(mock_validate, client, db, device_id):
     """Test that validation consumes free trial."""
     mock_validate.return_value = {
         "overall_score": 75,
@@ -103,7 +138,7 @@ def test_validate_consumes_free_trial(mock_validate, client, db, device_id):
     }
     
     # First validation should succeed (free trial)
-    response = client.post(
+    response = await client.post(
         f"/api/v1/validate?device_id={device_id}",
         json={
             "idea_title": "Test Idea",
@@ -114,12 +149,12 @@ def test_validate_consumes_free_trial(mock_validate, client, db, device_id):
     assert response.status_code == 200
     
     # Check free trial is now used
-    status = client.get(f"/api/v1/tokens/status?device_id={device_id}")
+    status = await client.get(f"/api/v1/tokens/status?device_id={device_id}")
     assert status.json()["free_trial_used"] is True
 
 
 @patch("app.api.v1.validate.validate_idea")
-def test_validate_fails_without_credits(mock_validate, client, db, device_id):
+async def test_validate_fails_without_credits(mock_validate, client, db, device_id):
     """Test validation fails when no credits available."""
     mock_validate.return_value = {
         "overall_score": 75,
@@ -134,10 +169,10 @@ def test_validate_fails_without_credits(mock_validate, client, db, device_id):
     
     # Use up free trial
     from app.services.token_service import use_generation
-    use_generation(db, device_id)
+    await use_generation(db, device_id)
     
     # Second validation should fail (no tokens)
-    response = client.post(
+    response = await client.post(
         f"/api/v1/validate?device_id={device_id}",
         json={
             "idea_title": "Test Idea",
@@ -152,3 +187,72 @@ def test_validate_fails_without_credits(mock_validate, client, db, device_id):
     detail = data.get("detail")
     assert isinstance(detail, str), f"402 error detail should be string, got: {type(detail)}"
     assert "[object Object]" not in str(detail)
+
+
+@patch("app.api.v1.validate.validate_idea")
+async def test_validate_serves_repeat_from_cache(mock_validate, client, db):
+    """Test resubmitting the same idea skips the LLM call."""
+    from app.services.token_service import add_tokens
+    mock_validate.return_value = {
+        "overall_score": 75,
+        "market_analysis": {},
+        "competition_analysis": {},
+        "technical_feasibility": {},
+        "business_model": {},
+        "risks": {},
+        "suggestions": {},
+        "summary": "Test"
+    }
+    await add_tokens(db, "cache-device", 5, "payment-1", "validator_10")
+    body = {
+        "idea_title": "Test Idea",
+        "idea_description": "This is a valid test description for the idea.",
+        "language": "en"
+    }
+    
+    first = await client.post("/api/v1/validate?device_id=cache-device", json=body)
+    body["idea_title"] = "  test idea "
+    second = await client.post("/api/v1/validate?device_id=cache-device", json=body)
+    
+    assert first.status_code == 200
+    assert second.status_code == 200
+    assert first.json()["report_id"] != second.json()["report_id"]
+    assert mock_validate.call_count == 1
+
+
+@patch("app.api.v1.validate.validate_idea")
+async def test_validate_no_cache_bypasses_cache(mock_validate, client, db):
+    """Test the no_cache flag forces a fresh LLM call."""
+    from app.services.token_service import add_tokens
+    mock_validate.return_value = {"overall_score": 60, "summary": "Test"}
+    await add_tokens(db, "bypass-device", 5, "payment-1", "validator_10")
+    body = {
+        "idea_title": "Test Idea",
+        "idea_description": "This is a valid test description for the idea.",
+        "language": "en"
+    }
+    
+    await client.post("/api/v1/validate?device_id=bypass-device", json=body)
+    response = await client.post("/api/v1/validate?device_id=bypass-device&no_cache=true", json=body)
+    
+    assert response.status_code == 200
+    assert mock_validate.call_count == 2
+
+
+@patch("app.api.v1.validate.validate_idea")
+async def test_validate_failure_releases_credit(mock_validate, client, device_id):
+    """Test a failed validation gives the reserved credit back."""
+    mock_validate.side_effect = RuntimeError("upstream down")
+    
+    response = await client.post(
+        f"/api/v1/validate?device_id={device_id}",
+        json={
+            "idea_title": "Test Idea",
+            "idea_description": "This is a valid test description for the idea.",
+            "language": "en"
+        }
+    )
+    assert response.status_code == 500
+    
+    status = await client.get(f"/api/v1/tokens/status?device_id={device_id}")
+    assert status.json()["free_trial_used"] is False
@@ -0,0 +1,156 @@
+"""Tests for the batch validation endpoint."""
+import asyncio
+import json
+from unittest.mock import patch
+
+from sqlalchemy import func, select
+
+from app.models.report import ValidationReport
+from app.services.report_service import record_validations
+from app.services.result_cache import get_result_cache
+from app.services.token_service import add_tokens, get_token_status
+
+
+RESULT = {
+    "overall_score": 75,
+    "market_analysis": {"score": 70},
+    "competition_analysis": {},
+    "technical_feasibility": {},
+    "business_model": {},
+    "risks": {},
+    "suggestions": {},
+    "summary": "Test",
+}
+
+
+def _items(count: int) -> list:
+    return [
+        {
+            "idea_title": f"Idea number {n}",
+            "idea_description": f"A valid description for idea number {n} in the batch.",
+            "language": "en",
+        }
+        for n in range(count)
+    ]
+
+
+def _lines(response) -> list:
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+async def _report_count(db) -> int:
+    return await db.scalar(select(func.count()).select_from(ValidationReport))
+
+
+@patch("app.api.v1.validate.validate_idea")
+async def test_batch_streams_ndjson_and_stores_reports(mock_validate, client, db):
+    """Test each idea gets a line with its stored report, then a summary line."""
+    mock_validate.return_value = RESULT
+    await add_tokens(db, "partner", 4, "payment-1", "validator_10")
+    
+    response = await client.post("/api/v1/validate/batch?device_id=partner", json={"items": _items(3)})
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = _lines(response)
+    assert sorted(line["index"] for line in lines[:-1]) == [0, 1, 2]
+    assert all(line["status"] == "ok" and line["overall_score"] == 75 for line in lines[:-1])
+    assert lines[-1] == {"status": "complete", "succeeded": 3, "failed": 0}
+    assert await _report_count(db) == 3
+    
+    status = await get_token_status(db, "partner")
+    assert status["free_trial_used"] is True
+    assert status["tokens_used"] == 2
+
+
+async def test_batch_needs_credits_for_every_idea(client, db):
+    """Test a batch larger than the balance is refused without taking credits."""
+    await add_tokens(db, "partner", 1, "payment-1", "validator_3")
+    
+    response = await client.post("/api/v1/validate/batch?device_id=partner", json={"items": _items(3)})
+    
+    assert response.status_code == 402
+    assert isinstance(response.json()["detail"], str)
+    status = await get_token_status(db, "partner")
+    assert (status["free_trial_used"], status["tokens_used"]) == (False, 0)
+
+
+async def test_batch_request_validation(client):
+    """Test a device id and between one and BATCH_MAX_ITEMS ideas are required."""
+    no_device = await client.post("/api/v1/validate/batch", json={"items": _items(1)})
+    empty = await client.post("/api/v1/validate/batch?device_id=partner", json={"items": []})
+    too_many = await client.post("/api/v1/validate/batch?device_id=partner", json={"items": _items(51)})
+    
+    assert no_device.status_code == 400
+    assert empty.status_code == 422
+    assert too_many.status_code == 422
+
+
+@patch("app.api.v1.validate.validate_idea")
+async def test_batch_failed_ideas_give_back_their_credits(mock_validate, client, db):
+    """Test a failing idea gets an error line and only the stored reports are charged."""
+    async def validate(title, description, language):
+        if title == "Idea number 1":
+            raise ValueError("unparseable report")
+        return RESULT
+    
+    mock_validate.side_effect = validate
+    await add_tokens(db, "partner", 3, "payment-1", "validator_3")
+    
+    response = await client.post("/api/v1/validate/batch?device_id=partner", json={"items": _items(3)})
+    
+    lines = {line.get("index"): line for line in _lines(response)}
+    assert lines[1] == {"index": 1, "status": "error", "detail": "Validation failed: unparseable report"}
+    assert lines[None] == {"status": "complete", "succeeded": 2, "failed": 1}
+    assert await _report_count(db) == 2
+    
+    status = await get_token_status(db, "partner")
+    assert status["free_trial_used"] is True
+    assert status["tokens_used"] == 1
+
+
+@patch("app.api.v1.validate.validate_idea")
+async def test_batch_limits_concurrent_llm_calls(mock_validate, client, db):
+    """Test no more than BATCH_CONCURRENCY LLM calls of a batch run at once."""
+    running = peak = 0
+    
+    async def validate(**kwargs):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return RESULT
+    
+    mock_validate.side_effect = validate
+    await add_tokens(db, "partner", 10, "payment-1", "validator_10")
+    
+    with patch("app.api.v1.validate.settings.batch_concurrency", 2):
+        response = await client.post("/api/v1/validate/batch?device_id=partner", json={"items": _items(8)})
+    
+    assert _lines(response)[-1]["succeeded"] == 8
+    assert mock_validate.call_count == 8
+    assert peak == 2
+
+
+@patch("app.api.v1.validate.validate_idea")
+async def test_batch_cached_ideas_are_stored_together(mock_validate, client, db):
+    """Test ideas finishing together share one bulk insert and skip the LLM."""
+    from app.api.v1.validate import ValidateRequest, _idea_cache_key
+    
+    items = _items(4)
+    for item in items:
+        await get_result_cache().set(db, _idea_cache_key(ValidateRequest(**item)), RESULT)
+    await add_tokens(db, "partner", 4, "payment-1", "validator_10")
+    calls = []
+    
+    async def recording(session, entries):
+        calls.append(len(entries))
+        return await record_validations(session, entries)
+    
+    with patch("app.api.v1.validate.record_validations", recording):
+        response = await client.post("/api/v1/validate/batch?device_id=partner", json={"items": items})
+    
+    assert _lines(response)[-1]["succeeded"] == 4
+    assert mock_validate.call_count == 0
+    assert calls == [4]
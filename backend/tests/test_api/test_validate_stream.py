@@ -0,0 +1,135 @@
+"""Tests for the streaming validation endpoint."""
+import json
+import httpx
+import pytest
+from unittest.mock import patch
+
+from app.services.llm_service import stream_validate_idea
+
+
+SECTIONS = [
+    ("overall_score", 75),
+    ("market_analysis", {"score": 70}),
+    ("summary", "A promising startup idea."),
+]
+
+BODY = {
+    "idea_title": "AI Food Planner",
+    "idea_description": "An AI-powered meal planning application for busy families.",
+    "language": "en",
+}
+
+
+def _parse_events(text: str) -> list:
+    events = []
+    for block in text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+async def _fake_stream(**kwargs):
+    for section in SECTIONS:
+        yield section
+
+
+async def _broken_stream(**kwargs):
+    yield SECTIONS[0]
+    raise ValueError("LLM stream ended before the report was complete")
+
+
+@patch("app.api.v1.validate.stream_validate_idea", _fake_stream)
+async def test_stream_emits_sections_then_complete(client, device_id):
+    """Test sections are streamed and the report is persisted at the end."""
+    response = await client.post(f"/api/v1/validate/stream?device_id={device_id}", json=BODY)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _parse_events(response.text)
+    assert [e for e, _ in events] == ["section", "section", "section", "complete"]
+    assert events[1][1] == {"name": "market_analysis", "data": {"score": 70}}
+
+    report_id = events[-1][1]["report_id"]
+    report = await client.get(f"/api/v1/reports/{report_id}")
+    assert report.json()["summary"] == "A promising startup idea."
+
+    status = await client.get(f"/api/v1/tokens/status?device_id={device_id}")
+    assert status.json()["free_trial_used"] is True
+
+
+@patch("app.api.v1.validate.stream_validate_idea", _fake_stream)
+async def test_stream_replays_cached_result(client, db):
+    """Test a cached result is replayed without calling the LLM."""
+    from app.services.token_service import add_tokens
+    await add_tokens(db, "stream-device", 5, "payment-1", "validator_10")
+    await client.post("/api/v1/validate/stream?device_id=stream-device", json=BODY)
+
+    with patch("app.api.v1.validate.stream_validate_idea") as mock_stream:
+        response = await client.post("/api/v1/validate/stream?device_id=stream-device", json=BODY)
+
+    mock_stream.assert_not_called()
+    events = _parse_events(response.text)
+    assert [e for e, _ in events] == ["section", "section", "section", "complete"]
+
+
+@patch("app.api.v1.validate.stream_validate_idea", _broken_stream)
+async def test_stream_error_does_not_charge(client, device_id):
+    """Test a failed stream reports an error event and keeps the credit."""
+    response = await client.post(f"/api/v1/validate/stream?device_id={device_id}", json=BODY)
+
+    events = _parse_events(response.text)
+    assert events[-1][0] == "error"
+    assert isinstance(events[-1][1]["detail"], str)
+
+    status = await client.get(f"/api/v1/tokens/status?device_id={device_id}")
+    assert status.json()["free_trial_used"] is False
+
+
+async def test_stream_requires_credit(client, db, device_id):
+    """Test the credit check happens before streaming starts."""
+    from app.services.token_service import use_generation
+    await use_generation(db, device_id)
+
+    response = await client.post(f"/api/v1/validate/stream?device_id={device_id}", json=BODY)
+    assert response.status_code == 402
+    assert isinstance(response.json()["detail"], str)
+
+
+def _sse_body(content: str, chunk: int = 7) -> bytes:
+    lines = []
+    for i in range(0, len(content), chunk):
+        delta = {"choices": [{"delta": {"content": content[i:i + chunk]}}]}
+        lines.append(f"data: {json.dumps(delta)}\n\n")
+    lines.append("data: [DONE]\n\n")
+    return "".join(lines).encode()
+
+
+async def test_stream_validate_idea_parses_proxy_stream():
+    """Test the proxy SSE stream is parsed into report sections."""
+    report = {"overall_score": 80, "summary": "Good."}
+    seen = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen["body"] = json.loads(request.content)
+        return httpx.Response(200, content=_sse_body(json.dumps(report)))
+
+    client = httpx.AsyncClient(base_url="http://llm.test", transport=httpx.MockTransport(handler))
+    with patch("app.services.llm_service.get_llm_client", return_value=client):
+        sections = [s async for s in stream_validate_idea("Idea", "A long enough idea description.")]
+    await client.aclose()
+
+    assert seen["body"]["stream"] is True
+    assert sections == [("overall_score", 80), ("summary", "Good.")]
+
+
+async def test_stream_validate_idea_truncated():
+    """Test a truncated proxy stream raises."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=_sse_body('{"overall_score": 80, "summ'))
+
+    client = httpx.AsyncClient(base_url="http://llm.test", transport=httpx.MockTransport(handler))
+    with patch("app.services.llm_service.get_llm_client", return_value=client):
+        with pytest.raises(ValueError):
+            async for _ in stream_validate_idea("Idea", "A long enough idea description."):
+                pass
+    await client.aclose()
@@ -0,0 +1,132 @@
+"""Tests for the validation admission controller."""
+import asyncio
+import pytest
+from unittest.mock import patch, AsyncMock
+
+from app.metrics import validation_admission_rejections, validation_queue_depth
+from app.services.admission import AdmissionController, AdmissionRejected
+
+
+BODY = {
+    "idea_title": "AI Food Planner",
+    "idea_description": "An AI-powered meal planning application for busy families.",
+    "language": "en",
+}
+
+
+def _rejections(reason: str) -> float:
+    return validation_admission_rejections.labels(tool="idea-validator", reason=reason)._value.get()
+
+
+async def test_runs_up_to_max_concurrency():
+    """Test callers beyond the limit wait until a slot is released."""
+    controller = AdmissionController(max_concurrency=2, max_queue=5, queue_timeout_seconds=1)
+    first = await controller.acquire()
+    await controller.acquire()
+
+    waiter = asyncio.create_task(controller.acquire())
+    await asyncio.sleep(0)
+    assert controller.waiting == 1
+    assert validation_queue_depth.labels(tool="idea-validator")._value.get() == 1
+    assert not waiter.done()
+
+    first.release()
+    await waiter
+    assert controller.active == 2
+    assert controller.waiting == 0
+
+
+async def test_queue_is_fifo():
+    """Test waiters are admitted in arrival order."""
+    controller = AdmissionController(max_concurrency=1, max_queue=5, queue_timeout_seconds=1)
+    order = []
+
+    async def run(name):
+        async with controller.slot():
+            order.append(name)
+            await asyncio.sleep(0)
+
+    async with controller.slot():
+        tasks = [asyncio.create_task(run(i)) for i in range(3)]
+        await asyncio.sleep(0)
+    await asyncio.gather(*tasks)
+
+    assert order == [0, 1, 2]
+    assert controller.active == 0
+
+
+async def test_full_queue_rejects_immediately():
+    """Test a full queue rejects without waiting."""
+    controller = AdmissionController(max_concurrency=1, max_queue=1, queue_timeout_seconds=5)
+    before = _rejections("queue_full")
+    await controller.acquire()
+    queued = asyncio.create_task(controller.acquire())
+    await asyncio.sleep(0)
+
+    with pytest.raises(AdmissionRejected) as exc_info:
+        await asyncio.wait_for(controller.acquire(), timeout=0.1)
+
+    assert exc_info.value.reason == "queue_full"
+    assert exc_info.value.retry_after == 5
+    assert _rejections("queue_full") == before + 1
+    queued.cancel()
+
+
+async def test_wait_deadline_rejects():
+    """Test a queued caller gives up after the deadline."""
+    controller = AdmissionController(max_concurrency=1, max_queue=5, queue_timeout_seconds=0.01)
+    await controller.acquire()
+
+    with pytest.raises(AdmissionRejected) as exc_info:
+        await controller.acquire()
+
+    assert exc_info.value.reason == "timeout"
+    assert controller.waiting == 0
+
+
+async def test_cancelled_waiter_does_not_leak_slot():
+    """Test cancelling a queued caller leaves capacity intact."""
+    controller = AdmissionController(max_concurrency=1, max_queue=5, queue_timeout_seconds=1)
+    ticket = await controller.acquire()
+    waiter = asyncio.create_task(controller.acquire())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    ticket.release()
+    ticket.release()
+    assert controller.active == 0
+    assert controller.waiting == 0
+
+
+@patch("app.api.v1.validate.validate_idea", new_callable=AsyncMock)
+async def test_validate_returns_503_when_saturated(mock_validate, client, device_id):
+    """Test the endpoint sheds load with 503 and Retry-After."""
+    controller = AdmissionController(max_concurrency=1, max_queue=0, queue_timeout_seconds=3)
+    await controller.acquire()
+
+    with patch("app.api.v1.validate.admission_controller", controller):
+        response = await client.post(f"/api/v1/validate?device_id={device_id}", json=BODY)
+        stream = await client.post(f"/api/v1/validate/stream?device_id={device_id}", json=BODY)
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "3"
+    assert stream.status_code == 503
+    mock_validate.assert_not_called()
+
+    status = await client.get(f"/api/v1/tokens/status?device_id={device_id}")
+    assert status.json()["free_trial_used"] is False
+
+
+@patch("app.api.v1.validate.validate_idea", new_callable=AsyncMock)
+async def test_validate_releases_slot(mock_validate, client, device_id):
+    """Test the slot is released after a validation, even on failure."""
+    mock_validate.side_effect = RuntimeError("boom")
+    controller = AdmissionController(max_concurrency=1, max_queue=0, queue_timeout_seconds=3)
+
+    with patch("app.api.v1.validate.admission_controller", controller):
+        response = await client.post(f"/api/v1/validate?device_id={device_id}", json=BODY)
+
+    assert response.status_code == 500
+    assert controller.active == 0
@@ -0,0 +1,117 @@
+"""Tests for the token balance cache."""
+import pytest
+from unittest.mock import patch, AsyncMock
+
+from app.services.balance_cache import BalanceCache
+from app.services.token_service import (
+    add_tokens,
+    get_token_status,
+    release_credit,
+    reserve_credit,
+    use_generation,
+)
+
+
+STATUS = {"free_trial_used": False, "tokens_remaining": 0}
+
+
+async def test_status_is_served_from_cache(db):
+    """Test a repeated status read does not touch the database."""
+    first = await get_token_status(db, "cached-device")
+
+    with patch("app.services.token_service.get_or_create_token_record", AsyncMock()) as lookup:
+        second = await get_token_status(db, "cached-device")
+
+    lookup.assert_not_called()
+    assert second == first
+
+
+async def test_reservation_invalidates_on_commit(db):
+    """Test reserving and releasing credits is visible in the next status read."""
+    device_id = "reserving-device"
+    await get_token_status(db, device_id)
+
+    reservation = await reserve_credit(db, device_id)
+    # A read before the commit must not be cached
+    await get_token_status(db, device_id)
+    await db.commit()
+    assert (await get_token_status(db, device_id))["free_trial_used"] is True
+
+    await release_credit(db, reservation)
+    await db.commit()
+    assert (await get_token_status(db, device_id))["free_trial_used"] is False
+
+
+async def test_rolled_back_reservation_keeps_balance(db):
+    """Test a rolled back reservation leaves the balance unchanged."""
+    device_id = "rollback-device"
+    await reserve_credit(db, device_id)
+    await db.rollback()
+
+    assert (await get_token_status(db, device_id))["free_trial_used"] is False
+
+
+async def test_add_tokens_writes_through(db):
+    """Test a purchase updates the cached balance without another read."""
+    device_id = "buying-device"
+    await use_generation(db, device_id)
+    assert (await get_token_status(db, device_id))["can_generate"] is False
+
+    await add_tokens(db, device_id, 3, "payment-1", "validator_3")
+
+    with patch("app.services.token_service.get_or_create_token_record", AsyncMock()) as lookup:
+        status = await get_token_status(db, device_id)
+    lookup.assert_not_called()
+    assert status["tokens_remaining"] == 3
+    assert status["can_generate"] is True
+
+
+def test_read_that_raced_a_write_is_dropped():
+    """Test a status computed before an invalidation is not cached."""
+    cache = BalanceCache(max_entries=10, ttl_seconds=60)
+    snapshot = cache.snapshot()
+    cache.invalidate("device")
+    cache.set("device", STATUS, snapshot)
+
+    assert cache.get("device") is None
+
+
+def test_ttl_and_lru_bounds():
+    """Test entries expire and the cache stays bounded."""
+    cache = BalanceCache(max_entries=2, ttl_seconds=60)
+    with patch("app.services.balance_cache.time.monotonic", return_value=1000.0):
+        cache.set("a", STATUS)
+        cache.set("b", STATUS)
+        cache.get("a")
+        cache.set("c", STATUS)
+        assert cache.get("b") is None
+        assert cache.get("a") == STATUS
+    with patch("app.services.balance_cache.time.monotonic", return_value=1061.0):
+        assert cache.get("a") is None
+
+
+def test_zero_ttl_disables_cache():
+    """Test a TTL of zero turns caching off."""
+    cache = BalanceCache(max_entries=10, ttl_seconds=0)
+    cache.set("device", STATUS)
+    assert cache.get("device") is None
+
+
+async def test_status_endpoint_reflects_validation(client, device_id):
+    """Test the status endpoint is not stale after a validation."""
+    before = await client.get(f"/api/v1/tokens/status?device_id={device_id}")
+    assert before.json()["free_trial_used"] is False
+
+    with patch("app.api.v1.validate.validate_idea", AsyncMock(return_value={"overall_score": 70})):
+        response = await client.post(
+            f"/api/v1/validate?device_id={device_id}",
+            json={
+                "idea_title": "Test Idea",
+                "idea_description": "This is a valid test description for the idea.",
+                "language": "en",
+            },
+        )
+    assert response.status_code == 200
+
+    after = await client.get(f"/api/v1/tokens/status?device_id={device_id}")
+    assert after.json()["free_trial_used"] is True
@@ -0,0 +1,85 @@
+"""Tests for database configuration helpers."""
+import pytest
+from unittest.mock import patch
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.config import get_settings
+from app.database import _apply_sqlite_pragmas, build_engine, sqlite_pragmas, to_async_url
+from app.models.types import is_uuid
+
+
+@pytest.mark.parametrize(
+    "url,expected",
+    [
+        ("sqlite:///./app.db", "sqlite+aiosqlite:///./app.db"),
+        ("sqlite+pysqlite:///:memory:", "sqlite+aiosqlite:///:memory:"),
+        ("sqlite+aiosqlite:///./app.db", "sqlite+aiosqlite:///./app.db"),
+        ("postgresql://user:pw@db:5432/app", "postgresql+asyncpg://user:pw@db:5432/app"),
+        ("postgresql+psycopg2://user:pw@db/app", "postgresql+asyncpg://user:pw@db/app"),
+        ("postgres://user:pw@db/app", "postgresql+asyncpg://user:pw@db/app"),
+    ],
+)
+def test_to_async_url(url, expected):
+    """Test sync and explicit-driver URLs map to the async driver."""
+    assert to_async_url(url) == expected
+
+
+def test_to_async_url_unsupported_dialect():
+    """Test unsupported dialects fail with a clear error."""
+    with pytest.raises(ValueError, match="Unsupported database dialect"):
+        to_async_url("mysql+pymysql://user@db/app")
+
+
+def test_sqlite_pragmas_follow_settings():
+    """Test the profile skips pragmas that are turned off."""
+    assert "PRAGMA journal_mode=WAL" in sqlite_pragmas()
+    with patch.object(get_settings(), "sqlite_journal_mode", ""), \
+            patch.object(get_settings(), "sqlite_mmap_size_bytes", 0):
+        pragmas = sqlite_pragmas()
+    assert not any("journal_mode" in p or "mmap_size" in p for p in pragmas)
+    assert "PRAGMA busy_timeout=5000" in pragmas
+
+
+async def test_file_engine_applies_profile(tmp_path):
+    """Test a file database is opened in WAL mode with a pooled engine."""
+    db_engine = build_engine(f"sqlite:///{tmp_path / 'tuned.db'}")
+    assert isinstance(db_engine.pool, AsyncAdaptedQueuePool)
+    assert db_engine.pool.size() == get_settings().db_pool_size
+
+    async with db_engine.connect() as conn:
+        values = {
+            pragma: (await conn.exec_driver_sql(f"PRAGMA {pragma}")).scalar()
+            for pragma in ("journal_mode", "synchronous", "busy_timeout", "cache_size")
+        }
+    await db_engine.dispose()
+
+    # synchronous=NORMAL reads back as 1
+    assert values == {"journal_mode": "wal", "synchronous": 1, "busy_timeout": 5000, "cache_size": -65536}
+
+
+def test_postgres_engine_has_no_sqlite_profile():
+    """Test the pragmas are only registered for SQLite."""
+    db_engine = build_engine("postgresql://user:pw@db/app")
+    assert db_engine.dialect.name == "postgresql"
+    assert not event.contains(db_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [
+        ("3f2b8c1e-9a4d-4c1b-8e2f-1a2b3c4d5e6f", True),
+        ("non-existent-id", False),
+        ("", False),
+    ],
+)
+def test_is_uuid(value, expected):
+    """Test ids from URLs are checked before PostgreSQL sees them."""
+    assert is_uuid(value) is expected
+
+
+def test_postgres_engine_uses_pool_settings():
+    """Test server databases get the configured pool."""
+    db_engine = build_engine("postgresql://user:pw@db/app")
+    assert db_engine.pool.size() == get_settings().db_pool_size
+    assert db_engine.pool._pre_ping is True
@@ -0,0 +1,79 @@
+"""Tests for the multi-worker gunicorn configuration."""
+import importlib.util
+import os
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch, AsyncMock
+
+import pytest
+
+
+CONF_PATH = Path(__file__).parent.parent.parent / "gunicorn.conf.py"
+
+
+@pytest.fixture
+def conf(tmp_path):
+    """Load gunicorn.conf.py without leaking its environment changes."""
+    with patch.dict(os.environ, {"PROMETHEUS_MULTIPROC_DIR": str(tmp_path / "prom")}):
+        spec = importlib.util.spec_from_file_location("gunicorn_conf", CONF_PATH)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        yield module
+
+
+def test_workers_skip_startup_tasks(conf):
+    """Test workers are told not to run the startup tasks themselves."""
+    assert os.environ["STARTUP_TASKS_ENABLED"] == "false"
+    assert conf.worker_class == "uvicorn.workers.UvicornWorker"
+    assert conf.workers >= 1
+
+
+def test_worker_count(conf):
+    """Test WEB_CONCURRENCY wins over the CPU count."""
+    with patch.dict(os.environ, {"WEB_CONCURRENCY": "3"}):
+        assert conf.default_workers() == 3
+    with patch.dict(os.environ, {"WEB_CONCURRENCY": ""}), \
+            patch("os.sched_getaffinity", return_value={0, 1}, create=True):
+        assert conf.default_workers() == 2
+
+
+def test_on_starting_resets_metrics_and_runs_startup_once(conf):
+    """Test the master clears stale metric files and runs the startup tasks."""
+    prom_dir = Path(os.environ["PROMETHEUS_MULTIPROC_DIR"])
+    prom_dir.mkdir()
+    (prom_dir / "counter_123.db").write_bytes(b"stale")
+
+    with patch.object(conf, "_prepare", AsyncMock()) as prepare:
+        conf.on_starting(server=None)
+
+    prepare.assert_awaited_once()
+    assert prom_dir.is_dir()
+    assert list(prom_dir.iterdir()) == []
+
+
+def test_child_exit_marks_worker_dead(conf):
+    """Test live gauges of an exited worker are dropped."""
+    with patch("prometheus_client.multiprocess.mark_process_dead") as mark_dead:
+        conf.child_exit(server=None, worker=SimpleNamespace(pid=4242))
+    mark_dead.assert_called_once_with(4242)
+
+
+async def test_startup_tasks_skipped_when_disabled(db):
+    """Test the lifespan leaves the startup tasks to the master when told to."""
+    from app.main import app
+    from app.config import get_settings
+
+    with patch.object(get_settings(), "startup_tasks_enabled", False), \
+            patch("app.main.run_startup_tasks", AsyncMock()) as startup, \
+            patch("app.main.job_pool.start", AsyncMock()), \
+            patch("app.main.job_pool.stop", AsyncMock()):
+        async with app.router.lifespan_context(app):
+            pass
+    startup.assert_not_called()
+
+
+async def test_metrics_merge_worker_files(client, tmp_path):
+    """Test /metrics reads the shared directory in multi-process mode."""
+    with patch.dict(os.environ, {"PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}):
+        response = await client.get("/metrics")
+    assert response.status_code == 200
@@ -0,0 +1,80 @@
+"""Tests that the load-test LLM proxy stand-in speaks the protocol llm_service expects."""
+import random
+
+import httpx
+import pytest
+from unittest.mock import patch
+
+from app.services.llm_service import REPORT_SECTIONS, stream_validate_idea, validate_idea
+from benchmarks.fake_llm_proxy import ProxyProfile, create_app
+
+
+TITLE = "Repair marketplace"
+DESCRIPTION = "A marketplace matching independent repair shops with customers."
+
+
+def _proxy_client(profile: ProxyProfile) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url="http://fake-llm-proxy",
+        transport=httpx.ASGITransport(app=create_app(profile)),
+    )
+
+
+def _fast(**overrides) -> ProxyProfile:
+    return ProxyProfile(latency="fixed", latency_ms=0, **overrides)
+
+
+async def test_validate_idea_parses_fake_report():
+    """Test a plain completion is a full report with proxy-reported usage."""
+    client = _proxy_client(_fast())
+    with patch("app.services.llm_service.get_llm_client", return_value=client):
+        result = await validate_idea(TITLE, DESCRIPTION, "en")
+
+    assert set(REPORT_SECTIONS) <= set(result)
+    assert 0 <= result["overall_score"] <= 100
+    assert result["usage"]["output_tokens"] > 0
+
+
+async def test_stream_validate_idea_reads_fake_stream():
+    """Test the SSE variant yields every section of the report."""
+    client = _proxy_client(_fast(chunk_tokens=16))
+    usage = {}
+    with patch("app.services.llm_service.get_llm_client", return_value=client):
+        sections = [name async for name, _ in stream_validate_idea(TITLE, DESCRIPTION, "en", usage)]
+
+    assert set(sections) == set(REPORT_SECTIONS)
+    assert usage["output_tokens"] > 0
+
+
+async def test_fanout_sections_are_answered():
+    """Test section prompts get the requested section back."""
+    client = _proxy_client(_fast())
+    with patch("app.services.llm_service.get_llm_client", return_value=client), \
+            patch("app.services.llm_service.settings.llm_fanout_enabled", True):
+        result = await validate_idea(TITLE, DESCRIPTION, "en")
+
+    assert result["risks"]["overall_risk_level"] in ("low", "medium", "high")
+    assert result["summary"]
+
+
+async def test_injected_errors():
+    """Test ``error_rate`` fails requests with the configured status."""
+    profile = _fast(error_rate=1.0, error_status=429)
+    app = create_app(profile)
+    async with httpx.AsyncClient(base_url="http://fake", transport=httpx.ASGITransport(app=app)) as client:
+        response = await client.post("/v1/chat/completions", json={"messages": []})
+        stats = (await client.get("/stats")).json()
+
+    assert response.status_code == 429
+    assert stats["requests"] == stats["errors"] == 1
+
+
+@pytest.mark.parametrize("latency", ["fixed", "uniform", "lognormal"])
+def test_latency_distributions(latency):
+    """Test sampled waits centre on ``latency_ms``."""
+    profile = ProxyProfile(latency=latency, latency_ms=200, jitter=0.5)
+    rng = random.Random(1)
+    samples = sorted(profile.first_token_seconds(rng) for _ in range(2001))
+
+    assert samples[0] >= 0
+    assert samples[1000] == pytest.approx(0.2, rel=0.1)
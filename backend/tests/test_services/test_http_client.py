@@ -0,0 +1,112 @@
+"""Tests for shared HTTP clients and the LLM call path."""
+import json
+import httpx
+import pytest
+from unittest.mock import patch
+
+from app.services import http_client
+from app.services.llm_service import validate_idea
+
+
+REPORT = {
+    "overall_score": 72,
+    "market_analysis": {"score": 70},
+    "competition_analysis": {"score": 60},
+    "technical_feasibility": {"score": 80},
+    "business_model": {"score": 75},
+    "risks": {"overall_risk_level": "medium"},
+    "suggestions": {"improvements": ["Niche down"]},
+    "summary": "Solid idea.",
+}
+
+
+def _completion(content: str) -> dict:
+    return {"choices": [{"message": {"content": content}}]}
+
+
+def _mock_llm_client(handler) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url="http://llm-proxy.test",
+        transport=httpx.MockTransport(handler),
+    )
+
+
+async def test_init_and_close_http_clients():
+    """Test clients are created once and released on shutdown."""
+    await http_client.close_http_clients()
+    await http_client.init_http_clients()
+    llm = http_client.get_llm_client()
+    creem = http_client.get_creem_client()
+
+    await http_client.init_http_clients()
+    assert http_client.get_llm_client() is llm
+    assert http_client.get_creem_client() is creem
+    assert llm is not creem
+
+    await http_client.close_http_clients()
+    assert llm.is_closed
+    assert creem.is_closed
+
+
+async def test_get_client_without_lifespan():
+    """Test clients are created lazily outside the application lifespan."""
+    await http_client.close_http_clients()
+    llm = http_client.get_llm_client()
+    creem = http_client.get_creem_client()
+
+    assert str(llm.base_url).startswith(http_client.settings.llm_proxy_url)
+    assert str(creem.base_url).startswith(http_client.settings.creem_api_url)
+
+    await http_client.close_http_clients()
+
+
+async def test_validate_idea_reuses_shared_client():
+    """Test validate_idea posts through the shared client and parses fenced JSON."""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        content = "```json\n" + json.dumps(REPORT) + "\n```"
+        return httpx.Response(200, json=_completion(content))
+
+    client = _mock_llm_client(handler)
+    with patch("app.services.llm_service.get_llm_client", return_value=client):
+        first = await validate_idea("Meal Planner", "AI meal planning for busy families.")
+        second = await validate_idea("Meal Planner", "AI meal planning for busy families.")
+    await client.aclose()
+
+    assert first["overall_score"] == 72
+    assert first["market_analysis"]["score"] == 70
+    assert first["suggestions"]["improvements"] == ["Niche down"]
+    assert first["summary"] == "Solid idea."
+    assert second["market_analysis"] == first["market_analysis"]
+    assert len(requests) == 2
+    assert requests[0].url.path == "/v1/chat/completions"
+    body = json.loads(requests[0].content)
+    assert body["max_tokens"] <= 4000
+    assert "Meal Planner" in body["messages"][-1]["content"]
+
+
+async def test_validate_idea_plain_fence():
+    """Test validate_idea handles a bare ``` fence."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=_completion("```\n" + json.dumps(REPORT) + "\n```"))
+
+    client = _mock_llm_client(handler)
+    with patch("app.services.llm_service.get_llm_client", return_value=client):
+        result = await validate_idea("Meal Planner", "AI meal planning for busy families.")
+    await client.aclose()
+
+    assert result["overall_score"] == 72
+
+
+async def test_validate_idea_upstream_error():
+    """Test upstream HTTP errors propagate to the caller."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(502, json={"error": "bad gateway"})
+
+    client = _mock_llm_client(handler)
+    with patch("app.services.llm_service.get_llm_client", return_value=client):
+        with pytest.raises(httpx.HTTPStatusError):
+            await validate_idea("Meal Planner", "AI meal planning for busy families.")
+    await client.aclose()
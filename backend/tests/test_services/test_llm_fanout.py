@@ -0,0 +1,147 @@
+"""Tests for the per-section fan-out validation mode."""
+import asyncio
+import json
+import re
+import httpx
+import pytest
+from unittest.mock import patch
+
+from app.services import llm_service
+from app.services.llm_service import validate_idea, validate_idea_fanout, active_prompt_version
+
+
+SECTION_VALUES = {
+    "market_analysis": {"tam": "10B", "score": 80},
+    "competition_analysis": {"direct_competitors": ["A"], "score": 60},
+    "technical_feasibility": {"development_complexity": "medium", "score": 70},
+    "business_model": {"revenue_streams": ["SaaS"], "score": 50},
+    "risks": {"overall_risk_level": "medium"},
+    "suggestions": {"improvements": ["Focus"]},
+    "summary": "Worth testing.",
+}
+
+
+def _section_of(request: httpx.Request) -> str:
+    prompt = json.loads(request.content)["messages"][0]["content"]
+    return re.search(r'Provide the "(\w+)" section', prompt).group(1)
+
+
+def _reply(section: str) -> httpx.Response:
+    content = json.dumps({section: SECTION_VALUES[section]})
+    return httpx.Response(200, json={"choices": [{"message": {"content": content}}]})
+
+
+def _client(handler) -> httpx.AsyncClient:
+    return httpx.AsyncClient(base_url="http://llm.test", transport=httpx.MockTransport(handler))
+
+
+async def test_fanout_merges_sections_and_scores():
+    """Test every section is requested and overall_score is the mean."""
+    requested = []
+
+    def handler(request):
+        section = _section_of(request)
+        requested.append(section)
+        return _reply(section)
+
+    client = _client(handler)
+    with patch("app.services.llm_service.get_llm_client", return_value=client):
+        result = await validate_idea_fanout("Idea", "A long enough idea description.")
+    await client.aclose()
+
+    assert sorted(requested) == sorted(SECTION_VALUES)
+    for section, value in SECTION_VALUES.items():
+        if isinstance(value, dict):
+            assert value.items() <= result[section].items()
+        else:
+            assert result[section] == value
+    assert result["overall_score"] == 65
+    assert "missing_sections" not in result
+
+
+async def test_fanout_returns_partial_report_on_noncritical_failure():
+    """Test a failing non-critical section is left empty."""
+    def handler(request):
+        section = _section_of(request)
+        if section in ("risks", "summary"):
+            return httpx.Response(500)
+        return _reply(section)
+
+    client = _client(handler)
+    with patch("app.services.llm_service.get_llm_client", return_value=client):
+        result = await validate_idea_fanout("Idea", "A long enough idea description.")
+    await client.aclose()
+
+    assert result["risks"]["market_risks"] == []
+    assert result["summary"] == ""
+    assert sorted(result["missing_sections"]) == ["risks", "summary"]
+    assert result["overall_score"] == 65
+
+
+async def test_fanout_raises_on_critical_failure():
+    """Test a failing critical section fails the validation."""
+    def handler(request):
+        section = _section_of(request)
+        if section == "market_analysis":
+            return httpx.Response(200, json={"choices": [{"message": {"content": "not json"}}]})
+        return _reply(section)
+
+    client = _client(handler)
+    with patch("app.services.llm_service.get_llm_client", return_value=client):
+        with pytest.raises(ValueError):
+            await validate_idea_fanout("Idea", "A long enough idea description.")
+    await client.aclose()
+
+
+async def test_fanout_retries_after_section_timeout():
+    """Test a timed-out section is retried."""
+    attempts = {}
+
+    async def handler(request):
+        section = _section_of(request)
+        attempts[section] = attempts.get(section, 0) + 1
+        if section == "business_model" and attempts[section] == 1:
+            await asyncio.sleep(1)
+        return _reply(section)
+
+    client = _client(handler)
+    with patch("app.services.llm_service.get_llm_client", return_value=client), \
+            patch.object(llm_service.settings, "llm_section_timeout_seconds", 0.05), \
+            patch.object(llm_service.settings, "llm_section_retries", 1):
+        result = await validate_idea_fanout("Idea", "A long enough idea description.")
+    await client.aclose()
+
+    assert attempts["business_model"] == 2
+    assert result["business_model"]["score"] == 50
+
+
+async def test_fanout_respects_concurrency_limit():
+    """Test no more than llm_fanout_concurrency calls run at once."""
+    in_flight = 0
+    peak = 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return _reply(_section_of(request))
+
+    client = _client(handler)
+    with patch("app.services.llm_service.get_llm_client", return_value=client), \
+            patch.object(llm_service.settings, "llm_fanout_concurrency", 2):
+        await validate_idea_fanout("Idea", "A long enough idea description.")
+    await client.aclose()
+
+    assert peak == 2
+
+
+async def test_validate_idea_dispatches_to_fanout():
+    """Test the fan-out mode is opt-in via settings."""
+    with patch.object(llm_service.settings, "llm_fanout_enabled", True), \
+            patch("app.services.llm_service.validate_idea_fanout") as mock_fanout:
+        mock_fanout.return_value = {"overall_score": 1}
+        assert await validate_idea("Idea", "A long enough idea description.") == {"overall_score": 1}
+        assert active_prompt_version().endswith("-fanout")
+    assert not active_prompt_version().endswith("-fanout")
@@ -0,0 +1,195 @@
+"""Tests for the Alembic migrations and the query index plan."""
+import asyncio
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, desc, select, text
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.database import Base, to_async_url
+from app.models import GenerationToken, PaymentTransaction, ValidationJob, ValidationReport
+from app.models.job import JOB_PENDING
+from app.services.token_service import _UNUSED
+from tests.conftest import TEST_DATABASE_URL
+
+
+ALEMBIC_INI = Path(__file__).parent.parent.parent / "alembic.ini"
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / "migrated.db"
+
+
+@pytest.fixture
+def alembic_config(db_path):
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("sqlalchemy.url", f"sqlite:///{db_path}")
+    config.attributes["configure_logger"] = False
+    return config
+
+
+@pytest.fixture
+def migrated(alembic_config, db_path):
+    command.upgrade(alembic_config, "head")
+    return db_path
+
+
+def test_migrations_match_models(migrated):
+    """Test upgrading to head produces exactly the schema the models declare."""
+    engine = create_engine(f"sqlite:///{migrated}")
+    with engine.connect() as conn:
+        diff = compare_metadata(MigrationContext.configure(conn), Base.metadata)
+    engine.dispose()
+    assert diff == []
+
+
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason="needs TEST_DATABASE_URL (PostgreSQL)")
+def test_migrations_match_models_on_postgresql():
+    """Test the PostgreSQL schema, with JSONB and UUID columns, matches the models."""
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("sqlalchemy.url", TEST_DATABASE_URL)
+    config.attributes["configure_logger"] = False
+    command.upgrade(config, "head")
+
+    def inspect_schema(conn):
+        diff = compare_metadata(MigrationContext.configure(conn), Base.metadata)
+        types = dict(conn.execute(text(
+            "SELECT column_name, data_type FROM information_schema.columns"
+            " WHERE table_name = 'validation_reports'"
+        )).all())
+        return diff, types
+
+    async def read_schema():
+        engine = create_async_engine(to_async_url(TEST_DATABASE_URL), poolclass=NullPool)
+        async with engine.connect() as conn:
+            result = await conn.run_sync(inspect_schema)
+        await engine.dispose()
+        return result
+
+    async def drop_version_table():
+        engine = create_async_engine(to_async_url(TEST_DATABASE_URL), poolclass=NullPool)
+        async with engine.begin() as conn:
+            await conn.execute(text("DROP TABLE alembic_version"))
+        await engine.dispose()
+
+    try:
+        diff, types = asyncio.run(read_schema())
+    finally:
+        command.downgrade(config, "base")
+        asyncio.run(drop_version_table())
+
+    assert diff == []
+    assert types["id"] == "uuid"
+    assert types["market_analysis"] == "jsonb"
+
+
+def test_downgrade_to_base(alembic_config, migrated):
+    """Test every migration can be reverted."""
+    command.downgrade(alembic_config, "base")
+
+    with sqlite3.connect(migrated) as conn:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert tables == {"alembic_version"}
+
+
+def test_duplicate_token_rows_are_merged(alembic_config, db_path):
+    """Test rows for the same device are merged before the unique index."""
+    command.upgrade(alembic_config, "0001")
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany(
+            "INSERT INTO generation_tokens (id, device_id, tokens_total, tokens_used, free_trial_used, created_at)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                ("a", "dup", 3, 1, 0, "2025-01-01 00:00:00"),
+                ("b", "dup", 5, 0, 1, "2025-01-02 00:00:00"),
+                ("c", "single", 1, 0, 0, "2025-01-01 00:00:00"),
+            ],
+        )
+
+    command.upgrade(alembic_config, "head")
+
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute(
+            "SELECT id, device_id, tokens_total, tokens_used, free_trial_used"
+            " FROM generation_tokens ORDER BY device_id"
+        ).fetchall()
+    assert rows == [("a", "dup", 8, 1, 1), ("c", "single", 1, 0, 0)]
+
+
+def test_unversioned_database_is_upgraded(alembic_config, db_path):
+    """Test a database from the old create_all hook is treated as the baseline."""
+    command.upgrade(alembic_config, "0001")
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("DROP TABLE alembic_version")
+
+    command.upgrade(alembic_config, "head")
+
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT version_num FROM alembic_version").fetchall() == [("0006",)]
+
+
+NOW = datetime(2025, 1, 1)
+
+HOT_QUERIES = {
+    "token by device": (
+        select(GenerationToken).where(GenerationToken.device_id == "device"),
+        "ix_generation_tokens_device_id",
+    ),
+    "unused token cleanup": (
+        select(GenerationToken.id).where(_UNUSED, GenerationToken.created_at < NOW).limit(1000),
+        "ix_generation_tokens_created_at",
+    ),
+    "report by id": (
+        select(ValidationReport).where(ValidationReport.id == "report"),
+        "sqlite_autoindex_validation_reports_1",
+    ),
+    "reports of a device": (
+        select(ValidationReport)
+        .where(ValidationReport.device_id == "device")
+        .order_by(desc(ValidationReport.created_at))
+        .limit(20),
+        "ix_validation_reports_device_id_created_at",
+    ),
+    "recent reports": (
+        select(ValidationReport).order_by(desc(ValidationReport.created_at)).limit(20),
+        "ix_validation_reports_created_at",
+    ),
+    "payment by checkout": (
+        select(PaymentTransaction).where(PaymentTransaction.checkout_id == "checkout"),
+        "ix_payment_transactions_checkout_id",
+    ),
+    "payments by status": (
+        select(PaymentTransaction)
+        .where(PaymentTransaction.status == "pending", PaymentTransaction.created_at < NOW)
+        .order_by(PaymentTransaction.created_at),
+        "ix_payment_transactions_status_created_at",
+    ),
+    "pending jobs": (
+        select(ValidationJob.id)
+        .where(ValidationJob.status == JOB_PENDING)
+        .order_by(ValidationJob.created_at),
+        "ix_validation_jobs_status_created_at",
+    ),
+}
+
+
+@pytest.mark.parametrize("name", HOT_QUERIES)
+def test_hot_queries_use_indexes(migrated, name):
+    """Test each hot query is answered from its index, without a sort."""
+    statement, index = HOT_QUERIES[name]
+    sql = str(statement.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}))
+
+    with sqlite3.connect(migrated) as conn:
+        plan = " | ".join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}"))
+
+    assert f"INDEX {index}" in plan, plan
+    assert "TEMP B-TREE" not in plan, plan
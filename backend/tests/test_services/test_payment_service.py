@@ -0,0 +1,149 @@
+"""Tests for webhook processing and the fast-ack batch applier."""
+import asyncio
+from unittest.mock import patch
+
+from sqlalchemy import select
+
+from app.models.payment import PaymentTransaction
+from app.models.webhook import WebhookEvent, EVENT_FAILED, EVENT_IGNORED, EVENT_PROCESSED
+from app.services.payment_service import (
+    WebhookApplier,
+    apply_webhook_event,
+    credit_tokens,
+    enqueue_webhook,
+    event_key,
+)
+from app.services.token_service import get_token_record
+
+
+def _event(checkout_id, order_id):
+    return {"type": "checkout.completed", "data": {"request_id": checkout_id, "id": order_id}}
+
+
+async def _transaction(db, checkout_id, device_id="device-1"):
+    db.add(PaymentTransaction(
+        checkout_id=checkout_id,
+        device_id=device_id,
+        product_sku="validator_10",
+        amount_cents=999,
+        status="pending",
+    ))
+    await db.commit()
+
+
+def test_event_key():
+    """Test the event id wins, then the type and order id, then a body hash."""
+    assert event_key({"id": "evt_1", "type": "checkout.completed"}, b"") == "evt_1"
+    assert event_key(_event("chk", "ord_1"), b"") == "checkout.completed:ord_1"
+    assert event_key({"type": "ping"}, b"{}") == event_key({"type": "ping"}, b"{}")
+    assert event_key({"type": "ping"}, b"{}").startswith("sha256:")
+
+
+async def test_apply_ignores_unknown_checkout(db):
+    """Test an event for a checkout that does not exist changes nothing."""
+    outcome = await apply_webhook_event(db, _event("missing", "ord_1"))
+    
+    assert outcome.to_dict() == {"status": "ignored", "reason": "transaction not found"}
+
+
+async def test_credit_tokens_creates_record(db):
+    """Test crediting a device without a record creates it in the same statement."""
+    await credit_tokens(db, "new-buyer", 10, "payment-1", "validator_10")
+    await db.commit()
+    
+    token = await get_token_record(db, "new-buyer")
+    assert (token.tokens_total, token.tokens_used, token.free_trial_used) == (10, 0, False)
+
+
+async def test_apply_batch(db):
+    """Test queued events are applied together and marked by outcome."""
+    from tests.conftest import TestingSessionLocal
+    
+    await _transaction(db, "chk-1")
+    await enqueue_webhook(db, "evt-1", _event("chk-1", "ord_1"))
+    await enqueue_webhook(db, "evt-2", {"type": "refund.created", "data": {}})
+    applier = WebhookApplier(TestingSessionLocal, batch_size=10, poll_seconds=60)
+    
+    assert await applier.apply_batch() == 2
+    assert await applier.apply_batch() == 0
+    
+    events = {e.id: e for e in (await db.execute(select(WebhookEvent))).scalars()}
+    assert events["evt-1"].status == EVENT_PROCESSED
+    assert events["evt-2"].status == EVENT_IGNORED
+    assert events["evt-2"].detail == "unhandled event: refund.created"
+    assert (await get_token_record(db, "device-1")).tokens_total == 10
+
+
+async def test_failing_event_does_not_block_batch(db):
+    """Test an event that keeps failing is marked failed and the others still apply."""
+    from tests.conftest import TestingSessionLocal
+    
+    await _transaction(db, "chk-good", device_id="good-device")
+    await _transaction(db, "chk-bad", device_id="bad-device")
+    await enqueue_webhook(db, "evt-bad", _event("chk-bad", "ord_bad"))
+    await enqueue_webhook(db, "evt-good", _event("chk-good", "ord_good"))
+    applier = WebhookApplier(TestingSessionLocal, batch_size=10, poll_seconds=60)
+    
+    async def flaky_credit(session, device_id, *args):
+        if device_id == "bad-device":
+            raise RuntimeError("constraint violated")
+        await credit_tokens(session, device_id, *args)
+    
+    with patch("app.services.payment_service.credit_tokens", flaky_credit):
+        assert await applier.apply_batch() == 2
+    
+    bad = await db.get(WebhookEvent, "evt-bad")
+    await db.refresh(bad)
+    assert bad.status == EVENT_FAILED
+    assert bad.detail == "constraint violated"
+    assert (await get_token_record(db, "good-device")).tokens_total == 10
+    assert await get_token_record(db, "bad-device") is None
+    payment = (await db.execute(
+        select(PaymentTransaction).where(PaymentTransaction.checkout_id == "chk-bad")
+    )).scalars().one()
+    assert payment.status == "pending"
+
+
+async def test_applier_wakes_on_notify(file_sessions):
+    """Test the running applier picks up a queued event when notified."""
+    async with file_sessions() as db:
+        await _transaction(db, "chk-1")
+    applier = WebhookApplier(file_sessions, batch_size=10, poll_seconds=60)
+    await applier.start()
+    try:
+        async with file_sessions() as db:
+            await enqueue_webhook(db, "evt-1", _event("chk-1", "ord_1"))
+        applier.notify()
+        for _ in range(200):
+            async with file_sessions() as db:
+                event = await db.get(WebhookEvent, "evt-1")
+            if event.status == EVENT_PROCESSED:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await applier.stop()
+    
+    assert event.status == EVENT_PROCESSED
+    async with file_sessions() as db:
+        assert (await get_token_record(db, "device-1")).tokens_total == 10
+
+
+async def test_concurrent_appliers_credit_once(file_sessions):
+    """Test several appliers draining the same events never credit twice."""
+    async with file_sessions() as db:
+        for n in range(20):
+            await _transaction(db, f"chk-{n}")
+            await enqueue_webhook(db, f"evt-{n}", _event(f"chk-{n}", f"ord_{n}"))
+    
+    appliers = [WebhookApplier(file_sessions, batch_size=5, poll_seconds=60) for _ in range(4)]
+    
+    async def drain(applier):
+        while await applier.apply_batch():
+            pass
+    
+    await asyncio.gather(*(drain(applier) for applier in appliers))
+    
+    async with file_sessions() as db:
+        assert (await get_token_record(db, "device-1")).tokens_total == 200
+        statuses = (await db.execute(select(WebhookEvent.status))).scalars().all()
+    assert statuses == [EVENT_PROCESSED] * 20
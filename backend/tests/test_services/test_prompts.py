@@ -0,0 +1,177 @@
+"""Tests for the prompt registry, token budgets and per-request usage."""
+import asyncio
+import json
+import httpx
+import pytest
+from unittest.mock import patch
+
+from app.metrics import llm_tokens
+from app.models.report import ValidationReport
+from app.services import llm_service
+from app.services.llm_service import stream_validate_idea, validate_idea
+from app.services.prompts import (
+    PROMPT_VERSION,
+    PROMPTS,
+    PromptRegistry,
+    estimate_tokens,
+    prompt_registry,
+)
+from app.services.report_service import record_validation
+from app.services.token_service import CreditReservation
+
+
+REPORT = {"overall_score": 72, "market_analysis": {"score": 70}, "summary": "Solid idea."}
+
+
+def _client(handler) -> httpx.AsyncClient:
+    return httpx.AsyncClient(base_url="http://llm.test", transport=httpx.MockTransport(handler))
+
+
+def _tokens(direction: str) -> float:
+    return llm_tokens.labels(
+        tool="idea-validator", direction=direction, prompt_version=PROMPT_VERSION
+    )._value.get()
+
+
+def test_estimate_tokens():
+    """Test Latin text counts about four characters a token and CJK one a character."""
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("a" * 400) == 100
+    assert estimate_tokens("市场分析") == 4
+    assert estimate_tokens("AI 市场") == 3
+
+
+def test_prompts_are_compiled_once_per_language():
+    """Test the registry hands out the same compiled prompt every time."""
+    assert prompt_registry.get("de") is prompt_registry.get("de")
+    assert prompt_registry.get("de").version == PROMPT_VERSION
+    assert "German (Deutsch)" in prompt_registry.get("de").system
+    assert prompt_registry.get("de").system != prompt_registry.get("ja").system
+
+
+def test_unknown_languages_and_versions():
+    """Test other language codes compile on demand and unknown versions fail."""
+    registry = PromptRegistry(PROMPTS)
+    
+    assert "Write every text value in pt" in registry.get("pt").system
+    assert registry.get("pt") is registry.get("pt")
+    with pytest.raises(KeyError):
+        registry.get("en", version="v0")
+
+
+def test_static_prefix_does_not_depend_on_the_idea():
+    """Test only the last message carries the idea, so the prefix is cacheable."""
+    prompt = prompt_registry.get("en")
+    first = prompt.messages("Meal Planner", "AI meal planning for busy families.")
+    second = prompt.messages("Dog Walker", "On-demand dog walking in small towns.")
+    
+    assert first[:-1] == second[:-1]
+    assert first[0]["content"] == prompt.system
+    assert "Meal Planner" in first[-1]["content"]
+    assert "Meal Planner" not in prompt.system
+
+
+def test_max_tokens_adapts_to_description_and_language():
+    """Test the budget grows with the description and language, up to the ceiling."""
+    english = prompt_registry.get("en")
+    short = english.max_tokens("A short idea.", 4000)
+    long = english.max_tokens("word " * 1000, 4000)
+    
+    assert short < long < 4000
+    assert prompt_registry.get("ja").max_tokens("A short idea.", 4000) > short
+    assert english.max_tokens("word " * 1000, 1500) == 1500
+
+
+async def test_validate_idea_records_usage_from_proxy():
+    """Test the proxy's usage block is reported and counted."""
+    seen = {}
+    
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen["body"] = json.loads(request.content)
+        return httpx.Response(200, json={
+            "choices": [{"message": {"content": json.dumps(REPORT)}}],
+            "usage": {"prompt_tokens": 612, "completion_tokens": 1480},
+        })
+    
+    before = (_tokens("input"), _tokens("output"))
+    client = _client(handler)
+    with patch("app.services.llm_service.get_llm_client", return_value=client):
+        result = await validate_idea("Meal Planner", "AI meal planning for busy families.", "ja")
+    await client.aclose()
+    
+    usage = result["usage"]
+    assert (usage["prompt_version"], usage["input_tokens"], usage["output_tokens"]) == (PROMPT_VERSION, 612, 1480)
+    assert usage["duration_ms"] >= 0
+    assert (_tokens("input") - before[0], _tokens("output") - before[1]) == (612, 1480)
+    assert seen["body"]["max_tokens"] == prompt_registry.get("ja").max_tokens(
+        "AI meal planning for busy families.", 4000
+    )
+    assert seen["body"]["messages"][0]["content"] == prompt_registry.get("ja").system
+
+
+async def test_validate_idea_estimates_usage_without_proxy_counts():
+    """Test local estimates stand in when the proxy reports no usage."""
+    content = json.dumps(REPORT)
+    
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"choices": [{"message": {"content": content}}]})
+    
+    client = _client(handler)
+    with patch("app.services.llm_service.get_llm_client", return_value=client), \
+            patch.object(llm_service.settings, "llm_adaptive_max_tokens", False):
+        result = await validate_idea("Meal Planner", "AI meal planning for busy families.")
+    await client.aclose()
+    
+    prompt = prompt_registry.get("en")
+    assert result["usage"]["input_tokens"] == prompt.input_tokens(
+        "Meal Planner", "AI meal planning for busy families."
+    )
+    assert result["usage"]["output_tokens"] == estimate_tokens(content)
+
+
+async def test_coalesced_callers_do_not_report_usage():
+    """Test only the caller that made the upstream call carries its usage."""
+    async def upstream(*args):
+        await asyncio.sleep(0.02)
+        return dict(REPORT, usage={"prompt_version": PROMPT_VERSION, "input_tokens": 1})
+    
+    with patch("app.services.llm_service._validate_idea", upstream):
+        results = await asyncio.gather(*(validate_idea("Idea", "Same description.") for _ in range(3)))
+    
+    assert sum("usage" in result for result in results) == 1
+
+
+async def test_stream_fills_usage():
+    """Test the streamed path reports estimated usage once the report is complete."""
+    content = json.dumps(REPORT)
+    
+    def handler(request: httpx.Request) -> httpx.Response:
+        delta = {"choices": [{"delta": {"content": content}}]}
+        return httpx.Response(200, content=f"data: {json.dumps(delta)}\n\ndata: [DONE]\n\n".encode())
+    
+    usage = {}
+    client = _client(handler)
+    with patch("app.services.llm_service.get_llm_client", return_value=client):
+        async for _ in stream_validate_idea("Idea", "A long enough idea description.", usage=usage):
+            pass
+    await client.aclose()
+    
+    assert usage["prompt_version"] == PROMPT_VERSION
+    assert usage["output_tokens"] == estimate_tokens(content)
+
+
+async def test_report_stores_usage(db):
+    """Test the report row keeps the usage of a fresh result and the version of a cached one."""
+    usage = {"prompt_version": PROMPT_VERSION, "input_tokens": 600, "output_tokens": 1500, "duration_ms": 21000}
+    reservation = CreditReservation("device-1", "free_trial")
+    
+    fresh = await record_validation(db, reservation, "Idea", "Description", "en", dict(REPORT, usage=usage))
+    cached = await record_validation(db, reservation, "Idea", "Description", "en", dict(REPORT))
+    
+    fresh = await db.get(ValidationReport, fresh.id)
+    assert (fresh.prompt_version, fresh.input_tokens, fresh.output_tokens, fresh.llm_duration_ms) == (
+        PROMPT_VERSION, 600, 1500, 21000
+    )
+    assert cached.prompt_version == PROMPT_VERSION
+    assert cached.input_tokens is None
+    assert "usage" not in fresh.to_dict()
@@ -0,0 +1,134 @@
+"""Tests for LLM report JSON extraction and repair."""
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+from app.services.report_parser import (
+    ReportParseError,
+    ReportSchema,
+    extract_json_object,
+    parse_report,
+)
+
+
+CORPUS_DIR = Path(__file__).parent.parent / "fixtures" / "llm_responses"
+
+# Repairs each corpus response is expected to need (subset check)
+EXPECTED_REPAIRS = {
+    "clean_fenced.txt": set(),
+    "fence_without_language.txt": set(),
+    "prose_wrapped.txt": {"surrounding_text"},
+    "trailing_commas.txt": {"trailing_comma"},
+    "truncated_mid_string.txt": {"truncated"},
+    "truncated_after_key.txt": {"truncated"},
+    "raw_newlines_in_strings.txt": {"control_character"},
+    "type_slips.txt": {
+        "overall_score: coerced to integer",
+        "market_analysis.market_trends: string wrapped in list",
+        "technical_feasibility.score: clamped",
+        "business_model: not an object",
+        "summary: coerced to string",
+    },
+}
+
+
+def _corpus():
+    return sorted(CORPUS_DIR.glob("*.txt"))
+
+
+def test_corpus_is_covered():
+    """Test every corpus file has an expectation."""
+    assert {p.name for p in _corpus()} == set(EXPECTED_REPAIRS)
+
+
+@pytest.mark.parametrize("path", _corpus(), ids=lambda p: p.name)
+def test_corpus_parses_to_schema(path):
+    """Test every recorded malformed response yields a valid report."""
+    report, repairs = parse_report(path.read_text())
+
+    ReportSchema.model_validate(report)
+    assert 0 <= report["overall_score"] <= 100
+    assert EXPECTED_REPAIRS[path.name] <= set(repairs)
+    if not EXPECTED_REPAIRS[path.name]:
+        assert [r for r in repairs if not r.endswith(": missing")] == []
+
+
+def test_truncated_report_keeps_completed_sections():
+    """Test truncation keeps everything up to the last complete value."""
+    report, _ = parse_report((CORPUS_DIR / "truncated_mid_string.txt").read_text())
+
+    assert report["market_analysis"]["score"] == 84
+    assert report["competition_analysis"]["direct_competitors"] == ["ComplyAdvantage", "Alloy"]
+    assert report["technical_feasibility"]["key_technical_challenges"] == [
+        "Explainability of automated decisi"
+    ]
+
+
+def test_truncated_after_key_drops_dangling_key():
+    """Test a dangling key without a value is dropped."""
+    data, repairs = extract_json_object('{"a": 1, "b": {"c": [1, 2')
+    assert data == {"a": 1, "b": {"c": [1, 2]}}
+    assert repairs == ["truncated"]
+
+    data, _ = extract_json_object('{"a": 1, "b"')
+    assert data == {"a": 1}
+
+    data, _ = extract_json_object('{"a": 1, "b": tru')
+    assert data == {"a": 1}
+
+
+def test_type_slips_are_coerced():
+    """Test common LLM type slips are coerced into the schema."""
+    report, _ = parse_report((CORPUS_DIR / "type_slips.txt").read_text())
+
+    assert report["overall_score"] == 72
+    assert report["market_analysis"]["tam"] == "5000000000"
+    assert report["competition_analysis"]["score"] == 66
+    assert report["competition_analysis"]["direct_competitors"][1] == "Honor"
+    assert report["technical_feasibility"]["technology_stack"] == []
+    assert report["technical_feasibility"]["score"] == 100
+    assert report["business_model"]["revenue_streams"] == []
+    assert report["summary"] == ""
+
+
+def test_trailing_text_with_braces_is_ignored():
+    """Test prose after the object is ignored even if it contains braces."""
+    data, repairs = extract_json_object('{"summary": "ok"}\nNote: {see above}')
+    assert data == {"summary": "ok"}
+    assert "surrounding_text" in repairs
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "I cannot help with that.",
+        '{"summary": 1x}',
+        '{"error": "rate limited"}',
+        "{",
+    ],
+)
+def test_unrecoverable_content_raises(content):
+    """Test unrecoverable output raises ReportParseError."""
+    with pytest.raises(ReportParseError):
+        parse_report(content)
+
+
+def test_fuzz_truncation_and_commas_never_crash():
+    """Test random truncations and injected commas either parse or raise ReportParseError."""
+    rng = random.Random(1234)
+    base = (CORPUS_DIR / "clean_fenced.txt").read_text()
+    for _ in range(400):
+        text = base[:rng.randint(0, len(base))]
+        if rng.random() < 0.5:
+            closers = [i for i, c in enumerate(text) if c in "}]"]
+            if closers:
+                i = rng.choice(closers)
+                text = text[:i] + "," + text[i:]
+        try:
+            report, _ = parse_report(text)
+        except ReportParseError:
+            continue
+        assert set(ReportSchema.model_fields) <= set(report)
+        json.dumps(report)
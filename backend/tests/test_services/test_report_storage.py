@@ -0,0 +1,100 @@
+"""Tests for the packed report storage format."""
+import pytest
+from fastapi.responses import JSONResponse
+from sqlalchemy import select, text
+from unittest.mock import patch
+
+from app.config import get_settings
+from app.models.report import ValidationReport
+from app.services.report_service import record_validation
+from app.services.token_service import CreditReservation
+from app.tasks.migrate_report_storage import convert_reports
+
+
+RESULT = {
+    "overall_score": 72,
+    "market_analysis": {"tam": "$12B", "market_trends": ["Personalized nutrition"], "score": 74},
+    "competition_analysis": {"direct_competitors": ["Mealime"], "score": 61},
+    "technical_feasibility": {"time_to_mvp": "10-12 weeks", "score": 80},
+    "business_model": {"pricing_strategy": "月額980円", "score": 70},
+    "risks": {"overall_risk_level": "medium"},
+    "suggestions": {"immediate_actions": ["Interview 20 target parents"]},
+    "summary": "A viable but crowded space.",
+}
+
+
+async def _record(db) -> ValidationReport:
+    return await record_validation(
+        db,
+        CreditReservation("storage-device", "paid"),
+        "AI Food Planner",
+        "An AI-powered meal planning application for busy families.",
+        "en",
+        RESULT,
+    )
+
+
+async def test_pack_round_trip(db):
+    """Test packing keeps the report identical and empties the JSON columns."""
+    report = await _record(db)
+    expected = report.to_dict()
+    body = report.to_json()
+    assert body == JSONResponse(expected).body
+
+    report.pack()
+
+    assert report.market_analysis is None and report.summary is None
+    assert len(report.payload) < len(body)
+    assert report.to_json() == body
+    assert report.to_dict() == expected
+
+    report.unpack()
+    assert report.payload is None
+    assert report.to_dict() == expected
+
+
+async def test_packed_storage_is_served_unchanged(client, db):
+    """Test a report stored packed reads back the same through the API."""
+    with patch.object(get_settings(), "report_storage", "packed"):
+        report = await _record(db)
+
+    stored = await db.scalar(
+        text("SELECT market_analysis FROM validation_reports WHERE id = :id"), {"id": report.id}
+    )
+    assert stored is None
+    assert report.payload is not None
+
+    response = await client.get(f"/api/v1/reports/{report.id}")
+    assert response.status_code == 200
+    assert response.json()["market_analysis"] == RESULT["market_analysis"]
+    assert response.json()["business_model"]["pricing_strategy"] == "月額980円"
+
+
+async def test_convert_reports(db):
+    """Test existing reports are converted in batches and back."""
+    reports = [await _record(db) for _ in range(3)]
+    expected = {r.id: r.to_dict() for r in reports}
+
+    assert await convert_reports(db, "packed", batch_size=2) == 3
+    assert await convert_reports(db, "packed", batch_size=2) == 0
+    packed = (await db.execute(select(ValidationReport))).scalars().all()
+    assert all(r.payload is not None for r in packed)
+    assert {r.id: r.to_dict() for r in packed} == expected
+
+    assert await convert_reports(db, "columns") == 3
+    unpacked = (await db.execute(select(ValidationReport))).scalars().all()
+    assert all(r.payload is None for r in unpacked)
+    assert {r.id: r.to_dict() for r in unpacked} == expected
+
+    with pytest.raises(ValueError):
+        await convert_reports(db, "zstd")
+
+
+async def test_migration_task(db):
+    """Test the task entry point packs existing reports."""
+    from app.tasks import migrate_report_storage
+    from tests.conftest import TestingSessionLocal
+
+    await _record(db)
+    with patch("app.tasks.migrate_report_storage.SessionLocal", TestingSessionLocal):
+        assert await migrate_report_storage.run("packed", batch_size=100) == 1
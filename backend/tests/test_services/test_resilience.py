@@ -0,0 +1,191 @@
+"""Tests for retries, hedging and the circuit breaker around LLM calls."""
+import asyncio
+import json
+import httpx
+import pytest
+from fastapi import FastAPI, Response
+from unittest.mock import patch
+
+from app.metrics import llm_circuit_state
+from app.services.llm_service import validate_idea
+from app.services.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    ResilientCaller,
+    is_retryable,
+)
+
+
+REPORT = json.dumps({"overall_score": 70, "summary": "Fine."})
+
+BODY = {
+    "idea_title": "AI Food Planner",
+    "idea_description": "An AI-powered meal planning application for busy families.",
+    "language": "en",
+}
+
+
+class StubProxy:
+    """OpenAI-compatible stub that replays a script of statuses and delays."""
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.calls = 0
+        self.app = FastAPI()
+        self.app.post("/v1/chat/completions")(self.handle)
+
+    async def handle(self):
+        step = self.script[min(self.calls, len(self.script) - 1)]
+        self.calls += 1
+        status, delay = step if isinstance(step, tuple) else (step, 0)
+        if delay:
+            await asyncio.sleep(delay)
+        if status != 200:
+            return Response(status_code=status)
+        return {"choices": [{"message": {"content": REPORT}}]}
+
+    def client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url="http://llm.test", transport=httpx.ASGITransport(app=self.app)
+        )
+
+
+def _caller(**kwargs) -> ResilientCaller:
+    options = dict(retry_attempts=2, backoff_seconds=0, backoff_max_seconds=0)
+    options.update(kwargs)
+    breaker = CircuitBreaker(options.pop("failure_threshold", 5), options.pop("recovery_seconds", 30))
+    return ResilientCaller(breaker, **options)
+
+
+def _gauge() -> float:
+    return llm_circuit_state.labels(tool="idea-validator")._value.get()
+
+
+async def _post(client: httpx.AsyncClient):
+    return await client.post("/v1/chat/completions", json={})
+
+
+async def test_retries_on_5xx_then_succeeds(llm_caller):
+    """Test transient upstream errors are retried transparently."""
+    proxy = StubProxy([502, 503, 200])
+    async with proxy.client() as client:
+        with patch("app.services.llm_service.get_llm_client", return_value=client):
+            result = await validate_idea("Idea", "A long enough idea description.")
+
+    assert result["overall_score"] == 70
+    assert proxy.calls == 3
+    assert llm_caller.breaker.state == "closed"
+
+
+async def test_does_not_retry_4xx():
+    """Test client errors fail immediately and do not trip the breaker."""
+    proxy = StubProxy([400])
+    caller = _caller(failure_threshold=1)
+    async with proxy.client() as client:
+        with pytest.raises(httpx.HTTPStatusError):
+            await caller.call(lambda: _post(client))
+
+    assert proxy.calls == 1
+    assert caller.breaker.state == "closed"
+
+
+def test_is_retryable():
+    """Test only transport errors, 429 and 5xx are retryable."""
+    request = httpx.Request("POST", "http://llm.test")
+
+    def status_error(code):
+        return httpx.HTTPStatusError("", request=request, response=httpx.Response(code))
+
+    assert is_retryable(httpx.ConnectError("down"))
+    assert is_retryable(status_error(429))
+    assert is_retryable(status_error(500))
+    assert not is_retryable(status_error(404))
+    assert not is_retryable(ValueError("bad json"))
+
+
+async def test_breaker_opens_and_recovers():
+    """Test the breaker opens after repeated failures and closes after a good probe."""
+    proxy = StubProxy([500, 500, 200])
+    caller = _caller(retry_attempts=0, failure_threshold=2, recovery_seconds=30)
+    async with proxy.client() as client:
+        for _ in range(2):
+            with pytest.raises(httpx.HTTPStatusError):
+                await caller.call(lambda: _post(client))
+        assert caller.breaker.state == "open"
+        assert _gauge() == 2
+
+        with pytest.raises(CircuitOpenError) as exc_info:
+            await caller.call(lambda: _post(client))
+        assert proxy.calls == 2
+        assert 0 < exc_info.value.retry_after <= 30
+
+        caller.breaker.opened_at -= 31
+        response = await caller.call(lambda: _post(client))
+
+    assert response.status_code == 200
+    assert caller.breaker.state == "closed"
+    assert _gauge() == 0
+
+
+async def test_half_open_allows_single_probe():
+    """Test only one probe is sent while the breaker is half-open."""
+    proxy = StubProxy([(200, 0.05)])
+    caller = _caller(retry_attempts=0, failure_threshold=1, recovery_seconds=30)
+    caller.breaker.record_failure()
+    caller.breaker.opened_at -= 31
+    async with proxy.client() as client:
+        results = await asyncio.gather(
+            caller.call(lambda: _post(client)),
+            caller.call(lambda: _post(client)),
+            return_exceptions=True,
+        )
+
+    assert sum(isinstance(r, CircuitOpenError) for r in results) == 1
+    assert proxy.calls == 1
+    assert caller.breaker.state == "closed"
+
+
+async def test_failed_probe_reopens_breaker():
+    """Test a failing half-open probe reopens the breaker."""
+    breaker = CircuitBreaker(failure_threshold=3, recovery_seconds=30)
+    for _ in range(3):
+        breaker.record_failure()
+    breaker.opened_at -= 31
+    breaker.before_call()
+    assert breaker.state == "half_open"
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+
+async def test_hedge_wins_over_slow_primary():
+    """Test a hedged request returns before a slow primary."""
+    proxy = StubProxy([(200, 5), (200, 0)])
+    caller = _caller(hedge_enabled=True, hedge_min_samples=3, hedge_min_delay_seconds=0.01)
+    for _ in range(3):
+        caller.latency.observe(0.01)
+    async with proxy.client() as client:
+        response = await asyncio.wait_for(caller.call(lambda: _post(client)), timeout=2)
+
+    assert response.status_code == 200
+    assert proxy.calls == 2
+
+
+async def test_hedging_waits_for_enough_samples():
+    """Test no hedge is sent before the latency window is warm."""
+    caller = _caller(hedge_enabled=True, hedge_min_samples=3)
+    assert caller.hedge_delay() is None
+    for _ in range(3):
+        caller.latency.observe(2.0)
+    assert caller.hedge_delay() == 2.0
+
+
+async def test_validate_returns_503_when_circuit_open(client, device_id, llm_caller):
+    """Test an open circuit fails fast with 503 and Retry-After."""
+    for _ in range(llm_caller.breaker.failure_threshold):
+        llm_caller.breaker.record_failure()
+
+    response = await client.post(f"/api/v1/validate?device_id={device_id}", json=BODY)
+
+    assert response.status_code == 503
+    assert 1 <= int(response.headers["Retry-After"]) <= 30
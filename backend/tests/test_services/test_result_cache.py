@@ -0,0 +1,133 @@
+"""Tests for the LLM result cache."""
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from app.models.cache import ValidationCacheEntry
+from app.services.result_cache import (
+    MemoryResultCache,
+    DatabaseResultCache,
+    NullResultCache,
+    build_result_cache,
+    cache_key,
+)
+
+
+RESULT = {"overall_score": 70, "summary": "Cached."}
+
+
+def test_cache_key_normalizes_input():
+    """Test whitespace and case differences share a key."""
+    a = cache_key("AI  Meal Planner", "Plans meals\nweekly.", "en", "model-a", "v1")
+    b = cache_key(" ai meal planner ", "plans   meals\nWEEKLY.", "en", "model-a", "v1")
+    assert a == b
+
+
+def test_cache_key_varies_by_language_model_and_version():
+    """Test language, model and prompt version are part of the key."""
+    base = cache_key("Idea", "Description", "en", "model-a", "v1")
+    assert base != cache_key("Idea", "Description", "de", "model-a", "v1")
+    assert base != cache_key("Idea", "Description", "en", "model-b", "v1")
+    assert base != cache_key("Idea", "Description", "en", "model-a", "v2")
+
+
+async def test_memory_cache_hit_and_miss():
+    """Test memory cache returns stored results as copies."""
+    cache = MemoryResultCache(max_entries=10, ttl_seconds=60)
+    assert await cache.get(None, "k") is None
+
+    await cache.set(None, "k", RESULT)
+    hit = await cache.get(None, "k")
+    assert hit == RESULT
+    hit["summary"] = "mutated"
+    assert (await cache.get(None, "k"))["summary"] == "Cached."
+
+
+async def test_memory_cache_lru_eviction():
+    """Test least recently used entries are evicted first."""
+    cache = MemoryResultCache(max_entries=2, ttl_seconds=60)
+    await cache.set(None, "a", RESULT)
+    await cache.set(None, "b", RESULT)
+    await cache.get(None, "a")
+    await cache.set(None, "c", RESULT)
+
+    assert await cache.get(None, "a") is not None
+    assert await cache.get(None, "b") is None
+    assert await cache.get(None, "c") is not None
+
+
+async def test_memory_cache_ttl_expiry():
+    """Test expired entries are dropped on read."""
+    cache = MemoryResultCache(max_entries=10, ttl_seconds=60)
+    with patch("app.services.result_cache.time.monotonic", return_value=1000.0):
+        await cache.set(None, "k", RESULT)
+    with patch("app.services.result_cache.time.monotonic", return_value=1061.0):
+        assert await cache.get(None, "k") is None
+    cache.clear()
+
+
+async def test_database_cache_roundtrip(db):
+    """Test database cache persists results in the validation_cache table."""
+    cache = DatabaseResultCache(max_entries=10, ttl_seconds=60)
+    assert await cache.get(db, "k") is None
+
+    await cache.set(db, "k", RESULT)
+    assert await cache.get(db, "k") == RESULT
+
+    await cache.set(db, "k", {"overall_score": 10})
+    assert await cache.get(db, "k") == {"overall_score": 10}
+
+
+@pytest.mark.parametrize("cache_class", [MemoryResultCache, DatabaseResultCache])
+async def test_cache_drops_usage(cache_class, db):
+    """Test the token usage of the call that produced a result is not cached."""
+    cache = cache_class(max_entries=10, ttl_seconds=60)
+
+    await cache.set(db, "k", dict(RESULT, usage={"input_tokens": 600}))
+    assert await cache.get(db, "k") == RESULT
+
+
+async def test_database_cache_expiry(db):
+    """Test expired rows are deleted on read."""
+    cache = DatabaseResultCache(max_entries=10, ttl_seconds=60)
+    db.add(ValidationCacheEntry(
+        key="old",
+        result=RESULT,
+        expires_at=datetime.utcnow() - timedelta(seconds=1),
+    ))
+    await db.commit()
+
+    assert await cache.get(db, "old") is None
+    assert await db.get(ValidationCacheEntry, "old") is None
+
+
+async def test_database_cache_lru_eviction(db):
+    """Test the table is trimmed to max_entries by last access."""
+    cache = DatabaseResultCache(max_entries=2, ttl_seconds=60)
+    await cache.set(db, "a", RESULT)
+    await cache.set(db, "b", RESULT)
+    entry = await db.get(ValidationCacheEntry, "a")
+    entry.last_accessed_at = datetime.utcnow() + timedelta(seconds=5)
+    await db.commit()
+    await cache.set(db, "c", RESULT)
+
+    assert await cache.get(db, "a") is not None
+    assert await cache.get(db, "b") is None
+    assert await cache.get(db, "c") is not None
+
+
+async def test_null_cache_never_stores():
+    """Test the 'none' backend disables caching."""
+    cache = NullResultCache()
+    await cache.set(None, "k", RESULT)
+    assert await cache.get(None, "k") is None
+    cache.clear()
+
+
+def test_build_result_cache():
+    """Test backends are selected by name."""
+    assert isinstance(build_result_cache("memory"), MemoryResultCache)
+    assert isinstance(build_result_cache("database"), DatabaseResultCache)
+    assert isinstance(build_result_cache("none"), NullResultCache)
+    with pytest.raises(ValueError):
+        build_result_cache("redis")
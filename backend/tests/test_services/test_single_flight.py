@@ -0,0 +1,166 @@
+"""Tests for coalescing identical concurrent validations."""
+import asyncio
+from unittest.mock import patch
+
+from sqlalchemy import func, select
+
+from app.metrics import llm_coalesced_requests
+from app.models.report import ValidationReport
+from app.services.llm_service import SingleFlight, validate_idea, validation_flights
+from app.services.report_service import record_validation
+from app.services.token_service import add_tokens, get_token_record, reserve_credit
+
+
+def _coalesced() -> float:
+    return llm_coalesced_requests.labels(tool="idea-validator")._value.get()
+
+
+class SlowUpstream:
+    """Stands in for the LLM call; each call takes ``delay`` seconds."""
+
+    def __init__(self, delay=0.05, error=None):
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    async def __call__(self, *args):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return {"overall_score": 70, "market_analysis": {"score": 70}, "summary": "Fine."}
+
+
+async def test_concurrent_identical_calls_share_one_upstream_call():
+    """Test identical callers await one call and each get their own copy."""
+    flights = SingleFlight()
+    upstream = SlowUpstream()
+    before = _coalesced()
+    
+    results = await asyncio.gather(*(flights.run("key", upstream) for _ in range(5)))
+    
+    assert upstream.calls == 1
+    assert _coalesced() - before == 4
+    assert all(result == results[0] for result in results)
+    assert len({id(result) for result in results}) == 5
+    assert flights.in_flight() == 0
+
+
+async def test_different_keys_and_later_calls_are_not_coalesced():
+    """Test only calls for the same key that overlap in time are shared."""
+    flights = SingleFlight()
+    upstream = SlowUpstream()
+    
+    await asyncio.gather(flights.run("a", upstream), flights.run("b", upstream))
+    await flights.run("a", upstream)
+    
+    assert upstream.calls == 3
+
+
+async def test_error_is_shared_and_not_remembered():
+    """Test every waiter sees the failure and the next call tries again."""
+    flights = SingleFlight()
+    upstream = SlowUpstream(error=RuntimeError("upstream down"))
+    
+    results = await asyncio.gather(
+        *(flights.run("key", upstream) for _ in range(3)), return_exceptions=True
+    )
+    
+    assert upstream.calls == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+    upstream.error = None
+    assert (await flights.run("key", upstream))["overall_score"] == 70
+    assert upstream.calls == 2
+
+
+async def test_cancelled_leader_does_not_cancel_followers():
+    """Test a caller going away leaves the shared call running for the rest."""
+    flights = SingleFlight()
+    upstream = SlowUpstream()
+    
+    leader = asyncio.create_task(flights.run("key", upstream))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(flights.run("key", upstream))
+    await asyncio.sleep(0)
+    leader.cancel()
+    
+    assert (await follower)["overall_score"] == 70
+    assert upstream.calls == 1
+
+
+async def test_call_is_cancelled_when_every_caller_leaves():
+    """Test the upstream call stops once nobody is waiting for it."""
+    flights = SingleFlight()
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+    
+    async def upstream():
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+    
+    caller = asyncio.create_task(flights.run("key", upstream))
+    await started.wait()
+    caller.cancel()
+    
+    await asyncio.wait_for(cancelled.wait(), 1)
+    await asyncio.sleep(0)
+    assert flights.in_flight() == 0
+
+
+async def test_validate_idea_coalesces_normalized_requests():
+    """Test submissions differing only in case and whitespace share a call."""
+    upstream = SlowUpstream()
+    
+    with patch("app.services.llm_service._validate_idea", upstream):
+        await asyncio.gather(
+            validate_idea("AI Food Planner", "Meal planning for busy families."),
+            validate_idea("ai food  planner", "Meal planning for busy families. "),
+            validate_idea("AI Food Planner", "Meal planning for busy families.", "de"),
+        )
+    
+    assert upstream.calls == 2
+    assert validation_flights.in_flight() == 0
+
+
+async def test_coalescing_can_be_disabled():
+    """Test LLM_COALESCE_ENABLED=false sends every request upstream."""
+    upstream = SlowUpstream()
+    
+    with patch("app.services.llm_service._validate_idea", upstream), \
+            patch("app.services.llm_service.settings.llm_coalesce_enabled", False):
+        await asyncio.gather(*(validate_idea("Idea", "Same description.") for _ in range(3)))
+    
+    assert upstream.calls == 3
+
+
+async def test_coalesced_callers_keep_their_own_reports_and_credits(file_sessions):
+    """Test each coalesced caller stores a report and pays one credit."""
+    upstream = SlowUpstream()
+    async with file_sessions() as db:
+        await add_tokens(db, "buyer", 2, "payment-1", "validator_3")
+    
+    async def validate(device_id):
+        async with file_sessions() as db:
+            reservation = await reserve_credit(db, device_id)
+            await db.commit()
+            result = await validate_idea("AI Food Planner", "Meal planning for busy families.")
+            return await record_validation(
+                db, reservation, "AI Food Planner", "Meal planning for busy families.", "en", result
+            )
+    
+    with patch("app.services.llm_service._validate_idea", upstream):
+        reports = await asyncio.gather(validate("buyer"), validate("buyer"), validate("trial-user"))
+    
+    assert upstream.calls == 1
+    assert len({report.id for report in reports}) == 3
+    async with file_sessions() as db:
+        assert await db.scalar(select(func.count()).select_from(ValidationReport)) == 3
+        buyer = await get_token_record(db, "buyer")
+        trial = await get_token_record(db, "trial-user")
+    # One free trial and one paid credit for the buyer, the trial for the other
+    assert buyer.free_trial_used and buyer.tokens_used == 1
+    assert trial.free_trial_used and trial.tokens_used == 0
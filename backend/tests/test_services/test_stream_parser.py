@@ -0,0 +1,53 @@
+"""Tests for the incremental section parser."""
+import json
+import pytest
+
+from app.services.stream_parser import SectionStreamParser
+
+
+REPORT = {
+    "overall_score": 72,
+    "market_analysis": {"tam": "10B", "market_trends": ["a", "b"], "score": 70},
+    "competition_analysis": {"direct_competitors": ["X {inc}", "Y \"quoted\""], "score": 60},
+    "risks": {"overall_risk_level": "medium"},
+    "summary": "Promising, but crowded: [see risks].",
+}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 17, 10_000])
+def test_sections_emitted_in_order(chunk_size):
+    """Test every top-level section is emitted once regardless of chunking."""
+    text = "```json\n" + json.dumps(REPORT, indent=2) + "\n```"
+    parser = SectionStreamParser()
+    emitted = []
+    for i in range(0, len(text), chunk_size):
+        emitted.extend(parser.feed(text[i:i + chunk_size]))
+
+    assert parser.complete
+    assert [name for name, _ in emitted] == list(REPORT)
+    assert dict(emitted) == REPORT
+    assert parser.sections == REPORT
+
+
+def test_section_emitted_as_soon_as_complete():
+    """Test a section is available before the rest of the document arrives."""
+    parser = SectionStreamParser()
+    assert parser.feed('{"market_analysis": {"score": 7') == []
+    assert parser.feed('0}, "summa') == [("market_analysis", {"score": 70})]
+    assert not parser.complete
+
+
+def test_truncated_stream_is_incomplete():
+    """Test a stream cut off mid-document is not marked complete."""
+    parser = SectionStreamParser()
+    parser.feed('{"overall_score": 50, "summary": "unfinished')
+    assert not parser.complete
+    assert parser.sections == {"overall_score": 50}
+
+
+def test_invalid_section_is_skipped():
+    """Test a malformed section value does not stop later sections."""
+    parser = SectionStreamParser()
+    emitted = parser.feed('{"overall_score": 5x, "summary": "ok"}')
+    assert emitted == [("summary", "ok")]
+    assert parser.complete
@@ -1,18 +1,30 @@
 """Tests for token service."""
+import asyncio
 import pytest
+from unittest.mock import patch
+from datetime import datetime, timedelta
+from sqlalchemy import func, select
+
+from app.models.token import GenerationToken
 from app.services.token_service import (
+    get_token_record,
     get_or_create_token_record,
+    delete_unused_token_records,
     check_can_generate,
     use_generation,
+    reserve_credit,
+    release_credit,
+    reserve_credits,
+    release_credits,
     add_tokens,
     get_token_status,
 )
 
 
-def test_get_or_create_new_device(db):
+async def test_get_or_create_new_device(db):
     """Test creating token record for new device."""
     device_id = "new-device-123"
-    token = get_or_create_token_record(db, device_id)
+    token = await get_or_create_token_record(db, device_id)
     
     assert token is not None
     assert token.device_id == device_id
@@ -21,124 +33,124 @@ def test_get_or_create_new_device(db):
     assert token.free_trial_used is False
 
 
-def test_get_or_create_existing_device(db):
+async def test_get_or_create_existing_device(db):
     """Test getting existing token record."""
     device_id = "existing-device-123"
     
     # Create first
-    token1 = get_or_create_token_record(db, device_id)
+    token1 = await get_or_create_token_record(db, device_id)
     token1.tokens_total = 5
-    db.commit()
+    await db.commit()
     
     # Get again
-    token2 = get_or_create_token_record(db, device_id)
+    token2 = await get_or_create_token_record(db, device_id)
     assert token2.id == token1.id
     assert token2.tokens_total == 5
 
 
-def test_check_can_generate_free_trial(db):
+async def test_check_can_generate_free_trial(db):
     """Test checking generation with free trial available."""
     device_id = "trial-device"
-    can_generate, reason = check_can_generate(db, device_id)
+    can_generate, reason = await check_can_generate(db, device_id)
     
     assert can_generate is True
     assert reason == "free_trial"
 
 
-def test_check_can_generate_paid(db):
+async def test_check_can_generate_paid(db):
     """Test checking generation with paid tokens."""
     device_id = "paid-device"
-    token = get_or_create_token_record(db, device_id)
+    token = await get_or_create_token_record(db, device_id)
     token.free_trial_used = True
     token.tokens_total = 10
-    db.commit()
+    await db.commit()
     
-    can_generate, reason = check_can_generate(db, device_id)
+    can_generate, reason = await check_can_generate(db, device_id)
     assert can_generate is True
     assert reason == "paid"
 
 
-def test_check_can_generate_no_tokens(db):
+async def test_check_can_generate_no_tokens(db):
     """Test checking generation with no tokens."""
     device_id = "exhausted-device"
-    token = get_or_create_token_record(db, device_id)
+    token = await get_or_create_token_record(db, device_id)
     token.free_trial_used = True
     token.tokens_total = 0
-    db.commit()
+    await db.commit()
     
-    can_generate, reason = check_can_generate(db, device_id)
+    can_generate, reason = await check_can_generate(db, device_id)
     assert can_generate is False
     assert reason == "no_tokens"
 
 
-def test_use_generation_free_trial(db):
+async def test_use_generation_free_trial(db):
     """Test using free trial."""
     device_id = "use-trial-device"
     
-    result = use_generation(db, device_id)
+    result = await use_generation(db, device_id)
     assert result is True
     
-    token = get_or_create_token_record(db, device_id)
+    token = await get_or_create_token_record(db, device_id)
     assert token.free_trial_used is True
 
 
-def test_use_generation_paid_token(db):
+async def test_use_generation_paid_token(db):
     """Test using paid token."""
     device_id = "use-paid-device"
-    token = get_or_create_token_record(db, device_id)
+    token = await get_or_create_token_record(db, device_id)
     token.free_trial_used = True
     token.tokens_total = 5
-    db.commit()
+    await db.commit()
     
-    result = use_generation(db, device_id)
+    result = await use_generation(db, device_id)
     assert result is True
     
-    db.refresh(token)
+    await db.refresh(token)
     assert token.tokens_used == 1
 
 
-def test_use_generation_no_tokens(db):
+async def test_use_generation_no_tokens(db):
     """Test using generation without tokens."""
     device_id = "no-tokens-device"
-    token = get_or_create_token_record(db, device_id)
+    token = await get_or_create_token_record(db, device_id)
     token.free_trial_used = True
     token.tokens_total = 0
-    db.commit()
+    await db.commit()
     
-    result = use_generation(db, device_id)
+    result = await use_generation(db, device_id)
     assert result is False
 
 
-def test_add_tokens(db):
+async def test_add_tokens(db):
     """Test adding tokens after payment."""
     device_id = "add-tokens-device"
     
-    token = add_tokens(db, device_id, 10, "payment-123", "validator_10")
+    token = await add_tokens(db, device_id, 10, "payment-123", "validator_10")
     
     assert token.tokens_total == 10
     assert token.payment_id == "payment-123"
     assert token.product_sku == "validator_10"
 
 
-def test_add_tokens_cumulative(db):
+async def test_add_tokens_cumulative(db):
     """Test adding tokens is cumulative."""
     device_id = "cumulative-device"
     
-    add_tokens(db, device_id, 5, "payment-1", "validator_3")
-    token = add_tokens(db, device_id, 10, "payment-2", "validator_10")
+    await add_tokens(db, device_id, 5, "payment-1", "validator_3")
+    token = await add_tokens(db, device_id, 10, "payment-2", "validator_10")
     
     assert token.tokens_total == 15
 
 
-def test_get_token_status(db):
+async def test_get_token_status(db):
     """Test getting token status."""
     device_id = "status-device"
-    token = get_or_create_token_record(db, device_id)
+    token = await get_or_create_token_record(db, device_id)
     token.tokens_total = 10
     token.tokens_used = 3
-    db.commit()
+    await db.commit()
     
-    status = get_token_status(db, device_id)
+    status = await get_token_status(db, device_id)
     
     assert status["free_trial_used"] is False
     assert status["tokens_total"] == 10
@@ -147,21 +159,198 @@ def test_get_token_status(db):
     assert status["can_generate"] is True
 
 
-def test_tokens_remaining_property(db):
+async def test_tokens_remaining_property(db):
     """Test tokens_remaining property calculation."""
     device_id = "remaining-device"
-    token = get_or_create_token_record(db, device_id)
+    token = await get_or_create_token_record(db, device_id)
     
     token.tokens_total = 10
     token.tokens_used = 4
-    db.commit()
-    db.refresh(token)
+    await db.commit()
+    await db.refresh(token)
     
     assert token.tokens_remaining == 6
     
     # Edge case: used more than total (shouldn't happen but handle it)
     token.tokens_used = 15
-    db.commit()
-    db.refresh(token)
+    await db.commit()
+    await db.refresh(token)
     
     assert token.tokens_remaining == 0  # Never negative
+
+
+async def test_reserve_and_release_free_trial(db):
+    """Test the free trial is reserved first and can be given back."""
+    device_id = "reserve-trial-device"
+    await add_tokens(db, device_id, 2, "payment-1", "validator_3")
+    
+    reservation = await reserve_credit(db, device_id)
+    await db.commit()
+    assert reservation.kind == "free_trial"
+    assert (await get_token_status(db, device_id))["free_trial_used"] is True
+    
+    await release_credit(db, reservation)
+    await db.commit()
+    status = await get_token_status(db, device_id)
+    assert status["free_trial_used"] is False
+    assert status["tokens_used"] == 0
+
+
+async def test_reserve_and_release_paid(db):
+    """Test paid credits are reserved once the free trial is gone."""
+    device_id = "reserve-paid-device"
+    await add_tokens(db, device_id, 1, "payment-1", "validator_3")
+    await use_generation(db, device_id)
+    
+    reservation = await reserve_credit(db, device_id)
+    assert reservation.kind == "paid"
+    assert await reserve_credit(db, device_id) is None
+    await release_credit(db, reservation)
+    await db.commit()
+    
+    assert (await get_token_status(db, device_id))["tokens_remaining"] == 1
+
+
+async def test_concurrent_reservations_never_overspend(file_sessions):
+    """Test many concurrent requests for one device take exactly the available credits."""
+    device_id = "hammered-device"
+    async with file_sessions() as db:
+        await add_tokens(db, device_id, 5, "payment-1", "validator_10")
+    
+    async def attempt():
+        async with file_sessions() as db:
+            reservation = await reserve_credit(db, device_id)
+            await db.commit()
+            return reservation
+    
+    results = await asyncio.gather(*(attempt() for _ in range(40)))
+    
+    granted = [r for r in results if r is not None]
+    assert len(granted) == 6
+    assert sum(r.kind == "free_trial" for r in granted) == 1
+    async with file_sessions() as db:
+        status = await get_token_status(db, device_id)
+    assert status["tokens_used"] == 5
+    assert status["tokens_remaining"] == 0
+
+
+async def test_reserve_credits_all_or_none(db):
+    """Test a batch reservation takes the free trial first and nothing when short."""
+    device_id = "batch-device"
+    await add_tokens(db, device_id, 2, "payment-1", "validator_3")
+    
+    assert await reserve_credits(db, device_id, 4) is None
+    reservations = await reserve_credits(db, device_id, 3)
+    await db.commit()
+    
+    assert [r.kind for r in reservations] == ["free_trial", "paid", "paid"]
+    status = await get_token_status(db, device_id)
+    assert (status["free_trial_used"], status["tokens_used"]) == (True, 2)
+    
+    await release_credits(db, reservations[:2])
+    await db.commit()
+    status = await get_token_status(db, device_id)
+    assert (status["free_trial_used"], status["tokens_used"]) == (False, 1)
+
+
+async def test_concurrent_batch_reservations_never_overspend(file_sessions):
+    """Test concurrent batches for one device never take more than the balance."""
+    device_id = "batch-hammered-device"
+    async with file_sessions() as db:
+        await add_tokens(db, device_id, 9, "payment-1", "validator_10")
+    
+    async def attempt():
+        async with file_sessions() as db:
+            reservations = await reserve_credits(db, device_id, 3)
+            await db.commit()
+            return reservations
+    
+    results = await asyncio.gather(*(attempt() for _ in range(10)))
+    
+    granted = [r for r in results if r is not None]
+    assert len(granted) == 3
+    async with file_sessions() as db:
+        status = await get_token_status(db, device_id)
+    assert status["tokens_used"] + status["free_trial_used"] == 9
+
+
+async def test_concurrent_first_requests_create_one_row(file_sessions):
+    """Test concurrent first requests for a new device share a single record."""
+    async def attempt():
+        async with file_sessions() as db:
+            return (await get_or_create_token_record(db, "new-device")).id
+    
+    ids = await asyncio.gather(*(attempt() for _ in range(20)))
+    
+    assert len(set(ids)) == 1
+
+
+async def test_concurrent_purchases_all_count(file_sessions):
+    """Test simultaneous purchases for one device are all credited."""
+    device_id = "buying-device"
+    async with file_sessions() as db:
+        await get_or_create_token_record(db, device_id)
+    
+    async def purchase(n):
+        async with file_sessions() as db:
+            await add_tokens(db, device_id, 3, f"payment-{n}", "validator_3")
+    
+    await asyncio.gather(*(purchase(n) for n in range(10)))
+    
+    async with file_sessions() as db:
+        assert (await get_token_record(db, device_id)).tokens_total == 30
+
+
+async def _row_count(db) -> int:
+    return (await db.execute(select(func.count()).select_from(GenerationToken))).scalar()
+
+
+async def test_reads_do_not_create_records(db):
+    """Test status and eligibility checks leave no row behind."""
+    status = await get_token_status(db, "visitor-device")
+    can_generate, reason = await check_can_generate(db, "visitor-device")
+    
+    assert status["can_generate"] is True
+    assert status["free_trial_used"] is False
+    assert (can_generate, reason) == (True, "free_trial")
+    assert await get_token_record(db, "visitor-device") is None
+    assert await _row_count(db) == 0
+
+
+async def test_first_consumption_creates_record(db):
+    """Test the row is created when the free trial is first used."""
+    assert await use_generation(db, "first-use-device") is True
+    
+    token = await get_token_record(db, "first-use-device")
+    assert token.free_trial_used is True
+
+
+async def test_delete_unused_token_records(db):
+    """Test only old, never-used rows are deleted, in batches."""
+    old = datetime.utcnow() - timedelta(days=30)
+    for i in range(5):
+        db.add(GenerationToken(device_id=f"idle-{i}", created_at=old))
+    db.add(GenerationToken(device_id="recent", created_at=datetime.utcnow()))
+    db.add(GenerationToken(device_id="trial", created_at=old, free_trial_used=True))
+    db.add(GenerationToken(device_id="buyer", created_at=old, tokens_total=3, payment_id="p"))
+    await db.commit()
+    
+    deleted = await delete_unused_token_records(
+        db, datetime.utcnow() - timedelta(days=7), batch_size=2
+    )
+    
+    assert deleted == 5
+    remaining = (await db.execute(select(GenerationToken.device_id))).scalars().all()
+    assert sorted(remaining) == ["buyer", "recent", "trial"]
+
+
+async def test_cleanup_task(db):
+    """Test the cleanup task uses the application session."""
+    from tests.conftest import TestingSessionLocal
+    from app.tasks import cleanup_tokens
+    
+    db.add(GenerationToken(device_id="idle", created_at=datetime.utcnow() - timedelta(days=30)))
+    await db.commit()
+    
+    with patch("app.tasks.cleanup_tokens.SessionLocal", TestingSessionLocal):
+        assert await cleanup_tokens.run(older_than_days=7, batch_size=100) == 1